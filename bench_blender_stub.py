@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+# Stands in for Blender when benchmarking Stage 1 (see bench_stage1.py). It accepts the
+# command lines process_assets.py builds for blender_decimate_unwrap.py (single job,
+# --worker and --manifest), sleeps for a simulated processing time, and writes the same
+# output, result and stats files, so the orchestrator can be measured without Blender.
+#
+# Simulated time per process: BENCH_STUB_STARTUP_SECONDS (paid once, like Blender's startup)
+# and per asset: BENCH_STUB_SECONDS_PER_ASSET + BENCH_STUB_SECONDS_PER_MILLION_FACES * faces / 1e6.
+
+# Must match blender_decimate_unwrap.py.
+WORKER_RESULT_PREFIX = "@@PIPELINE_WORKER_RESULT@@ "
+JOB_START_PREFIX = "@@PIPELINE_JOB_START@@ "
+
+STARTUP_SECONDS = float(os.environ.get("BENCH_STUB_STARTUP_SECONDS", "1.0"))
+SECONDS_PER_ASSET = float(os.environ.get("BENCH_STUB_SECONDS_PER_ASSET", "0.2"))
+SECONDS_PER_MILLION_FACES = float(os.environ.get("BENCH_STUB_SECONDS_PER_MILLION_FACES", "4.0"))
+
+# Share of the simulated time spent in each of blender_decimate_unwrap.py's stages.
+STAGE_SHARES = [
+    ("obj_import", 0.30),
+    ("apply_scale_factor", 0.05),
+    ("save_blend", 0.05),
+    ("export_high", 0.20),
+    ("decimate", 0.20),
+    ("uv_prepare", 0.02),
+    ("smart_uv_project", 0.13),
+    ("export_low", 0.05),
+]
+
+# Bytes per face of a typical v/vt/vn OBJ, for inputs without a "# faces N" header line.
+ESTIMATED_BYTES_PER_FACE = 100
+
+LOW_POLY_PLACEHOLDER = "o stub\nv 0 0 0\nv 1 0 0\nv 0 1 0\nvt 0 0\nvt 1 0\nvt 0 1\nf 1/1 2/2 3/3\n"
+
+
+def build_arg_parser():
+    # Only the arguments the stub acts on; the UV and scale settings are accepted and ignored.
+    parser = argparse.ArgumentParser(description="Blender stub for bench_stage1.py.")
+    parser.add_argument("--worker", action="store_true")
+    parser.add_argument("--manifest", type=str)
+    parser.add_argument("--input_mesh", type=str)
+    parser.add_argument("--output_mesh", type=str)
+    parser.add_argument("--blend_output", type=str)
+    parser.add_argument("--high_output", type=str)
+    parser.add_argument("--result_file", type=str)
+    parser.add_argument("--stats_output", type=str)
+    parser.add_argument("--skip_high_export", action="store_true")
+    parser.add_argument("--decimate_ratio", type=float, default=0.1)
+    parser.add_argument("--decimate_mode", type=str, default="ratio")
+    parser.add_argument("--target_triangles", type=int)
+    parser.add_argument("--min_decimate_ratio", type=float, default=0.0)
+    parser.add_argument("--max_decimate_ratio", type=float, default=1.0)
+    parser.add_argument("--lod_outputs", type=str, nargs="+", default=[])
+    return parser
+
+
+def count_faces(input_path):
+    """Reads the face count from the "# faces N" header bench_stage1.py writes, or estimates it from the file size."""
+    with open(input_path, 'r', errors='replace') as f:
+        for _ in range(5):
+            line = f.readline()
+            if line.startswith("# faces "):
+                return int(line.split()[2])
+    return os.path.getsize(input_path) // ESTIMATED_BYTES_PER_FACE
+
+
+def write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def run_job(args, asset_name=None):
+    start_time = time.monotonic()
+    faces = count_faces(args.input_mesh)
+    # The stub has no surface area, so "density" mode is treated like "ratio".
+    target_triangles = args.target_triangles if args.decimate_mode == "triangles" else None
+    ratio = args.decimate_ratio
+    if target_triangles:
+        ratio = min(args.max_decimate_ratio, max(args.min_decimate_ratio, target_triangles / max(1, faces)))
+    low_faces = int(faces * ratio)
+    job_seconds = SECONDS_PER_ASSET + SECONDS_PER_MILLION_FACES * faces / 1e6
+    print(f"Blender stub: processing {args.input_mesh} ({faces:,} faces, {job_seconds:.2f}s simulated)", flush=True)
+
+    stages = []
+    for stage_name, share in STAGE_SHARES:
+        if stage_name == "export_high" and args.skip_high_export:
+            continue
+        stage_start = time.perf_counter()
+        time.sleep(job_seconds * share)
+        if stage_name == "save_blend" and args.blend_output:
+            with open(args.blend_output, 'wb') as f:
+                f.write(b"BLENDER-stub")
+        elif stage_name == "export_high":
+            with open(args.input_mesh, 'rb') as source, open(args.high_output, 'wb') as target:
+                while True:
+                    block = source.read(16 * 1024 * 1024)
+                    if not block:
+                        break
+                    target.write(block)
+        elif stage_name == "export_low":
+            for low_poly_path in [args.output_mesh] + args.lod_outputs:
+                with open(low_poly_path, 'w') as f:
+                    f.write(LOW_POLY_PLACEHOLDER)
+        decimated_before = stage_name in ("uv_prepare", "smart_uv_project", "export_low")
+        stage = {
+            "name": stage_name, "status": "ok",
+            "before": {"vertices": None, "faces": low_faces if decimated_before else faces},
+            "after": {"vertices": None, "faces": low_faces if decimated_before or stage_name == "decimate" else faces},
+            "wall_seconds": time.perf_counter() - stage_start,
+            "peak_rss_bytes": None, "peak_rss_scope": "process",
+        }
+        stages.append(stage)
+        print(f"    [stage] {stage_name}: {stage['wall_seconds']:.2f}s (ok)", flush=True)
+
+    result = {"asset_name": asset_name, "status": "ok", "message": "", "elapsed_seconds": time.monotonic() - start_time}
+    if args.stats_output:
+        write_json_atomic(args.stats_output, {
+            "asset_name": asset_name or os.path.splitext(os.path.basename(args.input_mesh))[0],
+            "input_mesh": args.input_mesh, "status": "ok",
+            "total_seconds": result["elapsed_seconds"], "stages": stages,
+            "decimation": {"mode": args.decimate_mode, "source_triangles": faces, "surface_area": None,
+                           "target_triangles": target_triangles, "clamped": target_triangles is not None and ratio != target_triangles / max(1, faces),
+                           "ratio": ratio, "achieved_triangles": low_faces},
+        })
+    if args.result_file:
+        write_json_atomic(args.result_file, result)
+    return result
+
+
+if __name__ == "__main__":
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = build_arg_parser()
+    args, _ = parser.parse_known_args(argv)
+    time.sleep(STARTUP_SECONDS)
+
+    if args.worker:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            if job.get("command") == "shutdown":
+                break
+            result = run_job(parser.parse_known_args([str(a) for a in job["args"]])[0], job["asset_name"])
+            print(WORKER_RESULT_PREFIX + json.dumps(result), flush=True)
+    elif args.manifest:
+        with open(args.manifest, 'r') as f:
+            jobs = json.load(f)["jobs"]
+        for job in jobs:
+            print(f"{JOB_START_PREFIX}{job['asset_name']}", flush=True)
+            run_job(parser.parse_known_args([str(a) for a in job["args"]])[0], job["asset_name"])
+    else:
+        run_job(args)
@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+# Compares the high-poly formats process_assets.py can produce (high_poly_format in config.json):
+# Blender export time, file size and, with --painter, how long Substance Painter takes to load
+# each file. The mesh is either generated (--faces) or an existing OBJ (--file).
+#
+#   python bench_high_poly_format.py --faces 10000000
+#   python bench_high_poly_format.py --file E:\Meshes\Asset001_high.obj --painter
+#
+# The same file also runs inside Blender (started by the benchmark itself) to do the exports:
+#   blender --background --python bench_high_poly_format.py -- --blender-export <obj> <folder> <formats>
+
+REPO_FOLDER = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE_PATH = os.environ.get("PIPELINE_CONFIG") or os.path.join(REPO_FOLDER, "config.json")
+HIGH_POLY_FORMATS = ("obj", "fbx", "glb")
+# Prefix of the line the Blender side prints its measurements on.
+BENCH_RESULT_PREFIX = "@@BENCH_HIGH_POLY_FORMAT@@ "
+
+
+def run_blender_exports(input_obj, output_folder, formats):
+    """Runs inside Blender: imports input_obj once, then times one export per format with blender_decimate_unwrap's exporters."""
+    sys.path.insert(0, REPO_FOLDER)
+    import bpy
+    import blender_decimate_unwrap
+
+    bpy.ops.wm.read_homefile(use_empty=True)
+    start_time = time.perf_counter()
+    bpy.ops.wm.obj_import(filepath=input_obj)
+    import_seconds = time.perf_counter() - start_time
+    imported_obj = bpy.context.selected_objects[0]
+    bpy.context.view_layer.objects.active = imported_obj
+
+    results = {"blender_obj_import_seconds": import_seconds, "faces": len(imported_obj.data.polygons), "formats": {}}
+    for file_format in formats:
+        output_path = os.path.join(output_folder, f"bench_high.{file_format}")
+        start_time = time.perf_counter()
+        blender_decimate_unwrap.export_object(imported_obj, output_path, raise_on_error=True, file_format=file_format)
+        results["formats"][file_format] = {"path": output_path, "export_seconds": time.perf_counter() - start_time,
+                                           "size_bytes": os.path.getsize(output_path)}
+    print(BENCH_RESULT_PREFIX + json.dumps(results), flush=True)
+
+
+def default_blender_executable():
+    """The Blender executable from config.json's blender_settings, for this OS."""
+    with open(CONFIG_FILE_PATH, 'r') as f:
+        blender_settings = json.load(f)["blender_settings"]
+    if platform.system() == "Windows":
+        return blender_settings["executable_path_windows"]
+    if platform.system() == "Darwin":
+        return blender_settings["executable_path_macos"]
+    return blender_settings["executable_path_linux"]
+
+
+def measure_painter_load(remote, mesh_path):
+    """Creates a Painter project from mesh_path and returns how long project.create took, in seconds (or None)."""
+    mesh_path_escaped = mesh_path.replace('\\', '\\\\')
+    command = f"""
+import time
+import substance_painter.project
+
+if substance_painter.project.is_open():
+    substance_painter.project.close()
+start_time = time.perf_counter()
+substance_painter.project.create(mesh_file_path=r'{mesh_path_escaped}', settings=substance_painter.project.Settings())
+load_seconds = time.perf_counter() - start_time
+substance_painter.project.close()
+print("{BENCH_RESULT_PREFIX}" + str(load_seconds))
+"""
+    response = remote.execScript(command, "python")
+    for line in str(response).splitlines():
+        if line.startswith(BENCH_RESULT_PREFIX):
+            return float(line[len(BENCH_RESULT_PREFIX):])
+    print(f"  WARNING: Painter did not report a load time for '{mesh_path}'. Response: {response}")
+    return None
+
+
+def run_benchmark(args, formats):
+    work_folder = os.path.abspath(args.work_folder)
+    os.makedirs(work_folder, exist_ok=True)
+    input_obj = args.file
+    if input_obj is None:
+        import lib_obj
+        from bench_obj_io import make_grid_mesh
+        print(f"Generating a grid mesh with about {args.faces:,} triangles...")
+        mesh = make_grid_mesh(args.faces)
+        input_obj = os.path.join(work_folder, "bench_source.obj")
+        lib_obj.write_obj(input_obj, mesh)
+        del mesh
+    print(f"Source mesh: {input_obj} ({os.path.getsize(input_obj) / (1024 ** 2):.0f} MB)")
+
+    blender_executable = args.blender or default_blender_executable()
+    print(f"Exporting {', '.join(formats)} with Blender ({blender_executable})...")
+    command = [blender_executable, "--background", "--factory-startup", "--python", os.path.abspath(__file__),
+               "--", "--blender-export", input_obj, work_folder, ",".join(formats)]
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace')
+    except FileNotFoundError:
+        print(f"ERROR: Blender executable not found at '{blender_executable}'. Use --blender or check config.json.")
+        exit(1)
+    blender_results = None
+    for line in process.stdout.splitlines():
+        if line.startswith(BENCH_RESULT_PREFIX):
+            blender_results = json.loads(line[len(BENCH_RESULT_PREFIX):])
+    if blender_results is None:
+        print(f"ERROR: Blender did not report export results (exit code {process.returncode}).")
+        print(process.stdout[-4000:])
+        print(process.stderr[-4000:])
+        exit(1)
+    print(f"  Blender imported {blender_results['faces']:,} faces in {blender_results['blender_obj_import_seconds']:.1f}s")
+
+    if args.painter:
+        import lib_remote
+        remote = lib_remote.RemotePainter()
+        try:
+            remote.checkConnection()
+        except Exception as e:
+            print(f"ERROR: Could not connect to Substance Painter: {e}")
+            print("Ensure Painter is running with '--enable-remote-scripting', or drop --painter.")
+            exit(1)
+        with remote:
+            for file_format in formats:
+                print(f"Loading bench_high.{file_format} in Painter...")
+                entry = blender_results["formats"][file_format]
+                entry["painter_load_seconds"] = measure_painter_load(remote, entry["path"])
+
+    print("\n--- High-Poly Format Benchmark ---")
+    print(f"{'format':<8} {'export s':>9} {'size MB':>9} {'vs obj':>7} {'Painter load s':>15}")
+    obj_size = blender_results["formats"].get("obj", {}).get("size_bytes")
+    for file_format in formats:
+        entry = blender_results["formats"][file_format]
+        relative_size = f"{entry['size_bytes'] / obj_size:6.2f}x" if obj_size else "    n/a"
+        load_seconds = entry.get("painter_load_seconds")
+        load_text = f"{load_seconds:15.1f}" if load_seconds is not None else f"{'n/a':>15}"
+        print(f"{file_format:<8} {entry['export_seconds']:9.1f} {entry['size_bytes'] / (1024 ** 2):9.1f} {relative_size} {load_text}")
+
+    if not args.keep:
+        for file_format in formats:
+            os.remove(blender_results["formats"][file_format]["path"])
+        if args.file is None:
+            os.remove(input_obj)
+
+
+if __name__ == "__main__":
+    if "--" in sys.argv and "--blender-export" in sys.argv:
+        input_obj, output_folder, format_list = sys.argv[sys.argv.index("--blender-export") + 1:][:3]
+        run_blender_exports(input_obj, output_folder, format_list.split(","))
+        sys.exit(0)
+
+    arg_parser = argparse.ArgumentParser(description="Compare high-poly export formats: Blender write time, file size and Painter load time.")
+    arg_parser.add_argument("--faces", type=int, default=2000000, help="Triangles in the generated mesh (default: 2,000,000).")
+    arg_parser.add_argument("--file", help="Use an existing OBJ instead of a generated mesh.")
+    arg_parser.add_argument("--formats", default=",".join(HIGH_POLY_FORMATS), help="Formats to compare (default: obj,fbx,glb).")
+    arg_parser.add_argument("--blender", help="Blender executable (default: the one in config.json).")
+    arg_parser.add_argument("--painter", action="store_true", help="Also time loading each file in a running Substance Painter (remote scripting enabled).")
+    arg_parser.add_argument("--work-folder", default=os.path.join(REPO_FOLDER, "_bench_high_poly_format"), help="Where the exported files are written.")
+    arg_parser.add_argument("--keep", action="store_true", help="Keep the generated and exported files.")
+    args = arg_parser.parse_args()
+
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown_formats = [f for f in formats if f not in HIGH_POLY_FORMATS]
+    if unknown_formats:
+        print(f"ERROR: Unknown format(s) {', '.join(unknown_formats)}. Expected some of: {', '.join(HIGH_POLY_FORMATS)}.")
+        exit(1)
+    if args.file and not os.path.isfile(args.file):
+        print(f"ERROR: OBJ file '{args.file}' not found.")
+        exit(1)
+    run_benchmark(args, formats)
@@ -0,0 +1,149 @@
+import os
+import time
+import math
+import argparse
+import tempfile
+import numpy as np
+import lib_obj
+
+# Benchmarks lib_obj's mmap/NumPy OBJ reader and chunked writer against a plain
+# line-by-line Python parser and writer, on a generated mesh or an existing file.
+#
+#   python bench_obj_io.py --faces 20000000      (about 1.5 GB of OBJ)
+#   python bench_obj_io.py --file E:\Meshes\Asset001_high.obj --skip-naive
+
+
+def naive_read_obj(path):
+    """Reference parser: one Python split() per line, as most small OBJ loaders do it."""
+    vertices, uvs, normals = [], [], []
+    face_vertices, face_uvs, face_normals, arities = [], [], [], []
+    with open(path, 'r', encoding='latin-1') as f:
+        for line in f:
+            if line.startswith('v '):
+                parts = line.split()
+                vertices.append((float(parts[1]), float(parts[2]), float(parts[3])))
+            elif line.startswith('vt '):
+                parts = line.split()
+                uvs.append((float(parts[1]), float(parts[2])))
+            elif line.startswith('vn '):
+                parts = line.split()
+                normals.append((float(parts[1]), float(parts[2]), float(parts[3])))
+            elif line.startswith('f '):
+                corners = line.split()[1:]
+                arities.append(len(corners))
+                for corner in corners:
+                    fields = corner.split('/')
+                    face_vertices.append(int(fields[0]) - 1)
+                    if len(fields) > 1 and fields[1]:
+                        face_uvs.append(int(fields[1]) - 1)
+                    if len(fields) > 2 and fields[2]:
+                        face_normals.append(int(fields[2]) - 1)
+    return vertices, uvs, normals, arities, face_vertices, face_uvs, face_normals
+
+
+def naive_write_obj(path, mesh):
+    """Reference writer: one formatted write() per line."""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for x, y, z in mesh.vertices.tolist():
+            f.write("v %.6f %.6f %.6f\n" % (x, y, z))
+        for u, v in mesh.uvs.tolist():
+            f.write("vt %.6f %.6f\n" % (u, v))
+        for x, y, z in mesh.normals.tolist():
+            f.write("vn %.6f %.6f %.6f\n" % (x, y, z))
+        offsets = mesh.face_offsets.tolist()
+        corner_vertices, corner_uvs, corner_normals = mesh.face_vertices.tolist(), mesh.face_uvs.tolist(), mesh.face_normals.tolist()
+        for face_index in range(len(offsets) - 1):
+            corners = range(offsets[face_index], offsets[face_index + 1])
+            f.write("f " + " ".join("%d/%d/%d" % (corner_vertices[c] + 1, corner_uvs[c] + 1, corner_normals[c] + 1) for c in corners) + "\n")
+
+
+def make_grid_mesh(face_target, seed=0):
+    """A noisy height-field grid with UVs and normals and about face_target triangles."""
+    side = max(2, int(math.ceil(math.sqrt(face_target / 2))) + 1)
+    rng = np.random.default_rng(seed)
+    xs, ys = np.meshgrid(np.arange(side, dtype=np.float64), np.arange(side, dtype=np.float64))
+    mesh = lib_obj.ObjMesh()
+    mesh.vertices = np.column_stack([xs.ravel(), ys.ravel(), rng.normal(0.0, 0.1, side * side)])
+    mesh.uvs = mesh.vertices[:, :2] / (side - 1)
+    normals = np.column_stack([rng.normal(0.0, 0.05, (side * side, 2)), np.ones(side * side)])
+    mesh.normals = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+
+    cell_x, cell_y = np.meshgrid(np.arange(side - 1), np.arange(side - 1))
+    corner = (cell_y * side + cell_x).ravel()
+    triangles = np.empty((len(corner) * 2, 3), dtype=np.int64)
+    triangles[0::2] = np.column_stack([corner, corner + 1, corner + side])
+    triangles[1::2] = np.column_stack([corner + 1, corner + side + 1, corner + side])
+    mesh.face_vertices = triangles.ravel()
+    mesh.face_uvs = mesh.face_vertices
+    mesh.face_normals = mesh.face_vertices
+    mesh.face_offsets = np.arange(len(triangles) + 1, dtype=np.int64) * 3
+    mesh.face_count = len(triangles)
+    return mesh
+
+
+def timed(label, function, size_bytes=None):
+    start_time = time.perf_counter()
+    value = function()
+    seconds = time.perf_counter() - start_time
+    throughput = f"   {size_bytes / (1024 ** 2) / max(seconds, 1e-9):8.1f} MB/s" if size_bytes else ""
+    print(f"  {label:<36} {seconds:8.2f}s{throughput}")
+    return value, seconds
+
+
+def run_benchmark(args):
+    work_folder = args.work_folder or tempfile.mkdtemp(prefix="bench_obj_io_")
+    os.makedirs(work_folder, exist_ok=True)
+    path = args.file
+
+    if path is None:
+        print(f"Generating a grid mesh with about {args.faces:,} triangles...")
+        mesh = make_grid_mesh(args.faces)
+        path = os.path.join(work_folder, "bench_vectorized.obj")
+        print(f"Writing ({mesh.vertex_count:,} vertices, {mesh.face_count:,} faces):")
+        _, vectorized_write_seconds = timed("lib_obj.write_obj (chunked)", lambda: lib_obj.write_obj(path, mesh, chunk_rows=args.write_chunk_rows))
+        file_size = os.path.getsize(path)
+        print(f"  -> {path} ({file_size / (1024 ** 2):.0f} MB, {file_size / (1024 ** 2) / vectorized_write_seconds:.1f} MB/s)")
+        if not args.skip_naive:
+            naive_path = os.path.join(work_folder, "bench_naive.obj")
+            _, naive_write_seconds = timed("naive per-line writer", lambda: naive_write_obj(naive_path, mesh), file_size)
+            print(f"  Write speedup: {naive_write_seconds / vectorized_write_seconds:.1f}x")
+            if os.path.getsize(naive_path) != file_size:
+                print("  WARNING: the two writers produced files of different sizes.")
+            if not args.keep:
+                os.remove(naive_path)
+        del mesh
+    file_size = os.path.getsize(path)
+
+    print(f"\nReading {path} ({file_size / (1024 ** 2):.0f} MB):")
+    mesh, vectorized_read_seconds = timed("lib_obj.read_obj (mmap + NumPy)", lambda: lib_obj.read_obj(path, chunk_bytes=args.chunk_mb * 1024 * 1024), file_size)
+    timed("lib_obj.read_obj (load_faces=False)", lambda: lib_obj.read_obj(path, load_faces=False, chunk_bytes=args.chunk_mb * 1024 * 1024), file_size)
+    print(f"  {mesh.vertex_count:,} vertices, {len(mesh.uvs):,} UVs, {len(mesh.normals):,} normals, {mesh.face_count:,} faces")
+    problems = mesh.validate()
+    print(f"  Validation: {'OK' if not problems else '; '.join(problems)}")
+
+    if not args.skip_naive:
+        naive, naive_read_seconds = timed("naive per-line parser", lambda: naive_read_obj(path), file_size)
+        print(f"  Read speedup: {naive_read_seconds / vectorized_read_seconds:.1f}x")
+        same = (np.array_equal(np.asarray(naive[0]).reshape(-1, 3), mesh.vertices)
+                and np.array_equal(np.asarray(naive[4], dtype=np.int64), mesh.face_vertices))
+        print(f"  Results match: {'yes' if same else 'NO'}")
+
+    if args.file is None and not args.keep:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark lib_obj's OBJ reader/writer against a naive line parser.")
+    arg_parser.add_argument("--faces", type=int, default=2000000, help="Triangles in the generated mesh (default: 2,000,000). 20,000,000 gives about 1.5 GB.")
+    arg_parser.add_argument("--file", help="Benchmark reading an existing OBJ instead of a generated one.")
+    arg_parser.add_argument("--work-folder", help="Where generated files are written (default: a new temp folder).")
+    arg_parser.add_argument("--chunk-mb", type=int, default=lib_obj.DEFAULT_CHUNK_BYTES // (1024 * 1024), help="read_obj chunk size in MB.")
+    arg_parser.add_argument("--write-chunk-rows", type=int, default=lib_obj.DEFAULT_WRITE_CHUNK_ROWS, help="write_obj rows per write call.")
+    arg_parser.add_argument("--skip-naive", action="store_true", help="Only time lib_obj (the naive parser needs minutes and a lot of memory on multi-GB files).")
+    arg_parser.add_argument("--keep", action="store_true", help="Keep the generated files.")
+    args = arg_parser.parse_args()
+
+    if args.file and not os.path.isfile(args.file):
+        print(f"ERROR: OBJ file '{args.file}' not found.")
+        exit(1)
+    run_benchmark(args)
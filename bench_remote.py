@@ -0,0 +1,191 @@
+import time
+import base64
+import asyncio
+import argparse
+import threading
+import http.client
+import http.server
+import lib_remote
+
+# Measures the per-call overhead of lib_remote.RemotePainter, the way painter_automate.py talks to
+# Painter: checkConnection() followed by execScript() for every step. It compares the old pattern
+# (a new client per step, a separate socket for the connection check and a new HTTP connection per
+# request) with the shared client that keeps one HTTP/1.1 connection open.
+#
+#   python bench_remote.py                     (against a local stand-in for Painter's server)
+#   python bench_remote.py --calls 200 --painter   (against a running Painter, remote scripting enabled)
+#   python bench_remote.py --endpoints 4           (several stand-ins, each call taking --script-ms)
+#
+# The stand-in answers like Painter's /run.json route without running anything, so the numbers
+# are transport overhead only. With --server-closes it closes every connection after one
+# response, as a server without keep-alive would, to show the client falling back.
+# With --endpoints it compares driving several Painters one after another with the blocking
+# RemotePainter against one asyncio loop driving all of them with AsyncRemotePainter.
+
+BENCH_SCRIPT = "print('PYTHON_SCRIPT_BENCH_OK')"
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True # Answer at once, like a local server normally does
+    server_closes = False
+    script_seconds = 0.0 # Simulated time Painter spends running the script
+
+    def setup(self):
+        super().setup()
+        with self.server.count_lock:
+            self.server.connection_count += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        base64.b64decode(body[len(b'{"python":"'):-2]) # Decode the script as Painter would
+        if self.script_seconds:
+            time.sleep(self.script_seconds)
+        response = b"PYTHON_SCRIPT_BENCH_OK\n"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        if self.server_closes:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(server_closes, script_seconds=0.0):
+    """Starts the stand-in on a free local port in a background thread. Returns the server."""
+    handler = type("Handler", (StandInHandler,), {"server_closes": server_closes, "script_seconds": script_seconds})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    server.connection_count = 0
+    server.count_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def legacy_step(host, port, script):
+    """One step as painter_automate.py did it before the client was shared: a throwaway client,
+    a socket just for checkConnection(), then a new connection for the request itself."""
+    check_connection = http.client.HTTPConnection(host, port)
+    check_connection.connect()
+    check_connection.close()
+    connection = http.client.HTTPConnection(host, port, timeout=3600)
+    command = '{{"python":"{0}"}}'.format(base64.b64encode(script.encode('utf-8')).decode('utf-8')).encode("utf-8")
+    connection.request('POST', '/run.json', command, {'Content-type': 'application/json', 'Accept': 'application/json'})
+    data = connection.getresponse().read()
+    connection.close()
+    return data.decode('utf-8').rstrip()
+
+
+def time_calls(label, call, calls):
+    """Runs call() calls times and prints the mean and median per call."""
+    call() # Warm-up (first connection, imports on the server side)
+    durations = []
+    for _ in range(calls):
+        start_time = time.perf_counter()
+        response = call()
+        durations.append(time.perf_counter() - start_time)
+        if "PYTHON_SCRIPT_BENCH_OK" not in (response or ""):
+            print(f"  WARNING: unexpected response: {response!r}")
+            break
+    durations.sort()
+    mean_seconds = sum(durations) / len(durations)
+    print(f"  {label:<46} mean {mean_seconds * 1e6:8.0f} us   median {durations[len(durations) // 2] * 1e6:8.0f} us"
+          f"   total {sum(durations):.2f}s")
+    return mean_seconds
+
+
+def run_benchmark(args):
+    server = None
+    if args.painter:
+        host, port = args.host, args.port
+        print(f"Benchmarking against Substance Painter at {host}:{port} ({args.calls} calls per pattern).")
+    else:
+        server = start_stand_in_server(args.server_closes)
+        host, port = server.server_address
+        print(f"Benchmarking against a local stand-in server at {host}:{port} ({args.calls} calls per pattern"
+              f"{', server closes every connection' if args.server_closes else ''}).")
+
+    connections_before = server.connection_count if server else None
+    legacy_seconds = time_calls("new client + check socket + new connection", lambda: legacy_step(host, port, BENCH_SCRIPT), args.calls)
+    legacy_connections = server.connection_count - connections_before if server else None
+
+    with lib_remote.RemotePainter(port=port, host=host) as shared_remote:
+
+        def shared_step():
+            shared_remote.checkConnection()
+            return shared_remote.execScript(BENCH_SCRIPT, "python")
+
+        connections_before = server.connection_count if server else None
+        shared_seconds = time_calls("shared client, kept-alive connection", shared_step, args.calls)
+        shared_connections = server.connection_count - connections_before if server else None
+
+    print(f"\n  Per-call overhead: {legacy_seconds * 1e6:.0f} us -> {shared_seconds * 1e6:.0f} us "
+          f"({legacy_seconds / shared_seconds:.1f}x)")
+    if server is not None:
+        print(f"  TCP connections opened: {legacy_connections} -> {shared_connections} (including the warm-up call)")
+        server.shutdown()
+        server.server_close()
+
+
+def run_endpoint_benchmark(args):
+    servers = [start_stand_in_server(False, args.script_ms / 1000.0) for _ in range(args.endpoints)]
+    ports = [server.server_address[1] for server in servers]
+    print(f"Benchmarking {args.endpoints} stand-in endpoints, {args.calls} calls each, {args.script_ms:g} ms per script.")
+
+    blocking_remotes = [lib_remote.RemotePainter(port=port, host="127.0.0.1") for port in ports]
+    try:
+        start_time = time.perf_counter()
+        for _ in range(args.calls):
+            for remote in blocking_remotes:
+                remote.execScript(BENCH_SCRIPT, "python")
+        blocking_seconds = time.perf_counter() - start_time
+    finally:
+        for remote in blocking_remotes:
+            remote.close()
+
+    async def drive_endpoint(client):
+        try:
+            for _ in range(args.calls):
+                await client.execScript(BENCH_SCRIPT, "python")
+        finally:
+            await client.close()
+
+    async def drive_all():
+        clients = [lib_remote.AsyncRemotePainter(port=port, host="127.0.0.1") for port in ports]
+        await asyncio.gather(*(drive_endpoint(client) for client in clients))
+
+    start_time = time.perf_counter()
+    asyncio.run(drive_all())
+    async_seconds = time.perf_counter() - start_time
+
+    total_calls = args.calls * args.endpoints
+    print(f"  {'blocking RemotePainter, one endpoint at a time':<50} total {blocking_seconds:.2f}s   {total_calls / blocking_seconds:8.0f} calls/s")
+    print(f"  {'AsyncRemotePainter, all endpoints concurrently':<50} total {async_seconds:.2f}s   {total_calls / async_seconds:8.0f} calls/s")
+    print(f"\n  Speed-up: {blocking_seconds / async_seconds:.1f}x")
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark lib_remote's per-call overhead: new connections per step vs. one kept-alive connection.")
+    arg_parser.add_argument("--calls", type=int, default=2000, help="Calls per pattern (default: 2000).")
+    arg_parser.add_argument("--painter", action="store_true", help="Use a running Substance Painter instead of the local stand-in server.")
+    arg_parser.add_argument("--host", default="localhost", help="Painter's host for --painter (default: localhost).")
+    arg_parser.add_argument("--port", type=int, default=60041, help="Painter's remote scripting port for --painter (default: 60041).")
+    arg_parser.add_argument("--server-closes", action="store_true", help="Make the stand-in close every connection after one response.")
+    arg_parser.add_argument("--endpoints", type=int, default=0, help="Compare blocking and asyncio clients driving this many stand-in endpoints.")
+    arg_parser.add_argument("--script-ms", type=float, default=20.0, help="Time each stand-in spends per script with --endpoints (default: 20).")
+    args = arg_parser.parse_args()
+
+    if args.calls < 1:
+        print("ERROR: --calls must be at least 1.")
+        exit(1)
+    if args.endpoints:
+        run_endpoint_benchmark(args)
+    else:
+        run_benchmark(args)
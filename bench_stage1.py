@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+import lib_obj
+from bench_obj_io import make_grid_mesh
+
+# Benchmarks Stage 1 end to end: generates synthetic OBJ assets in the input_base_folder
+# layout, runs process_assets.py on them once per execution mode and reports throughput,
+# per-asset latency percentiles and orchestrator overhead. Blender is replaced by
+# bench_blender_stub.py unless --blender points at a real Blender executable.
+#
+#   python bench_stage1.py
+#   python bench_stage1.py --sizes 10k:20,100k:10 --modes worker,manifest --workers 4
+#   python bench_stage1.py --blender "C:\Program Files\Blender Foundation\Blender 4.3\blender.exe" --sizes 100k:4,1m:2
+
+REPO_FOLDER = os.path.dirname(os.path.abspath(__file__))
+PROCESS_ASSETS_SCRIPT = os.path.join(REPO_FOLDER, "process_assets.py")
+STUB_SCRIPT = os.path.join(REPO_FOLDER, "bench_blender_stub.py")
+EXECUTION_MODES = ["per_asset", "worker", "manifest"]
+SIZE_SUFFIXES = {"k": 1000, "m": 1000000}
+
+
+def parse_sizes(text):
+    """Parses "10k:8,1m:2" into [(10000, 8), (1000000, 2)]. A size without ":count" gets default_count later."""
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        size_text, _, count_text = part.partition(":")
+        multiplier = SIZE_SUFFIXES.get(size_text[-1], 1)
+        digits = size_text[:-1] if size_text[-1] in SIZE_SUFFIXES else size_text
+        sizes.append((int(float(digits) * multiplier), int(count_text) if count_text else None))
+    return sizes
+
+
+def format_face_count(faces):
+    if faces >= 1000000 and faces % 1000000 == 0:
+        return f"{faces // 1000000}m"
+    if faces >= 1000 and faces % 1000 == 0:
+        return f"{faces // 1000}k"
+    return str(faces)
+
+
+def generate_assets(input_folder, sizes, default_count, regenerate):
+    """Writes <input_folder>/S<size>_<i>/S<size>_<i>.obj for every requested size. Returns the asset count."""
+    os.makedirs(input_folder, exist_ok=True)
+    asset_count = 0
+    for faces, count in sizes:
+        for index in range(count or default_count):
+            asset_name = f"S{format_face_count(faces)}_{index:02d}"
+            obj_path = os.path.join(input_folder, asset_name, asset_name + ".obj")
+            asset_count += 1
+            if os.path.exists(obj_path) and not regenerate:
+                continue
+            os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+            start_time = time.perf_counter()
+            mesh = make_grid_mesh(faces, seed=index)
+            # The "# faces N" line lets bench_blender_stub.py size its simulated work without parsing the file.
+            lib_obj.write_obj(obj_path, mesh, header=f"bench_stage1 synthetic asset\nfaces {mesh.face_count}")
+            print(f"  Generated {asset_name} ({mesh.face_count:,} faces, {os.path.getsize(obj_path) / (1024 ** 2):.1f} MB) in {time.perf_counter() - start_time:.1f}s")
+    return asset_count
+
+
+def write_stub_launcher(work_folder):
+    """Wraps bench_blender_stub.py in an executable that process_assets.py can launch like Blender."""
+    if platform.system() == "Windows":
+        launcher_path = os.path.join(work_folder, "blender_stub.bat")
+        with open(launcher_path, 'w') as f:
+            f.write(f'@"{sys.executable}" "{STUB_SCRIPT}" %*\n')
+    else:
+        launcher_path = os.path.join(work_folder, "blender_stub.sh")
+        with open(launcher_path, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{STUB_SCRIPT}" "$@"\n')
+        os.chmod(launcher_path, 0o755)
+    return launcher_path
+
+
+def write_mode_config(work_folder, mode, blender_executable, workers):
+    """Writes a copy of config.json pointed at the benchmark folders and set to the given execution mode."""
+    with open(os.path.join(REPO_FOLDER, "config.json"), 'r') as f:
+        config = json.load(f)
+    config["global_paths"]["input_base_folder"] = os.path.join(work_folder, "Input")
+    config["global_paths"]["processed_objs_folder"] = os.path.join(work_folder, f"Meshes_{mode}")
+    config["global_paths"]["painter_output_base_folder"] = os.path.join(work_folder, "Output")
+    blender_settings = config["blender_settings"]
+    for key in ("executable_path_windows", "executable_path_macos", "executable_path_linux"):
+        blender_settings[key] = blender_executable
+    blender_settings["execution_mode"] = mode
+    blender_settings["max_workers"] = workers
+    config_path = os.path.join(work_folder, f"config_{mode}.json")
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    return config_path, config["global_paths"]["processed_objs_folder"]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers, or None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def latest_run_report(processed_folder):
+    reports_folder = os.path.join(processed_folder, "_pipeline", "reports")
+    if not os.path.isdir(reports_folder):
+        return None
+    report_files = sorted(name for name in os.listdir(reports_folder) if name.startswith("run_") and name.endswith(".json"))
+    if not report_files:
+        return None
+    with open(os.path.join(reports_folder, report_files[-1]), 'r') as f:
+        return json.load(f)
+
+
+def run_mode(work_folder, mode, blender_executable, workers, stub_environment):
+    """Runs process_assets.py --force in one execution mode and returns its benchmark row."""
+    config_path, processed_folder = write_mode_config(work_folder, mode, blender_executable, workers)
+    if os.path.isdir(processed_folder):
+        shutil.rmtree(processed_folder)
+    environment = dict(os.environ, PIPELINE_CONFIG=config_path, **stub_environment)
+    log_path = os.path.join(work_folder, f"process_assets_{mode}.log")
+
+    print(f"\nRunning process_assets.py in {mode} mode (log: {log_path})...")
+    start_time = time.monotonic()
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        return_code = subprocess.call([sys.executable, PROCESS_ASSETS_SCRIPT, "--force"], stdout=log_file,
+                                      stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, env=environment, cwd=REPO_FOLDER)
+    wall_seconds = time.monotonic() - start_time
+
+    report = latest_run_report(processed_folder)
+    if return_code != 0 or report is None:
+        print(f"  process_assets.py failed (exit code {return_code}). See {log_path}")
+        return {"mode": mode, "status": "error", "exit_code": return_code, "wall_seconds": wall_seconds, "log_file": log_path}
+
+    assets = report["assets"]
+    succeeded = [asset for asset in assets if asset["status"] == "processed"]
+    latencies = [asset["orchestrator_seconds"] for asset in succeeded]
+    blender_seconds = [asset["blender_seconds"] for asset in succeeded if asset["blender_seconds"] is not None]
+    # In manifest mode one Blender runs a whole batch, so orchestrator_seconds is per batch
+    # rather than per asset and the per-asset overhead below is not meaningful.
+    overheads = [asset["orchestrator_seconds"] - asset["blender_seconds"] for asset in succeeded
+                 if asset["blender_seconds"] is not None] if mode != "manifest" else []
+    run_seconds = report["run_seconds"]
+    row = {
+        "mode": mode,
+        "status": "ok",
+        "workers": report["max_workers"],
+        "assets": len(assets),
+        "succeeded": len(succeeded),
+        "wall_seconds": wall_seconds,
+        "run_seconds": run_seconds,
+        "setup_seconds": wall_seconds - run_seconds,
+        "assets_per_minute": len(succeeded) / run_seconds * 60 if run_seconds > 0 else None,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p90": percentile(latencies, 0.90),
+        "latency_p99": percentile(latencies, 0.99),
+        "latency_max": max(latencies) if latencies else None,
+        "overhead_p50": percentile(overheads, 0.50),
+        "overhead_p90": percentile(overheads, 0.90),
+        "blender_seconds_total": sum(blender_seconds),
+        # Share of the worker slots spent inside Blender's stages.
+        "worker_utilization": sum(blender_seconds) / (run_seconds * min(report["max_workers"], len(assets))) if run_seconds > 0 and assets else None,
+        "log_file": log_path,
+    }
+    print(f"  {row['succeeded']}/{row['assets']} assets in {run_seconds:.1f}s ({row['assets_per_minute']:.1f} assets/min)")
+    return row
+
+
+def format_seconds(value):
+    return f"{value:7.2f}" if value is not None else "    n/a"
+
+
+def print_summary(rows):
+    print("\n--- Stage 1 Benchmark ---")
+    print(f"{'mode':<10} {'assets':>7} {'run s':>7} {'setup s':>7} {'a/min':>7} {'p50 s':>7} {'p90 s':>7} {'p99 s':>7} {'max s':>7} {'ovh p50':>7} {'ovh p90':>7} {'util':>6}")
+    for row in rows:
+        if row["status"] != "ok":
+            print(f"{row['mode']:<10} failed (exit code {row['exit_code']}), see {row['log_file']}")
+            continue
+        utilization = f"{row['worker_utilization'] * 100:5.0f}%" if row["worker_utilization"] is not None else "   n/a"
+        print(f"{row['mode']:<10} {row['succeeded']:>3}/{row['assets']:<3} {format_seconds(row['run_seconds'])} {format_seconds(row['setup_seconds'])} "
+              f"{format_seconds(row['assets_per_minute'])} {format_seconds(row['latency_p50'])} {format_seconds(row['latency_p90'])} "
+              f"{format_seconds(row['latency_p99'])} {format_seconds(row['latency_max'])} {format_seconds(row['overhead_p50'])} "
+              f"{format_seconds(row['overhead_p90'])} {utilization}")
+    print("Latency is process_assets.py's time per asset (per batch in manifest mode); overhead is that time minus Blender's own.")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark Stage 1 (process_assets.py) on synthetic assets.")
+    arg_parser.add_argument("--work-folder", default=os.path.join(REPO_FOLDER, "_bench_stage1"), help="Where assets, configs, outputs and logs are written.")
+    arg_parser.add_argument("--sizes", default="10k:8,100k:4,1m:2,10m:1",
+                            help="Comma-separated face counts, each with an optional :count (default: 10k:8,100k:4,1m:2,10m:1).")
+    arg_parser.add_argument("--assets-per-size", type=int, default=2, help="Assets per size when --sizes gives no count.")
+    arg_parser.add_argument("--modes", default=",".join(EXECUTION_MODES), help="Execution modes to benchmark (default: all).")
+    arg_parser.add_argument("--workers", type=int, default=0, help="max_workers for every run (default: 0, one per CPU core).")
+    arg_parser.add_argument("--blender", help="Run a real Blender executable instead of bench_blender_stub.py.")
+    arg_parser.add_argument("--stub-startup", type=float, default=1.0, help="Stub: simulated Blender startup seconds.")
+    arg_parser.add_argument("--stub-seconds-per-asset", type=float, default=0.2, help="Stub: simulated fixed seconds per asset.")
+    arg_parser.add_argument("--stub-seconds-per-million-faces", type=float, default=4.0, help="Stub: simulated seconds per million faces.")
+    arg_parser.add_argument("--regenerate", action="store_true", help="Regenerate assets that already exist in the work folder.")
+    args = arg_parser.parse_args()
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    for mode in modes:
+        if mode not in EXECUTION_MODES:
+            print(f"ERROR: Unknown execution mode '{mode}'. Use one of: {', '.join(EXECUTION_MODES)}")
+            exit(1)
+    try:
+        sizes = parse_sizes(args.sizes)
+    except (ValueError, IndexError):
+        print(f"ERROR: Could not parse --sizes '{args.sizes}'. Example: 10k:8,1m:2")
+        exit(1)
+
+    work_folder = os.path.abspath(args.work_folder)
+    os.makedirs(work_folder, exist_ok=True)
+    print(f"Generating synthetic assets in {os.path.join(work_folder, 'Input')}...")
+    asset_count = generate_assets(os.path.join(work_folder, "Input"), sizes, args.assets_per_size, args.regenerate)
+    print(f"{asset_count} asset(s) ready.")
+
+    if args.blender:
+        blender_executable = args.blender
+        stub_environment = {}
+        print(f"Using Blender: {blender_executable}")
+    else:
+        blender_executable = write_stub_launcher(work_folder)
+        stub_environment = {
+            "BENCH_STUB_STARTUP_SECONDS": str(args.stub_startup),
+            "BENCH_STUB_SECONDS_PER_ASSET": str(args.stub_seconds_per_asset),
+            "BENCH_STUB_SECONDS_PER_MILLION_FACES": str(args.stub_seconds_per_million_faces),
+        }
+        print(f"Using the Blender stub ({args.stub_startup}s startup, {args.stub_seconds_per_asset}s per asset, "
+              f"{args.stub_seconds_per_million_faces}s per million faces)")
+
+    rows = [run_mode(work_folder, mode, blender_executable, args.workers, stub_environment) for mode in modes]
+    print_summary(rows)
+
+    summary_path = os.path.join(work_folder, f"bench_stage1_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(summary_path, 'w') as f:
+        json.dump({"generated_at": time.strftime("%Y-%m-%d %H:%M:%S"), "sizes": args.sizes, "blender": args.blender or "stub",
+                   "stub": stub_environment, "results": rows}, f, indent=2)
+    print(f"\nSummary written to {summary_path}")
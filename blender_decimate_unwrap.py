@@ -3,10 +3,25 @@ import sys
 import argparse
 import math # For math.radians
 import os   # For path manipulation
+import json # For the --worker job protocol
+import time # For per-job and per-stage timing
+import contextlib # For StageRecorder.stage
+import platform # For picking the peak-memory probe
+import array # For reading polygon sizes and areas in bulk
 
 # --- NO DEFAULT VALUES IN THIS SCRIPT ---
 # All operational parameters must be provided via command-line arguments.
 
+# Prefix of the line a --worker process prints after each job. Must match process_assets.py.
+WORKER_RESULT_PREFIX = "@@PIPELINE_WORKER_RESULT@@ "
+# Prefix of the line printed before each --manifest job, so the orchestrator can split the log per asset. Must match process_assets.py.
+JOB_START_PREFIX = "@@PIPELINE_JOB_START@@ "
+
+
+class MeshProcessingError(Exception):
+    """Raised when a mesh cannot be processed. Fatal for a single-asset run, not for a --worker run."""
+    pass
+
 def str_to_bool(val):
     if isinstance(val, bool): return val
     # Ensure val is a string before calling .lower()
@@ -16,6 +31,114 @@ def str_to_bool(val):
     raise argparse.ArgumentTypeError(f"Boolean value expected, got '{val}' of type {type(val)}")
 
 
+def reset_peak_memory():
+    """Resets the process's peak RSS counter where the OS allows it (Linux). Returns True on success."""
+    try:
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory_bytes():
+    """Returns the process's peak resident memory in bytes, or None if it cannot be read."""
+    system_name = platform.system()
+    if system_name == "Linux":
+        try:
+            with open("/proc/self/status", 'r') as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    if system_name == "Windows":
+        import ctypes
+        import ctypes.wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", ctypes.wintypes.DWORD), ("PageFaultCount", ctypes.wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process_handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process_handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+        return None
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if system_name == "Darwin" else max_rss * 1024 # macOS reports bytes, others KiB
+    except ImportError:
+        return None
+
+
+def mesh_counts(obj):
+    """Returns {"vertices": n, "faces": n} for a mesh object, or None."""
+    try:
+        if obj is None or obj.type != 'MESH':
+            return None
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode() # Edit-mode changes are not in obj.data until synced
+        return {"vertices": len(obj.data.vertices), "faces": len(obj.data.polygons)}
+    except ReferenceError: # Object was deleted
+        return None
+
+
+class StageRecorder:
+    """Collects wall time, peak memory and mesh counts for each step of process_mesh.
+
+    Peak memory is the peak during the step where the OS lets us reset the
+    counter (Linux, "peak_rss_scope": "stage"), otherwise the process peak so
+    far ("peak_rss_scope": "process").
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.decimation = None # Set by process_mesh: how the Decimate ratio was chosen and what it achieved
+
+    @contextlib.contextmanager
+    def stage(self, name, obj=None):
+        """Times the enclosed block. Set entry["object"] inside the block if the step creates the object."""
+        entry = {"name": name, "status": "ok", "before": mesh_counts(obj)}
+        peak_scope = "stage" if reset_peak_memory() else "process"
+        start_time = time.perf_counter()
+        try:
+            yield entry
+        except BaseException:
+            entry["status"] = "error"
+            raise
+        finally:
+            entry["wall_seconds"] = time.perf_counter() - start_time
+            entry["peak_rss_bytes"] = peak_memory_bytes()
+            entry["peak_rss_scope"] = peak_scope
+            entry["after"] = mesh_counts(entry.pop("object", obj))
+            self.stages.append(entry)
+            print(f"    [stage] {name}: {entry['wall_seconds']:.2f}s ({entry['status']})", flush=True)
+
+    def write(self, stats_file_path, asset_name, input_path, total_seconds, status):
+        stats = {
+            "asset_name": asset_name,
+            "input_mesh": input_path,
+            "status": status,
+            "total_seconds": total_seconds,
+            "stages": self.stages,
+            "decimation": self.decimation,
+        }
+        try:
+            os.makedirs(os.path.dirname(stats_file_path), exist_ok=True)
+            temp_path = stats_file_path + ".tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(stats, f, indent=2)
+            os.replace(temp_path, stats_file_path)
+        except OSError as e:
+            print(f"  Warning: Could not write stats file '{stats_file_path}': {e}")
+
+
 def _obj_export_core(obj_to_export, filepath_to_save):
     print(f"    Core Export: Exporting {obj_to_export.name} to {filepath_to_save}")
     # Ensure output directory exists
@@ -27,7 +150,49 @@ def _obj_export_core(obj_to_export, filepath_to_save):
     print(f"    Core Export: Successfully exported {obj_to_export.name} to {filepath_to_save}")
 
 
-def export_object_as_obj(obj_to_export, filepath_to_save, exit_on_error=False):
+def _fbx_export_core(obj_to_export, filepath_to_save):
+    print(f"    Core Export: Exporting {obj_to_export.name} to {filepath_to_save} (binary FBX)")
+    os.makedirs(os.path.dirname(filepath_to_save), exist_ok=True)
+    # apply_unit_scale=False keeps the coordinates as the OBJ exporter writes them, so Painter
+    # lines the high-poly mesh up with the _low.obj it bakes onto.
+    bpy.ops.export_scene.fbx(
+        filepath=filepath_to_save,
+        use_selection=True,
+        object_types={'MESH'},
+        apply_unit_scale=False,
+        apply_scale_options='FBX_SCALE_NONE',
+        use_mesh_modifiers=False,
+        add_leaf_bones=False,
+        bake_anim=False,
+        path_mode='AUTO',
+    )
+    print(f"    Core Export: Successfully exported {obj_to_export.name} to {filepath_to_save}")
+
+
+def _glb_export_core(obj_to_export, filepath_to_save):
+    print(f"    Core Export: Exporting {obj_to_export.name} to {filepath_to_save} (GLB)")
+    os.makedirs(os.path.dirname(filepath_to_save), exist_ok=True)
+    bpy.ops.export_scene.gltf(
+        filepath=filepath_to_save,
+        export_format='GLB',
+        use_selection=True,
+        export_yup=True,
+        export_apply=False,
+        export_materials='NONE',
+        export_animations=False,
+    )
+    print(f"    Core Export: Successfully exported {obj_to_export.name} to {filepath_to_save}")
+
+
+# Exporters for the high-poly mesh, by --high_format.
+EXPORT_CORES = {
+    "obj": _obj_export_core,
+    "fbx": _fbx_export_core,
+    "glb": _glb_export_core,
+}
+
+
+def export_object(obj_to_export, filepath_to_save, raise_on_error=False, file_format="obj"):
     print(f"  Preparing to export '{obj_to_export.name}' to '{filepath_to_save}'...")
 
     original_mode = None
@@ -39,8 +204,8 @@ def export_object_as_obj(obj_to_export, filepath_to_save, exit_on_error=False):
     original_selection_names = [obj.name for obj in bpy.context.selected_objects]
 
     if not obj_to_export:
-        print(f"  ERROR: obj_to_export is None in export_object_as_obj. Cannot export.")
-        if exit_on_error: sys.exit(1)
+        print(f"  ERROR: obj_to_export is None in export_object. Cannot export.")
+        if raise_on_error: raise MeshProcessingError("No object to export.")
         return
 
     try:
@@ -58,11 +223,11 @@ def export_object_as_obj(obj_to_export, filepath_to_save, exit_on_error=False):
         bpy.context.view_layer.objects.active = obj_to_export
         obj_to_export.select_set(True)
         
-        _obj_export_core(obj_to_export, filepath_to_save)
+        EXPORT_CORES[file_format](obj_to_export, filepath_to_save)
 
     except Exception as e:
         print(f"  ERROR exporting '{obj_to_export.name}' to '{filepath_to_save}': {e}")
-        if exit_on_error:
+        if raise_on_error:
             if mode_switched_for_export and original_mode and obj_to_export and obj_to_export == bpy.context.active_object:
                 try:
                     bpy.ops.object.mode_set(mode=original_mode)
@@ -78,7 +243,7 @@ def export_object_as_obj(obj_to_export, filepath_to_save, exit_on_error=False):
                         bpy.context.view_layer.objects.active = original_active
             except Exception as restore_e:
                  print(f"    Warning: Exception during context restoration after export error: {restore_e}")
-            sys.exit(1)
+            raise MeshProcessingError(f"Export of '{obj_to_export.name}' to '{filepath_to_save}' failed: {e}")
     finally:
         if mode_switched_for_export and original_mode and obj_to_export and obj_to_export == bpy.context.active_object:
             try:
@@ -102,27 +267,111 @@ def export_object_as_obj(obj_to_export, filepath_to_save, exit_on_error=False):
                 except Exception as restore_e:
                     print(f"    Warning: Exception during final context restoration: {restore_e}")
 
+def mesh_triangles_and_area(obj):
+    """Returns (triangle count, surface area) of a mesh object in Object Mode; n-gons count as n - 2 triangles."""
+    polygons = obj.data.polygons
+    loop_totals = array.array('i', bytes(4 * len(polygons)))
+    areas = array.array('f', bytes(4 * len(polygons)))
+    polygons.foreach_get("loop_total", loop_totals)
+    polygons.foreach_get("area", areas)
+    return sum(loop_totals) - 2 * len(polygons), sum(areas)
+
+
+def resolve_decimate_ratio(obj, decimate_mode, decimate_ratio_val, target_triangles_val, triangles_per_area_val,
+                           min_decimate_ratio_val, max_decimate_ratio_val):
+    """Works out the Decimate ratio for obj. Returns the decimation summary recorded in the stats file.
+
+    "ratio" uses decimate_ratio_val as is. "triangles" aims at target_triangles_val triangles,
+    "density" at triangles_per_area_val triangles per square unit of the scaled mesh's surface.
+    The budget modes clamp the ratio to [min_decimate_ratio_val, max_decimate_ratio_val].
+    """
+    source_triangles, surface_area = mesh_triangles_and_area(obj)
+    decimation = {"mode": decimate_mode, "source_triangles": source_triangles, "surface_area": surface_area,
+                  "target_triangles": None, "clamped": False, "ratio": decimate_ratio_val, "achieved_triangles": None}
+    if decimate_mode == "ratio":
+        return decimation
+
+    if decimate_mode == "triangles":
+        target_triangles = target_triangles_val
+    else: # "density"
+        target_triangles = max(1, int(round(surface_area * triangles_per_area_val)))
+    unclamped_ratio = target_triangles / max(1, source_triangles)
+    ratio = min(max_decimate_ratio_val, max(min_decimate_ratio_val, unclamped_ratio))
+    decimation.update(target_triangles=target_triangles, ratio=ratio, clamped=ratio != unclamped_ratio)
+    print(f"  Triangle budget ({decimate_mode}): {source_triangles:,} -> {target_triangles:,} triangles "
+          f"(surface area {surface_area:.2f}), Decimate ratio {ratio:.4f}{' (clamped)' if decimation['clamped'] else ''}.")
+    return decimation
+
+
+def smart_uv_unwrap(obj, stage_recorder,
+                    sp_angle_degrees_val, sp_island_margin_val, sp_area_weight_val,
+                    sp_correct_aspect_val, sp_scale_to_bounds_val, sp_margin_method_val,
+                    sp_rotate_method_val, uv_fill_holes_val, stage_suffix=""):
+    """Clears seams, optionally fills holes and runs Smart UV Project on obj. Leaves obj in Edit Mode."""
+    print("  Entering Edit Mode for UV operations...")
+    with stage_recorder.stage(f"uv_prepare{stage_suffix}", obj):
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='SELECT')
+        print("    Clearing any pre-existing seams...")
+        bpy.ops.mesh.mark_seam(clear=True)
+
+        if uv_fill_holes_val:
+            print("    Filling holes...")
+            try:
+                bpy.ops.mesh.fill_holes()
+                bpy.ops.mesh.select_all(action='SELECT') # Re-select after fill holes
+                print("    Holes filled.")
+            except RuntimeError as e: print(f"    Warning: Could not fill holes: {e}")
+
+    print("  Performing Smart UV Project...")
+    sp_angle_radians_val = math.radians(sp_angle_degrees_val)
+    print(f"    (Using angle_limit: {sp_angle_radians_val:.4f} rad for Smart Project)")
+    with stage_recorder.stage(f"smart_uv_project{stage_suffix}", obj):
+        try:
+            bpy.ops.uv.smart_project(
+                angle_limit=sp_angle_radians_val, island_margin=sp_island_margin_val,
+                area_weight=sp_area_weight_val, correct_aspect=sp_correct_aspect_val,
+                scale_to_bounds=sp_scale_to_bounds_val, margin_method=sp_margin_method_val,
+                rotate_method=sp_rotate_method_val
+            )
+        except Exception as e:
+            print(f"  Error during Smart UV Project: {e}")
+            if bpy.context.mode != 'OBJECT': bpy.ops.object.mode_set(mode='OBJECT')
+            raise MeshProcessingError(f"Smart UV Project failed: {e}")
+    print("  Smart UV Project complete.") 
+
+
 def process_mesh(input_path_original_obj, output_path_low_poly_mesh,
                  decimate_ratio_val, scale_factor_val,
                  sp_angle_degrees_val, sp_island_margin_val, sp_area_weight_val,
                  sp_correct_aspect_val, sp_scale_to_bounds_val, sp_margin_method_val,
                  sp_rotate_method_val,
-                 apply_original_scale_val, uv_fill_holes_val):
+                 apply_original_scale_val, uv_fill_holes_val,
+                 blend_save_path=None, high_poly_export_path=None,
+                 stage_recorder=None, skip_high_export=False, high_poly_format="obj",
+                 lod_targets=None, lod_output_paths=None, lod_uv_mode="reuse",
+                 decimate_mode="ratio", target_triangles_val=None, triangles_per_area_val=None,
+                 min_decimate_ratio_val=0.0, max_decimate_ratio_val=1.0):
 
     print(f"Blender script (blender_decimate_unwrap.py): Processing original obj: {input_path_original_obj}")
     print(f"  Output for low poly mesh (_low) will be: {output_path_low_poly_mesh}")
     print(f"  Parameters: Decimate Ratio: {decimate_ratio_val}, Scale Factor: {scale_factor_val}, SP Angle: {sp_angle_degrees_val}, etc.")
     print("-" * 30)
 
-    # Derive .blend and _high.obj paths from the input_path_original_obj
+    # Without explicit paths, derive .blend and _high paths from the input_path_original_obj
     base_dir = os.path.dirname(input_path_original_obj)
     base_name_no_ext = os.path.splitext(os.path.basename(input_path_original_obj))[0]
-    
-    blend_save_path = os.path.join(base_dir, f"{base_name_no_ext}.blend")
-    high_poly_export_path = os.path.join(base_dir, f"{base_name_no_ext}_high.obj")
+
+    if not blend_save_path:
+        blend_save_path = os.path.join(base_dir, f"{base_name_no_ext}.blend")
+    if not high_poly_export_path:
+        high_poly_export_path = os.path.join(base_dir, f"{base_name_no_ext}_high.{high_poly_format}")
 
     print(f"  Intermediate .blend save path: {blend_save_path}")
-    print(f"  Intermediate _high.obj export path: {high_poly_export_path}")
+    print(f"  Intermediate _high.{high_poly_format} export path: {high_poly_export_path}")
+
+    if stage_recorder is None:
+        stage_recorder = StageRecorder()
 
     # --- Initial Scene Setup ---
     if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
@@ -133,32 +382,47 @@ def process_mesh(input_path_original_obj, output_path_low_poly_mesh,
 
     # --- Import Original OBJ ---
     print(f"  Attempting to import Original OBJ: {input_path_original_obj}")
-    try:
-        bpy.ops.wm.obj_import(filepath=input_path_original_obj)
-    except Exception as e:
-        print(f"  ERROR importing OBJ '{input_path_original_obj}': {e}")
-        sys.exit(1)
-    print("  Original OBJ import successful.")
+    with stage_recorder.stage("obj_import") as stage:
+        try:
+            bpy.ops.wm.obj_import(filepath=input_path_original_obj)
+        except Exception as e:
+            print(f"  ERROR importing OBJ '{input_path_original_obj}': {e}")
+            raise MeshProcessingError(f"Import of '{input_path_original_obj}' failed: {e}")
+        print("  Original OBJ import successful.")
+
+        imported_obj = None
+        imported_meshes = [obj for obj in bpy.context.selected_objects if obj.type == 'MESH']
+        if imported_meshes:
+            imported_obj = imported_meshes[0]
+        elif bpy.context.selected_objects:
+            imported_obj = bpy.context.selected_objects[0]
+        else:
+            mesh_objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+            if mesh_objects: imported_obj = mesh_objects[-1]
+
+        if len(imported_meshes) > 1:
+            # An OBJ with several objects ('o'/'g' lines) imports as several; join them so no part is dropped.
+            bpy.ops.object.select_all(action='DESELECT')
+            for obj in imported_meshes: obj.select_set(True)
+            bpy.context.view_layer.objects.active = imported_obj
+            bpy.ops.object.join()
+            print(f"  Joined {len(imported_meshes)} imported objects into '{imported_obj.name}'.")
+        stage["object"] = imported_obj
 
-    imported_obj = None
-    if bpy.context.selected_objects:
-        imported_obj = bpy.context.selected_objects[0]
-    else:
-        mesh_objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
-        if mesh_objects: imported_obj = mesh_objects[-1]
-    
     if not imported_obj or imported_obj.type != 'MESH':
         print(f"  Error: No MESH object found/selected after import (Name: {imported_obj.name if imported_obj else 'None'}, Type: {imported_obj.type if imported_obj else 'None'}).")
-        sys.exit(1)
-    
+        raise MeshProcessingError("No MESH object found after import.")
+
     bpy.context.view_layer.objects.active = imported_obj
     imported_obj.select_set(True)
     print(f"  Successfully selected imported object: {imported_obj.name}")
+    original_face_count = len(imported_obj.data.polygons) # LOD ratios are relative to this
 
     # --- Scale Operations ---
     if apply_original_scale_val:
         print("  Applying original object scale (if any)...")
-        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
+        with stage_recorder.stage("apply_original_scale", imported_obj):
+            bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
         print("  Original scale applied.")
 
     print(f"  Scaling object by factor of {scale_factor_val}...")
@@ -166,104 +430,317 @@ def process_mesh(input_path_original_obj, output_path_low_poly_mesh,
     print("  Scale operation complete.")
 
     print(f"  Applying {scale_factor_val}x scale transformation...")
-    bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
+    with stage_recorder.stage("apply_scale_factor", imported_obj):
+        bpy.ops.object.transform_apply(location=False, rotation=False, scale=True)
     print(f"  {scale_factor_val}x scale applied and baked into mesh.")
 
     # --- Save .blend file (scaled, pre-decimation) ---
     print(f"  Saving .blend file to: {blend_save_path}")
-    try:
-        os.makedirs(os.path.dirname(blend_save_path), exist_ok=True)
-        bpy.ops.wm.save_as_mainfile(filepath=blend_save_path)
-        print("  .blend file saved successfully.")
-    except Exception as e:
-        print(f"  ERROR saving .blend file '{blend_save_path}': {e}")
+    with stage_recorder.stage("save_blend", imported_obj) as stage:
+        try:
+            os.makedirs(os.path.dirname(blend_save_path), exist_ok=True)
+            bpy.ops.wm.save_as_mainfile(filepath=blend_save_path)
+            print("  .blend file saved successfully.")
+        except Exception as e:
+            stage["status"] = "error"
+            print(f"  ERROR saving .blend file '{blend_save_path}': {e}")
 
-    # --- Export _high.obj (scaled, pre-decimation) ---
-    print(f"  Exporting scaled mesh as _high.obj to: {high_poly_export_path}")
-    export_object_as_obj(imported_obj, high_poly_export_path, exit_on_error=True)
-    print("  _high.obj exported successfully.")
+    # --- Export _high mesh (scaled, pre-decimation) ---
+    if skip_high_export:
+        print(f"  Skipping _high.obj export; process_assets.py writes it outside Blender.")
+    else:
+        print(f"  Exporting scaled mesh as _high.{high_poly_format} to: {high_poly_export_path}")
+        with stage_recorder.stage("export_high", imported_obj):
+            export_object(imported_obj, high_poly_export_path, raise_on_error=True, file_format=high_poly_format)
+        print(f"  _high.{high_poly_format} exported successfully.")
 
     # --- Decimation ---
     print("  Applying Decimate modifier...")
-    mod = imported_obj.modifiers.new(name="Decimate", type='DECIMATE')
-    mod.decimate_type = 'COLLAPSE'
-    mod.ratio = decimate_ratio_val
-    try:
-        bpy.ops.object.modifier_apply(modifier=mod.name)
-    except RuntimeError as e:
-        print(f"  Error applying Decimate modifier: {e}")
-        sys.exit(1)
-    print("  Decimation complete.")
+    with stage_recorder.stage("decimate", imported_obj):
+        decimation = resolve_decimate_ratio(imported_obj, decimate_mode, decimate_ratio_val, target_triangles_val,
+                                            triangles_per_area_val, min_decimate_ratio_val, max_decimate_ratio_val)
+        mod = imported_obj.modifiers.new(name="Decimate", type='DECIMATE')
+        mod.decimate_type = 'COLLAPSE'
+        mod.ratio = decimation["ratio"]
+        try:
+            bpy.ops.object.modifier_apply(modifier=mod.name)
+        except RuntimeError as e:
+            print(f"  Error applying Decimate modifier: {e}")
+            raise MeshProcessingError(f"Decimate modifier failed: {e}")
+        decimation["achieved_triangles"] = mesh_triangles_and_area(imported_obj)[0]
+        stage_recorder.decimation = decimation
+    print(f"  Decimation complete ({decimation['achieved_triangles']:,} triangles).")
 
     # --- UV Operations ---
-    print("  Entering Edit Mode for UV operations...")
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    print("    Clearing any pre-existing seams...")
-    bpy.ops.mesh.mark_seam(clear=True)
+    smart_uv_unwrap(imported_obj, stage_recorder,
+                    sp_angle_degrees_val, sp_island_margin_val, sp_area_weight_val,
+                    sp_correct_aspect_val, sp_scale_to_bounds_val, sp_margin_method_val,
+                    sp_rotate_method_val, uv_fill_holes_val)
 
-    if uv_fill_holes_val:
-        print("    Filling holes...")
-        try:
-            bpy.ops.mesh.fill_holes()
-            bpy.ops.mesh.select_all(action='SELECT') # Re-select after fill holes
-            print("    Holes filled.")
-        except RuntimeError as e: print(f"    Warning: Could not fill holes: {e}")
+    # --- Export _low.obj (decimated, UV unwrapped) ---
+    print(f"  Exporting decimated and unwrapped mesh as _low.obj to: {output_path_low_poly_mesh}")
+    with stage_recorder.stage("export_low", imported_obj):
+        export_object(imported_obj, output_path_low_poly_mesh, raise_on_error=True)
 
-    print("  Performing Smart UV Project...")
-    sp_angle_radians_val = math.radians(sp_angle_degrees_val)
-    print(f"    (Using angle_limit: {sp_angle_radians_val:.4f} rad for Smart Project)")
+    # --- LOD chain (_lod1.obj, _lod2.obj, ...), each decimated from the previous level ---
+    if lod_targets:
+        export_lod_chain(imported_obj, stage_recorder, original_face_count, lod_targets, lod_output_paths, lod_uv_mode,
+                         (sp_angle_degrees_val, sp_island_margin_val, sp_area_weight_val,
+                          sp_correct_aspect_val, sp_scale_to_bounds_val, sp_margin_method_val,
+                          sp_rotate_method_val, uv_fill_holes_val))
+
+    print(f"Blender script: Successfully processed. Final low poly mesh saved to '{output_path_low_poly_mesh}'.")
+
+
+def lod_target_face_count(lod_target, original_face_count):
+    """A LOD target is a ratio of the original face count (<= 1) or an absolute face count (> 1)."""
+    if lod_target <= 1:
+        return max(1, int(round(original_face_count * lod_target)))
+    return int(lod_target)
+
+
+def export_lod_chain(obj, stage_recorder, original_face_count, lod_targets, lod_output_paths, lod_uv_mode, uv_params):
+    """Decimates obj further for each LOD target, in order, and exports every level.
+
+    Each level starts from the previous one (the _low mesh for LOD 1), so the whole chain costs
+    about one extra decimation of the _low mesh instead of a fresh import per level. With
+    lod_uv_mode "reuse" the _low mesh's UVs are carried down the chain by the Decimate modifier;
+    with "unwrap" each level gets its own Smart UV Project.
+    """
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for lod_level, (lod_target, lod_output_path) in enumerate(zip(lod_targets, lod_output_paths), start=1):
+        current_face_count = len(obj.data.polygons)
+        target_face_count = lod_target_face_count(lod_target, original_face_count)
+        step_ratio = min(1.0, target_face_count / max(1, current_face_count))
+        print(f"  LOD {lod_level}: {current_face_count:,} -> ~{target_face_count:,} faces (decimate ratio {step_ratio:.4f} from LOD {lod_level - 1}).")
+        if step_ratio >= 1.0:
+            print(f"    Warning: LOD {lod_level} target is not below the previous level; exporting it unchanged.")
+        else:
+            with stage_recorder.stage(f"decimate_lod{lod_level}", obj):
+                mod = obj.modifiers.new(name=f"Decimate_LOD{lod_level}", type='DECIMATE')
+                mod.decimate_type = 'COLLAPSE'
+                mod.ratio = step_ratio
+                try:
+                    bpy.ops.object.modifier_apply(modifier=mod.name)
+                except RuntimeError as e:
+                    print(f"  Error applying Decimate modifier for LOD {lod_level}: {e}")
+                    raise MeshProcessingError(f"Decimate modifier failed for LOD {lod_level}: {e}")
+
+        if lod_uv_mode == "unwrap":
+            smart_uv_unwrap(obj, stage_recorder, *uv_params, stage_suffix=f"_lod{lod_level}")
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        print(f"  Exporting LOD {lod_level} to: {lod_output_path}")
+        with stage_recorder.stage(f"export_lod{lod_level}", obj):
+            export_object(obj, lod_output_path, raise_on_error=True)
+
+
+def reset_scene():
+    """Returns Blender to an empty scene so each job of a --worker or --manifest run starts from a clean state."""
+    if bpy.context.active_object and bpy.context.active_object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Blender: Import, Scale, Save .blend & _high.obj, Decimate, Smart UV Unwrap, and Export _low.obj (plus optional LODs).")
+
+    parser.add_argument("--worker", action="store_true", help="Stay running and read one JSON job per line from stdin instead of processing a single mesh.")
+    parser.add_argument("--manifest", type=str, help="Path to a JSON manifest listing many jobs to run in this Blender session.")
+    parser.add_argument("--input_mesh", type=str, help="Input path for the original OBJ mesh (e.g., 'Meshes/MyModel.obj').")
+    parser.add_argument("--output_mesh", type=str, help="Output path for the final low poly mesh (e.g., 'Meshes/MyModel_low.obj').")
+    parser.add_argument("--blend_output", type=str, help="Optional output path for the .blend file. Defaults to the input path with a .blend extension.")
+    parser.add_argument("--high_output", type=str, help="Optional output path for the high-poly mesh. Defaults to '<input name>_high.<high_format>' next to the input.")
+    parser.add_argument("--result_file", type=str, help="Optional path of a JSON file to write this job's result to.")
+    parser.add_argument("--stats_output", type=str, help="Optional path of a JSON sidecar for per-stage timings, peak memory and mesh counts.")
+    parser.add_argument("--high_format", type=str, choices=list(EXPORT_CORES), default="obj", help="File format of the high-poly export (default: obj).")
+    parser.add_argument("--skip_high_export", action="store_true", help="Do not export _high.obj (it is written by process_assets.py instead).")
+    parser.add_argument("--lod_targets", type=float, nargs="+", help="LOD chain after _low: per level, a ratio of the original face count (<= 1) or a face count (> 1).")
+    parser.add_argument("--lod_outputs", type=str, nargs="+", help="Output path of each LOD in --lod_targets (e.g. 'Meshes/MyModel_lod1.obj').")
+    parser.add_argument("--lod_uv_mode", type=str, choices=["reuse", "unwrap"], default="reuse", help="'reuse': LODs keep the _low mesh's UVs. 'unwrap': Smart UV Project each LOD again.")
+
+    # All operational parameters are required for a mesh job (checked in check_job_args)
+    parser.add_argument("--decimate_ratio", type=float)
+    parser.add_argument("--decimate_mode", type=str, choices=["ratio", "triangles", "density"], default="ratio",
+                        help="'ratio': use --decimate_ratio. 'triangles': aim at --target_triangles. 'density': aim at --triangles_per_area.")
+    parser.add_argument("--target_triangles", type=int, help="Triangle count the _low mesh should have ('triangles' mode).")
+    parser.add_argument("--triangles_per_area", type=float, help="Triangles per square unit of the scaled mesh's surface ('density' mode).")
+    parser.add_argument("--min_decimate_ratio", type=float, default=0.0, help="Lowest Decimate ratio the budget modes may use.")
+    parser.add_argument("--max_decimate_ratio", type=float, default=1.0, help="Highest Decimate ratio the budget modes may use.")
+    parser.add_argument("--scale_factor", type=float, help="Factor by which to scale the model.")
+    parser.add_argument("--sp_angle", type=float)
+    parser.add_argument("--sp_margin", type=float)
+    parser.add_argument("--sp_area_weight", type=float)
+    parser.add_argument("--sp_correct_aspect", type=str_to_bool)
+    parser.add_argument("--sp_scale_to_bounds", type=str_to_bool)
+    parser.add_argument("--sp_margin_method", type=str, choices=['SCALED', 'ABSOLUTE', 'FRACTION'])
+    parser.add_argument("--sp_rotate_method", type=str, choices=['AXIS_ALIGNED', 'AXIS_ALIGNED_X', 'AXIS_ALIGNED_Y'])
+    parser.add_argument("--uv_fill_holes", type=str_to_bool)
+    parser.add_argument("--apply_scale", type=str_to_bool, help="Apply scale of the original imported model before main scaling.")
+    return parser
+
+
+REQUIRED_JOB_ARGS = [
+    "input_mesh", "output_mesh", "decimate_ratio", "scale_factor",
+    "sp_angle", "sp_margin", "sp_area_weight", "sp_correct_aspect", "sp_scale_to_bounds",
+    "sp_margin_method", "sp_rotate_method", "uv_fill_holes", "apply_scale",
+]
+
+
+def check_job_args(parser, args):
+    missing = [f"--{name}" for name in REQUIRED_JOB_ARGS if getattr(args, name) is None]
+    if missing:
+        parser.error(f"the following arguments are required: {', '.join(missing)}")
+    if len(args.lod_targets or []) != len(args.lod_outputs or []):
+        parser.error("--lod_targets and --lod_outputs need the same number of values")
+    if any(lod_target <= 0 for lod_target in args.lod_targets or []):
+        parser.error("--lod_targets values must be positive")
+    if args.decimate_mode == "triangles" and not (args.target_triangles and args.target_triangles > 0):
+        parser.error("--decimate_mode triangles needs a positive --target_triangles")
+    if args.decimate_mode == "density" and not (args.triangles_per_area and args.triangles_per_area > 0):
+        parser.error("--decimate_mode density needs a positive --triangles_per_area")
+    if not 0.0 <= args.min_decimate_ratio <= args.max_decimate_ratio <= 1.0:
+        parser.error("--min_decimate_ratio and --max_decimate_ratio must satisfy 0 <= min <= max <= 1")
+
+
+def run_job_from_args(args, stage_recorder=None):
+    process_mesh(
+        args.input_mesh, args.output_mesh,
+        args.decimate_ratio, args.scale_factor,
+        args.sp_angle, args.sp_margin, args.sp_area_weight,
+        args.sp_correct_aspect, args.sp_scale_to_bounds, args.sp_margin_method,
+        args.sp_rotate_method,
+        args.apply_scale, args.uv_fill_holes,
+        blend_save_path=args.blend_output, high_poly_export_path=args.high_output,
+        stage_recorder=stage_recorder, skip_high_export=args.skip_high_export,
+        high_poly_format=args.high_format,
+        lod_targets=args.lod_targets, lod_output_paths=args.lod_outputs, lod_uv_mode=args.lod_uv_mode,
+        decimate_mode=args.decimate_mode, target_triangles_val=args.target_triangles,
+        triangles_per_area_val=args.triangles_per_area,
+        min_decimate_ratio_val=args.min_decimate_ratio, max_decimate_ratio_val=args.max_decimate_ratio
+    )
+
+
+def write_result_file(result_file_path, result):
+    """Writes a job result as JSON. Written to a temp file first so readers never see a partial file."""
     try:
-        bpy.ops.uv.smart_project(
-            angle_limit=sp_angle_radians_val, island_margin=sp_island_margin_val,
-            area_weight=sp_area_weight_val, correct_aspect=sp_correct_aspect_val,
-            scale_to_bounds=sp_scale_to_bounds_val, margin_method=sp_margin_method_val,
-            rotate_method=sp_rotate_method_val
-        )
+        os.makedirs(os.path.dirname(result_file_path), exist_ok=True)
+        temp_path = result_file_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(result, f, indent=2)
+        os.replace(temp_path, result_file_path)
+    except OSError as e:
+        print(f"  Warning: Could not write result file '{result_file_path}': {e}")
+
+
+def execute_job(args, asset_name=None, reset=False):
+    """Runs one parsed job, writes its --result_file (if given) and returns the result dict. Never raises."""
+    result = {"asset_name": asset_name, "status": "error", "message": "", "elapsed_seconds": 0.0}
+    stage_recorder = StageRecorder()
+    start_time = time.monotonic()
+    try:
+        if reset:
+            reset_scene()
+        run_job_from_args(args, stage_recorder)
+        result["status"] = "ok"
+    except MeshProcessingError as e:
+        result["message"] = str(e)
     except Exception as e:
-        print(f"  Error during Smart UV Project: {e}")
-        if bpy.context.mode != 'OBJECT': bpy.ops.object.mode_set(mode='OBJECT')
-        sys.exit(1)
-    print("  Smart UV Project complete.") 
+        result["message"] = f"Unexpected error: {e}"
+    result["elapsed_seconds"] = time.monotonic() - start_time
 
-    # --- Export _low.obj (decimated, UV unwrapped) ---
-    print(f"  Exporting decimated and unwrapped mesh as _low.obj to: {output_path_low_poly_mesh}")
-    export_object_as_obj(imported_obj, output_path_low_poly_mesh, exit_on_error=True)
+    if args.stats_output:
+        stats_asset_name = asset_name or os.path.splitext(os.path.basename(args.input_mesh))[0]
+        stage_recorder.write(args.stats_output, stats_asset_name, args.input_mesh, result["elapsed_seconds"], result["status"])
+    if args.result_file:
+        write_result_file(args.result_file, result)
+    return result
+
+
+def run_json_job(parser, job):
+    """Runs one job from --worker stdin or a --manifest file and returns its result dict. Never raises."""
+    try:
+        # Jobs carry the same arguments as a single-asset command line, so they get the same validation.
+        args = parser.parse_args(args=[str(a) for a in job["args"]])
+        check_job_args(parser, args)
+    except SystemExit:
+        return {"asset_name": job.get("asset_name"), "status": "error", "message": "Invalid job arguments (see log above).", "elapsed_seconds": 0.0}
+    return execute_job(args, job.get("asset_name"), reset=True)
+
+
+def run_worker_loop(parser):
+    """--worker mode: one JSON job per stdin line, one result line per job on stdout, until EOF or a shutdown command."""
+    print("Blender script (blender_decimate_unwrap.py) running in worker mode. Waiting for jobs on stdin...", flush=True)
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(WORKER_RESULT_PREFIX + json.dumps({"asset_name": None, "status": "error", "message": f"Bad job line: {e}", "elapsed_seconds": 0.0}), flush=True)
+            continue
+        if job.get("command") == "shutdown":
+            break
+
+        print(f"Blender worker: starting job for '{job.get('asset_name')}'", flush=True)
+        result = run_json_job(parser, job)
+        print(WORKER_RESULT_PREFIX + json.dumps(result), flush=True)
+    print("Blender worker: shutting down.", flush=True)
 
-    print(f"Blender script: Successfully processed. Final low poly mesh saved to '{output_path_low_poly_mesh}'.")
+
+def run_manifest(parser, manifest_path):
+    """--manifest mode: runs every job listed in the manifest in this Blender session.
+
+    A failing job is recorded in its result file and the run continues with the next one.
+    Returns the number of failed jobs.
+    """
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    jobs = manifest["jobs"]
+    print(f"Blender script (blender_decimate_unwrap.py) running manifest '{manifest_path}' with {len(jobs)} job(s).", flush=True)
+
+    failed_count = 0
+    for job_index, job in enumerate(jobs, start=1):
+        print(f"{JOB_START_PREFIX}{job.get('asset_name')}", flush=True)
+        print(f"\n=== Manifest job {job_index}/{len(jobs)}: {job.get('asset_name')} ===", flush=True)
+        result = run_json_job(parser, job)
+        if result["status"] != "ok":
+            failed_count += 1
+            print(f"Blender script: job '{job.get('asset_name')}' FAILED: {result['message']}", flush=True)
+    print(f"\nBlender script: manifest finished. {len(jobs) - failed_count} succeeded, {failed_count} failed.", flush=True)
+    return failed_count
 
 
 if __name__ == "__main__":
     argv = sys.argv
     argv = argv[argv.index("--") + 1:] if "--" in argv else []
-    parser = argparse.ArgumentParser(description="Blender: Import, Scale, Save .blend & _high.obj, Decimate, Smart UV Unwrap, and Export _low.obj.")
-    
-    parser.add_argument("--input_mesh", type=str, required=True, help="Input path for the original OBJ mesh (e.g., 'Meshes/MyModel.obj').")
-    parser.add_argument("--output_mesh", type=str, required=True, help="Output path for the final low poly mesh (e.g., 'Meshes/MyModel_low.obj').")
-    
-    # All operational parameters are now required
-    parser.add_argument("--decimate_ratio", type=float, required=True)
-    parser.add_argument("--scale_factor", type=float, required=True, help="Factor by which to scale the model.")
-    parser.add_argument("--sp_angle", type=float, required=True)
-    parser.add_argument("--sp_margin", type=float, required=True)
-    parser.add_argument("--sp_area_weight", type=float, required=True)
-    parser.add_argument("--sp_correct_aspect", type=str_to_bool, required=True)
-    parser.add_argument("--sp_scale_to_bounds", type=str_to_bool, required=True)
-    parser.add_argument("--sp_margin_method", type=str, required=True, choices=['SCALED', 'ABSOLUTE', 'FRACTION'])
-    parser.add_argument("--sp_rotate_method", type=str, required=True, choices=['AXIS_ALIGNED', 'AXIS_ALIGNED_X', 'AXIS_ALIGNED_Y'])
-    parser.add_argument("--uv_fill_holes", type=str_to_bool, required=True)
-    parser.add_argument("--apply_scale", type=str_to_bool, required=True, help="Apply scale of the original imported model before main scaling.")
-    
+    parser = build_arg_parser()
     args = parser.parse_args(args=argv)
+
+    if args.worker:
+        run_worker_loop(parser)
+        sys.exit(0)
+
+    if args.manifest:
+        try:
+            run_manifest(parser, args.manifest)
+        except (OSError, json.JSONDecodeError, KeyError) as e:
+            print(f"Blender script: Could not read manifest '{args.manifest}': {e}")
+            sys.exit(1)
+        # Per-job failures are reported through the result files, not the exit code.
+        sys.exit(0)
+
+    check_job_args(parser, args)
     print("Blender script (blender_decimate_unwrap.py) started with effective arguments:")
     for arg, value in vars(args).items(): print(f"  {arg}: {value}")
     print("-" * 30)
-    
-    process_mesh(
-        args.input_mesh, args.output_mesh, 
-        args.decimate_ratio, args.scale_factor,
-        args.sp_angle, args.sp_margin, args.sp_area_weight,
-        args.sp_correct_aspect, args.sp_scale_to_bounds, args.sp_margin_method,
-        args.sp_rotate_method,
-        args.apply_scale, args.uv_fill_holes
-    )
\ No newline at end of file
+
+    result = execute_job(args)
+    if result["status"] != "ok":
+        print(f"Blender script: FAILED: {result['message']}")
+        sys.exit(1)
\ No newline at end of file
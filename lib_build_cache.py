@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import hashlib
+import concurrent.futures
+
+# Read size for hashing input files. hashlib releases the GIL on large updates,
+# so several files can be hashed in parallel threads.
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def sha256_of_file(path):
+    """Returns the hex SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha256_of_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class BuildCache:
+    """Content-addressed record of finished Stage 1 builds, stored as a JSON manifest.
+
+    Each entry is keyed by asset name and stores the build key (a hash of the
+    input OBJ bytes, the Blender script parameters and the Blender script
+    source) plus the output files the build produced. An asset whose key is
+    unchanged and whose outputs still exist does not need to be rebuilt.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.entries = json.load(f).get("entries", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"  WARNING: Could not read build cache '{self.manifest_path}' ({e}). Starting with an empty cache.")
+            self.entries = {}
+
+    def save(self):
+        """Writes the manifest atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({"version": 1, "entries": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def input_digest(self, asset_name, input_path):
+        """Returns the SHA-256 of an asset's input OBJ.
+
+        Re-uses the digest stored in the manifest when the file's size and
+        mtime are unchanged, so unchanged multi-GB inputs are not re-read.
+        """
+        stat = os.stat(input_path)
+        recorded_input = self.entries.get(asset_name, {}).get("input", {})
+        if (recorded_input.get("path") == os.path.abspath(input_path)
+                and recorded_input.get("size") == stat.st_size
+                and recorded_input.get("mtime_ns") == stat.st_mtime_ns
+                and recorded_input.get("sha256")):
+            return recorded_input["sha256"]
+        return sha256_of_file(input_path)
+
+    def input_digests(self, assets, max_workers):
+        """Hashes many inputs in parallel. assets is a list of (asset_name, input_path); returns {asset_name: digest}."""
+        digests = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            future_to_name = {executor.submit(self.input_digest, name, path): name for name, path in assets}
+            for future in concurrent.futures.as_completed(future_to_name):
+                digests[future_to_name[future]] = future.result()
+        return digests
+
+    @staticmethod
+    def build_key(input_digest, script_params, script_source_digest):
+        """Combines everything that affects a build's outputs into a single key."""
+        key_material = json.dumps({
+            "input_sha256": input_digest,
+            "script_params": script_params,
+            "script_sha256": script_source_digest,
+        }, sort_keys=True)
+        return sha256_of_text(key_material)
+
+    def is_up_to_date(self, asset_name, build_key):
+        entry = self.entries.get(asset_name)
+        if not entry or entry.get("build_key") != build_key:
+            return False
+        return all(os.path.exists(path) for path in entry.get("outputs", []))
+
+    def invalidate(self, asset_name):
+        """Drops an entry before its asset is rebuilt, so a build that dies half-way is never trusted."""
+        self.entries.pop(asset_name, None)
+
+    def record(self, asset_name, build_key, input_path, input_digest, outputs):
+        stat = os.stat(input_path)
+        self.entries[asset_name] = {
+            "build_key": build_key,
+            "input": {
+                "path": os.path.abspath(input_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": input_digest,
+            },
+            "outputs": list(outputs),
+            "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def prune(self, live_asset_names, delete_outputs=False):
+        """Removes entries for assets that no longer exist. Returns the list of pruned asset names.
+
+        With delete_outputs, the output files recorded for those assets are deleted as well.
+        """
+        pruned_names = sorted(name for name in self.entries if name not in live_asset_names)
+        for asset_name in pruned_names:
+            entry = self.entries.pop(asset_name)
+            if delete_outputs:
+                for output_path in entry.get("outputs", []):
+                    try:
+                        os.remove(output_path)
+                        print(f"  Deleted stale output: {output_path}")
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        print(f"  WARNING: Could not delete stale output '{output_path}': {e}")
+        return pruned_names
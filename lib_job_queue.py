@@ -0,0 +1,312 @@
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+
+# A job queue that lives in a folder on a shared filesystem, so Stage 1 can run on several machines.
+#
+#   pending/<order>_<job_id>.json                 waiting jobs; workers take them in file name order
+#   running/<order>_<job_id>@<token>.json         claimed jobs. A claim is an os.rename from pending/, so only one
+#                                                 worker wins; <token> is new for every claim.
+#   running/<order>_<job_id>@<token>.publishing   the claim is publishing its result; renamed from .json, so a claim
+#                                                 that was re-queued in the meantime can no longer publish
+#   leases/<job_id>.json                          the claiming worker's heartbeat, rewritten every few seconds
+#   results/<job_id>@<token>.json                 published results, written atomically
+#   run                                           the id of the current run, written by the coordinator's reset()
+#   closed                                        the id of a run the coordinator has finished; its idle workers exit
+#
+# Lease expiry is judged by the coordinator on its own clock: a running job whose lease file has
+# not changed for lease_seconds is moved back to pending/. Workers never compare timestamps, so
+# the machines' clocks do not need to agree. A worker owns a job only while running/ holds the
+# file with its own token: the re-queue renames it away, and a new claim gets a new token, so the
+# first worker's heartbeat and publish() fail from then on. The coordinator only accepts a
+# result whose .publishing claim file is still there.
+
+
+def write_json_atomic(path, data):
+    """Writes JSON to a uniquely named temp file and renames it into place, so readers never see a partial file."""
+    temp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+
+def read_json(path):
+    """Returns the parsed JSON file, or None if it does not exist (any more) or is unreadable."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def read_text(path):
+    """Returns the stripped content of a small marker file, or None if it does not exist."""
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def remove_if_exists(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ClaimedJob:
+    """A job a worker has claimed. The worker must publish() or release() it."""
+
+    def __init__(self, file_name, payload, worker_id, claim_token):
+        self.file_name = file_name # The name in pending/
+        self.job_id = job_id_from_file_name(file_name)
+        self.payload = payload
+        self.worker_id = worker_id
+        self.claim_token = claim_token
+        self.running_file_name = claim_file_name(file_name, claim_token, ".json")
+        self.beats = 0
+
+
+def job_id_from_file_name(file_name):
+    return os.path.splitext(file_name)[0].split("_", 1)[1]
+
+
+def claim_file_name(pending_file_name, claim_token, extension):
+    return f"{os.path.splitext(pending_file_name)[0]}@{claim_token}{extension}"
+
+
+def split_claim_file_name(running_file_name):
+    """Returns (pending file name, claim token, extension) of a file in running/, or None for anything else."""
+    stem, extension = os.path.splitext(running_file_name)
+    if extension not in (".json", ".publishing") or "@" not in stem:
+        return None
+    pending_stem, claim_token = stem.rsplit("@", 1)
+    return f"{pending_stem}.json", claim_token, extension
+
+
+class JobQueue:
+    """The queue folder seen from either side: the coordinator (reset, submit, collect, requeue) or a worker (claim, heartbeat, publish)."""
+
+    def __init__(self, queue_folder):
+        self.queue_folder = queue_folder
+        self.pending_folder = os.path.join(queue_folder, "pending")
+        self.running_folder = os.path.join(queue_folder, "running")
+        self.leases_folder = os.path.join(queue_folder, "leases")
+        self.results_folder = os.path.join(queue_folder, "results")
+        self.run_marker_path = os.path.join(queue_folder, "run")
+        self.closed_marker_path = os.path.join(queue_folder, "closed")
+        for folder in (self.pending_folder, self.running_folder, self.leases_folder, self.results_folder):
+            os.makedirs(folder, exist_ok=True)
+
+    def _lease_path(self, job_id):
+        return os.path.join(self.leases_folder, f"{job_id}.json")
+
+    def _result_path(self, job_id, claim_token):
+        return os.path.join(self.results_folder, f"{job_id}@{claim_token}.json")
+
+    # --- Coordinator side ---
+
+    def reset(self, run_id):
+        """Empties the queue left by an earlier run and announces run_id to the workers."""
+        remove_if_exists(self.closed_marker_path)
+        for folder in (self.pending_folder, self.running_folder, self.leases_folder, self.results_folder):
+            for file_name in os.listdir(folder):
+                remove_if_exists(os.path.join(folder, file_name))
+        with open(self.run_marker_path, 'w') as f:
+            f.write(run_id)
+
+    def submit(self, order, job_id, payload):
+        """Adds a job. Workers claim pending jobs in order of the order number."""
+        write_json_atomic(os.path.join(self.pending_folder, f"{order:06d}_{job_id}.json"), payload)
+
+    def close(self, run_id):
+        """Tells the run's idle workers that no more jobs will come."""
+        with open(self.closed_marker_path, 'w') as f:
+            f.write(run_id)
+
+    def collect_results(self, skip_job_ids=()):
+        """Returns {job_id: result payload} for every newly published result not in skip_job_ids.
+
+        A result is accepted only while its claim's .publishing file is in running/, i.e. it comes
+        from the job's current claim. Results of claims that were re-queued are deleted.
+        """
+        claim_file_names = {}
+        for file_name in os.listdir(self.running_folder):
+            claim = split_claim_file_name(file_name)
+            if claim is not None and claim[2] == ".publishing":
+                claim_file_names[(job_id_from_file_name(claim[0]), claim[1])] = file_name
+
+        results = {}
+        for file_name in os.listdir(self.results_folder):
+            stem, extension = os.path.splitext(file_name)
+            if extension != ".json" or "@" not in stem:
+                continue
+            job_id, claim_token = stem.rsplit("@", 1)
+            if job_id in skip_job_ids:
+                continue
+            result_path = os.path.join(self.results_folder, file_name)
+            claim_file_name_for_result = claim_file_names.get((job_id, claim_token))
+            if claim_file_name_for_result is None:
+                remove_if_exists(result_path) # Published by a worker that had lost the job
+                continue
+            payload = read_json(result_path)
+            if payload is not None:
+                results[job_id] = payload
+                remove_if_exists(os.path.join(self.running_folder, claim_file_name_for_result))
+        return results
+
+    def requeue_expired(self, lease_seconds, lease_watch):
+        """Moves running jobs whose lease has not changed for lease_seconds back to pending/.
+
+        lease_watch is a dict the caller keeps between calls; it maps each running
+        job to its last seen lease content and when that was first seen. Returns
+        the job ids that were requeued.
+        """
+        now = time.monotonic()
+        running_file_names = set(name for name in os.listdir(self.running_folder) if split_claim_file_name(name) is not None)
+        for file_name in list(lease_watch):
+            if file_name not in running_file_names:
+                del lease_watch[file_name]
+
+        requeued_job_ids = []
+        for file_name in running_file_names:
+            pending_file_name, claim_token, extension = split_claim_file_name(file_name)
+            job_id = job_id_from_file_name(pending_file_name)
+            if extension == ".publishing" and os.path.exists(self._result_path(job_id, claim_token)):
+                continue # Published; collect_results() takes it from here
+            lease_path = self._lease_path(job_id)
+            try:
+                with open(lease_path, 'r') as f:
+                    lease_text = f.read()
+            except OSError:
+                lease_text = None # Claimed a moment ago and not yet heartbeated, or the lease was removed.
+            last_seen = lease_watch.get(file_name)
+            if last_seen is None or last_seen[0] != lease_text:
+                lease_watch[file_name] = (lease_text, now)
+                continue
+            if now - last_seen[1] < lease_seconds:
+                continue
+
+            del lease_watch[file_name]
+            try:
+                os.rename(os.path.join(self.running_folder, file_name), os.path.join(self.pending_folder, pending_file_name))
+            except FileNotFoundError:
+                continue # Published or released in the meantime
+            requeued_job_ids.append(job_id)
+            lease = read_json(lease_path)
+            if lease is not None and lease.get("claim_token") == claim_token:
+                remove_if_exists(lease_path) # Leave a lease a new claim may already have written
+        return requeued_job_ids
+
+    # --- Worker side ---
+
+    def is_closed(self, seen_run_ids):
+        """True once the coordinator has closed a run this worker has seen.
+
+        seen_run_ids is the worker's own set; runs are added here when they are seen
+        open, and by the caller for every claimed job. A marker left by an earlier run
+        the worker never saw open does not make it exit, so workers can be started
+        before the coordinator.
+        """
+        current_run_id = read_text(self.run_marker_path)
+        closed_run_id = read_text(self.closed_marker_path)
+        if current_run_id and current_run_id != closed_run_id:
+            seen_run_ids.add(current_run_id)
+        return closed_run_id is not None and closed_run_id in seen_run_ids
+
+    def claim(self, worker_id):
+        """Claims the first pending job. Returns a ClaimedJob, or None if nothing is pending."""
+        try:
+            pending_file_names = sorted(name for name in os.listdir(self.pending_folder) if name.endswith(".json"))
+        except FileNotFoundError:
+            return None
+        for file_name in pending_file_names:
+            claim_token = uuid.uuid4().hex
+            running_path = os.path.join(self.running_folder, claim_file_name(file_name, claim_token, ".json"))
+            try:
+                os.rename(os.path.join(self.pending_folder, file_name), running_path)
+            except (FileNotFoundError, PermissionError, FileExistsError):
+                continue # Another worker got there first
+            payload = read_json(running_path)
+            if payload is None:
+                remove_if_exists(running_path) # Unreadable: nothing to do
+                continue
+            claimed_job = ClaimedJob(file_name, payload, worker_id, claim_token)
+            self.heartbeat(claimed_job)
+            return claimed_job
+        return None
+
+    def heartbeat(self, claimed_job):
+        """Renews the lease. Returns False if the job is no longer ours (the coordinator requeued it)."""
+        if not os.path.exists(os.path.join(self.running_folder, claimed_job.running_file_name)):
+            return False
+        claimed_job.beats += 1
+        write_json_atomic(self._lease_path(claimed_job.job_id), {
+            "worker_id": claimed_job.worker_id,
+            "claim_token": claimed_job.claim_token,
+            "host": socket.gethostname(),
+            "beats": claimed_job.beats,
+            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        return True
+
+    def publish(self, claimed_job, result_payload):
+        """Publishes the job's result (atomically) and gives up the lease.
+
+        Returns False, without publishing, if the job is no longer ours.
+        """
+        try:
+            os.rename(os.path.join(self.running_folder, claimed_job.running_file_name),
+                      os.path.join(self.running_folder, claim_file_name(claimed_job.file_name, claimed_job.claim_token, ".publishing")))
+        except FileNotFoundError:
+            return False
+        write_json_atomic(self._result_path(claimed_job.job_id, claimed_job.claim_token),
+                          dict(result_payload, claim_token=claimed_job.claim_token))
+        remove_if_exists(self._lease_path(claimed_job.job_id))
+        return True
+
+    def release(self, claimed_job):
+        """Puts a claimed job back in pending/ unprocessed, for another worker."""
+        try:
+            os.rename(os.path.join(self.running_folder, claimed_job.running_file_name), os.path.join(self.pending_folder, claimed_job.file_name))
+        except FileNotFoundError:
+            return # Already requeued by the coordinator; the lease may belong to a new claim
+        remove_if_exists(self._lease_path(claimed_job.job_id))
+
+
+class LeaseHeartbeat:
+    """Renews a claimed job's lease every interval_seconds on a background thread while the job runs.
+
+    If the lease turns out to be lost, lost is set and on_lost() is called once.
+    """
+
+    def __init__(self, job_queue, claimed_job, interval_seconds, on_lost=None):
+        self.job_queue = job_queue
+        self.claimed_job = claimed_job
+        self.interval_seconds = interval_seconds
+        self.on_lost = on_lost
+        self.lost = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                if not self.job_queue.heartbeat(self.claimed_job):
+                    self.lost = True
+                    if self.on_lost is not None:
+                        self.on_lost()
+                    return
+            except OSError as e:
+                print(f"  Warning: Could not renew the lease on '{self.claimed_job.job_id}': {e}")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Append-only run journal shared by both stages, stored as JSON lines in
+# processed_objs_folder/_pipeline/journal.jsonl. Every line records one step of one asset:
+#
+#   {"time": ..., "stage": "blender" | "painter", "asset": "Hull019", "step": "bake",
+#    "status": "done" | "failed", "key": "<fingerprint of the step's inputs>", ...details}
+#
+# Lines are flushed and fsynced as they are written, so a crash loses at most the line being
+# written; a torn last line is ignored when the journal is read back. The latest record for an
+# (asset, step) wins, and a step only counts as done if it was done for the same key, so a
+# rebuilt input automatically makes the later steps run again.
+
+# Stage 1 steps, in order.
+BLENDER_STEPS = ["copy", "blender"]
+# Stage 2 steps, in order.
+PAINTER_STEPS = ["create", "rename", "smart_material", "bake", "save", "export"]
+
+
+def file_fingerprint(paths, extra=None):
+    """A short digest of the paths' sizes and modification times (plus any JSON-serializable extra).
+
+    Cheap enough to compute for every asset on every run; changes whenever one of the files is rewritten.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+        except OSError:
+            digest.update(f"{os.path.basename(path)}:missing;".encode('utf-8'))
+    if extra is not None:
+        digest.update(json.dumps(extra, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+class Journal:
+    """Reads the journal once on creation and appends to it; safe to use from several threads of one process."""
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.latest = {} # (asset, step) -> latest record
+        self._lock = threading.Lock()
+        self._starts_mid_line = False # The file ends in a torn line; the next record must start on a new one
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8', errors='replace') as f:
+                line = ""
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue # Torn line from a crash mid-write
+                    self.latest[(record.get("asset"), record.get("step"))] = record
+                self._starts_mid_line = bool(line) and not line.endswith("\n")
+        except FileNotFoundError:
+            pass
+
+    def record(self, stage, asset, step, status, key=None, **details):
+        """Appends one step record and makes it durable before returning."""
+        record = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "stage": stage, "asset": asset,
+                  "step": step, "status": status, "key": key}
+        record.update(details)
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            if self._starts_mid_line:
+                line = "\n" + line
+                self._starts_mid_line = False
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.latest[(asset, step)] = record
+
+    def get(self, asset, step):
+        """The latest record for an asset's step, or None."""
+        return self.latest.get((asset, step))
+
+    def is_done(self, asset, step, key=None):
+        """True if the step's latest record is "done" (for this key, if one is given)."""
+        record = self.get(asset, step)
+        return record is not None and record["status"] == "done" and (key is None or record.get("key") == key)
+
+    def first_incomplete_step(self, asset, steps, key=None):
+        """The first of steps that is not done for key, or None if all of them are."""
+        for step in steps:
+            if not self.is_done(asset, step, key):
+                return step
+        return None
+
+    def has_history(self, asset, steps):
+        """True if any of steps was ever recorded for the asset."""
+        return any((asset, step) in self.latest for step in steps)
@@ -0,0 +1,197 @@
+import os
+import time
+import platform
+import threading
+import subprocess
+import collections
+
+try:
+    import psutil
+except ImportError: # Not required: /proc, the Win32 API or ps are used instead.
+    psutil = None
+
+# Memory-aware admission control for concurrent Blender jobs. Each job declares its predicted
+# peak memory before it starts; MemoryGate admits jobs in order while the projected memory of
+# everything running stays under the budget. A running job counts as the larger of its
+# prediction and the Blender process's current resident memory, so a job that outgrows its
+# prediction holds back the next ones. A job is always admitted when nothing else is running,
+# so a job predicted above the budget still runs, alone.
+
+
+def physical_memory_bytes():
+    """Total physical memory of this machine in bytes, or None if it cannot be determined."""
+    if psutil is not None:
+        return psutil.virtual_memory().total
+    if platform.system() == "Windows":
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(status)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+        return None
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def process_rss_bytes(pid):
+    """Current resident memory of another process in bytes, or None if it has exited or cannot be read."""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    system_name = platform.system()
+    if system_name == "Linux":
+        try:
+            with open(f"/proc/{pid}/status", 'r') as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return None
+    if system_name == "Windows":
+        import ctypes
+        import ctypes.wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", ctypes.wintypes.DWORD), ("PageFaultCount", ctypes.wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        PROCESS_VM_READ = 0x0010
+        process_handle = ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ, False, pid)
+        if not process_handle:
+            return None
+        try:
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            if ctypes.windll.psapi.GetProcessMemoryInfo(process_handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        finally:
+            ctypes.windll.kernel32.CloseHandle(process_handle)
+    return processes_rss_bytes([pid]).get(pid)
+
+
+def processes_rss_bytes(pids):
+    """Current resident memory of several processes: {pid: bytes}, leaving out those that have exited or cannot be read.
+
+    On macOS and other Unixes without /proc this is one ps call for all of them.
+    """
+    pids = list(pids)
+    if not pids:
+        return {}
+    if psutil is not None or platform.system() in ("Linux", "Windows"):
+        rss_by_pid = {}
+        for pid in pids:
+            rss_bytes = process_rss_bytes(pid)
+            if rss_bytes is not None:
+                rss_by_pid[pid] = rss_bytes
+        return rss_by_pid
+    try: # macOS and other Unixes
+        output = subprocess.run(["ps", "-o", "pid=,rss=", "-p", ",".join(str(pid) for pid in pids)],
+                                capture_output=True, text=True).stdout
+    except OSError:
+        return {}
+    rss_by_pid = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[0].isdigit() and fields[1].isdigit():
+            rss_by_pid[int(fields[0])] = int(fields[1]) * 1024
+    return rss_by_pid
+
+
+class MemoryGate:
+    """Admits jobs, in the order they ask, while their projected memory fits under budget_bytes.
+
+    Threads call acquire() before starting a job, track_process() once its Blender process
+    is running, and release() when it is done. With budget_bytes None every job is admitted
+    immediately.
+    """
+
+    def __init__(self, budget_bytes, poll_seconds=1.0):
+        self.budget_bytes = budget_bytes
+        self.poll_seconds = poll_seconds
+        self._condition = threading.Condition()
+        self._waiting = collections.deque() # Tickets of the threads waiting to be admitted, oldest first
+        self._running = {} # thread ident -> {"name", "predicted_bytes", "pid"}
+        self._refusal_count = 0 # Times the job at the head of the line did not fit
+        self._generation = 0 # Bumped whenever _running changes, so a sample taken without the lock can be checked
+
+    def acquire(self, name, predicted_bytes, on_wait=None):
+        """Blocks until the job may start. Returns the seconds spent waiting (0.0 if admitted at once).
+
+        on_wait(in_use_bytes) is called once if the job has to wait for memory,
+        with the projected memory of the running jobs at that moment.
+        """
+        if self.budget_bytes is None:
+            return 0.0
+        start_time = time.monotonic()
+        ticket = object()
+        with self._condition:
+            self._waiting.append(ticket)
+            refusal_count_on_arrival = self._refusal_count
+            announced = False
+            while True:
+                if self._waiting[0] is ticket:
+                    if not self._running:
+                        break
+                    generation = self._generation
+                    in_use_bytes = self._projected_bytes()
+                    if self._generation != generation:
+                        continue # A job ended or started while its memory was sampled; sample again
+                    if in_use_bytes + predicted_bytes <= self.budget_bytes:
+                        break
+                    self._refusal_count += 1
+                    if not announced and on_wait is not None:
+                        on_wait(in_use_bytes)
+                        announced = True
+                # Re-check on every release and periodically, since running jobs' memory changes.
+                self._condition.wait(self.poll_seconds)
+            # Only time spent behind a job that did not fit counts as waiting for memory.
+            waited = self._refusal_count != refusal_count_on_arrival
+            self._waiting.popleft()
+            self._running[threading.get_ident()] = {"name": name, "predicted_bytes": predicted_bytes, "pid": None}
+            self._generation += 1
+            self._condition.notify_all() # The next job in line may fit as well
+        return time.monotonic() - start_time if waited else 0.0
+
+    def track_process(self, pid):
+        """Attributes a Blender process to the calling thread's admitted job, so its actual memory is counted."""
+        with self._condition:
+            entry = self._running.get(threading.get_ident())
+            if entry is not None:
+                entry["pid"] = pid
+                self._generation += 1
+
+    def release(self):
+        """Ends the calling thread's job and lets waiting jobs re-check the budget."""
+        with self._condition:
+            if self._running.pop(threading.get_ident(), None) is not None:
+                self._generation += 1
+                self._condition.notify_all()
+
+    def _projected_bytes(self):
+        """Projected memory of the running jobs. Called with the lock held; it is released while
+        the processes are sampled, so other threads are not held up by the sampling."""
+        entries = list(self._running.values())
+        self._condition.release()
+        try:
+            rss_by_pid = processes_rss_bytes(entry["pid"] for entry in entries if entry["pid"] is not None)
+        finally:
+            self._condition.acquire()
+        return sum(max(entry["predicted_bytes"], rss_by_pid.get(entry["pid"], 0)) for entry in entries)
@@ -0,0 +1,217 @@
+import os
+import time
+import heapq
+import sqlite3
+import concurrent.futures
+
+try:
+    import lib_obj
+except ImportError: # NumPy is not installed; scan_obj falls back to a plain line scanner.
+    lib_obj = None
+
+# Cost model used until the index holds enough timed builds to fit its own:
+# seconds = DEFAULT_BASE_SECONDS + DEFAULT_SECONDS_PER_MILLION_FACES * faces / 1e6
+DEFAULT_BASE_SECONDS = 5.0
+DEFAULT_SECONDS_PER_MILLION_FACES = 30.0
+# Timed builds needed before the fitted model replaces the default one.
+MIN_BUILDS_FOR_FIT = 3
+# Only the most recent builds are used for the fit, so the model follows changes to script_params or hardware.
+MAX_BUILDS_FOR_FIT = 500
+# Peak memory model used until enough builds with a measured peak are recorded:
+# peak bytes = DEFAULT_PEAK_BASE_BYTES + DEFAULT_PEAK_BYTES_PER_MILLION_FACES * faces / 1e6
+# (about 21 GB for a 5M-face scan).
+DEFAULT_PEAK_BASE_BYTES = 1024 ** 3
+DEFAULT_PEAK_BYTES_PER_MILLION_FACES = 4 * 1024 ** 3
+
+
+def scan_obj(path):
+    """Reads an OBJ once and returns its vertex/face counts and bounding box.
+
+    Returns {"vertices", "faces", "bbox_min", "bbox_max"}; the bbox entries are
+    None for a file without vertices. Uses lib_obj's vectorized reader when
+    NumPy is available.
+    """
+    if lib_obj is not None:
+        try:
+            mesh = lib_obj.read_obj(path, load_faces=False)
+            bbox = mesh.bbox()
+            return {"vertices": mesh.vertex_count, "faces": mesh.face_count,
+                    "bbox_min": bbox[0].tolist() if bbox else None, "bbox_max": bbox[1].tolist() if bbox else None}
+        except lib_obj.ObjParseError:
+            pass # Unusual syntax: the line scanner below skips what it cannot parse.
+
+    vertex_count = 0
+    face_count = 0
+    min_x = min_y = min_z = float("inf")
+    max_x = max_y = max_z = float("-inf")
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.startswith(b'v '):
+                vertex_count += 1
+                parts = line.split()
+                try:
+                    x, y, z = float(parts[1]), float(parts[2]), float(parts[3])
+                except (IndexError, ValueError):
+                    continue
+                if x < min_x: min_x = x
+                if x > max_x: max_x = x
+                if y < min_y: min_y = y
+                if y > max_y: max_y = y
+                if z < min_z: min_z = z
+                if z > max_z: max_z = z
+            elif line.startswith(b'f '):
+                face_count += 1
+    if min_x == float("inf"):
+        return {"vertices": vertex_count, "faces": face_count, "bbox_min": None, "bbox_max": None}
+    return {"vertices": vertex_count, "faces": face_count, "bbox_min": [min_x, min_y, min_z], "bbox_max": [max_x, max_y, max_z]}
+
+
+def predict_makespan(costs, worker_count):
+    """Wall time for running jobs with the given costs largest-first on worker_count workers (LPT list scheduling)."""
+    worker_loads = [0.0] * max(1, min(worker_count, len(costs)))
+    for cost in sorted(costs, reverse=True):
+        heapq.heappush(worker_loads, heapq.heappop(worker_loads) + cost)
+    return max(worker_loads) if costs else 0.0
+
+
+class MeshIndex:
+    """Persistent SQLite index of input meshes and of how long their Blender builds took.
+
+    The meshes table holds size, mtime, vertex/face counts and bounding box per
+    asset and is refreshed incrementally: a file is only re-scanned when its
+    size or mtime changed. The builds table records Blender time per build
+    and is used to fit the cost model behind largest-first scheduling.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS meshes (
+                asset_name TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                vertices INTEGER NOT NULL,
+                faces INTEGER NOT NULL,
+                bbox_min_x REAL, bbox_min_y REAL, bbox_min_z REAL,
+                bbox_max_x REAL, bbox_max_y REAL, bbox_max_z REAL,
+                scanned_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS builds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                asset_name TEXT NOT NULL,
+                faces INTEGER NOT NULL,
+                seconds REAL NOT NULL,
+                built_at TEXT NOT NULL
+            );
+        """)
+        # Indexes created before peak memory was recorded lack the column.
+        build_columns = [row["name"] for row in self.connection.execute("PRAGMA table_info(builds)")]
+        if "peak_rss_bytes" not in build_columns:
+            self.connection.execute("ALTER TABLE builds ADD COLUMN peak_rss_bytes INTEGER")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def update(self, assets, max_workers):
+        """Brings the index up to date for assets, a list of (asset_name, path). Returns the number of files scanned.
+
+        Changed files are scanned in parallel processes, since parsing is CPU-bound.
+        """
+        stale_assets = []
+        for asset_name, path in assets:
+            stat = os.stat(path)
+            row = self.connection.execute("SELECT path, size, mtime_ns FROM meshes WHERE asset_name = ?", (asset_name,)).fetchone()
+            if row and row["path"] == os.path.abspath(path) and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            stale_assets.append((asset_name, path, stat))
+        if not stale_assets:
+            return 0
+
+        worker_count = max(1, min(max_workers, len(stale_assets)))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as executor:
+            scans = executor.map(scan_obj, [path for _, path, _ in stale_assets])
+            for (asset_name, path, stat), scan in zip(stale_assets, scans):
+                bbox_min = scan["bbox_min"] or [None] * 3
+                bbox_max = scan["bbox_max"] or [None] * 3
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meshes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (asset_name, os.path.abspath(path), stat.st_size, stat.st_mtime_ns, scan["vertices"], scan["faces"],
+                     *bbox_min, *bbox_max, time.strftime("%Y-%m-%d %H:%M:%S")))
+        self.connection.commit()
+        return len(stale_assets)
+
+    def get(self, asset_name):
+        """Returns the indexed row for an asset as a dict, or None."""
+        row = self.connection.execute("SELECT * FROM meshes WHERE asset_name = ?", (asset_name,)).fetchone()
+        return dict(row) if row else None
+
+    def record_build(self, asset_name, seconds, peak_rss_bytes=None):
+        """Stores how long an asset's Blender build took (and its peak memory, if measured), against its currently indexed face count."""
+        row = self.get(asset_name)
+        if row is None:
+            return
+        self.connection.execute(
+            "INSERT INTO builds (asset_name, faces, seconds, built_at, peak_rss_bytes) VALUES (?, ?, ?, ?, ?)",
+            (asset_name, row["faces"], seconds, time.strftime("%Y-%m-%d %H:%M:%S"), peak_rss_bytes))
+        self.connection.commit()
+
+    def cost_model(self):
+        """Returns (base_seconds, seconds_per_million_faces, build_count) fitted to recent builds by least squares.
+
+        Falls back to the default model when there are fewer than MIN_BUILDS_FOR_FIT builds.
+        """
+        rows = self.connection.execute("SELECT faces, seconds FROM builds ORDER BY id DESC LIMIT ?", (MAX_BUILDS_FOR_FIT,)).fetchall()
+        if len(rows) < MIN_BUILDS_FOR_FIT:
+            return DEFAULT_BASE_SECONDS, DEFAULT_SECONDS_PER_MILLION_FACES, len(rows)
+
+        xs = [row["faces"] / 1e6 for row in rows]
+        ys = [row["seconds"] for row in rows]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        variance_x = sum((x - mean_x) ** 2 for x in xs)
+        if variance_x == 0:
+            # Every build had the same size: only the average is known.
+            return mean_y, 0.0, len(rows)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance_x
+        slope = max(0.0, slope)
+        return max(0.0, mean_y - slope * mean_x), slope, len(rows)
+
+    @staticmethod
+    def predict_seconds(faces, model):
+        base_seconds, seconds_per_million_faces = model[0], model[1]
+        return base_seconds + seconds_per_million_faces * faces / 1e6
+
+    def memory_model(self):
+        """Returns (base_bytes, bytes_per_million_faces, build_count) for predicting a build's peak memory.
+
+        The slope is a least-squares fit to recent builds with a measured peak; the base is then
+        raised until no build in the sample is above the line, since underestimating memory costs
+        far more than overestimating it. Falls back to the default model when there are fewer
+        than MIN_BUILDS_FOR_FIT measured builds.
+        """
+        rows = self.connection.execute(
+            "SELECT faces, peak_rss_bytes FROM builds WHERE peak_rss_bytes IS NOT NULL ORDER BY id DESC LIMIT ?",
+            (MAX_BUILDS_FOR_FIT,)).fetchall()
+        if len(rows) < MIN_BUILDS_FOR_FIT:
+            return DEFAULT_PEAK_BASE_BYTES, DEFAULT_PEAK_BYTES_PER_MILLION_FACES, len(rows)
+
+        xs = [row["faces"] / 1e6 for row in rows]
+        ys = [row["peak_rss_bytes"] for row in rows]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        variance_x = sum((x - mean_x) ** 2 for x in xs)
+        slope = 0.0
+        if variance_x > 0:
+            slope = max(0.0, sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance_x)
+        base_bytes = max(y - slope * x for x, y in zip(xs, ys))
+        return max(0.0, base_bytes), slope, len(rows)
+
+    @staticmethod
+    def predict_peak_bytes(faces, model):
+        base_bytes, bytes_per_million_faces = model[0], model[1]
+        return int(base_bytes + bytes_per_million_faces * faces / 1e6)
@@ -0,0 +1,570 @@
+import os
+import mmap
+import numpy as np
+
+# How much of the file is parsed at a time. Each chunk is cut at a line break,
+# so memory use stays bounded no matter how large the OBJ is.
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+# Rows formatted per write() call by write_obj.
+DEFAULT_WRITE_CHUNK_ROWS = 250000
+
+_LF = ord('\n')
+_CR = ord('\r')
+_SPACE = ord(' ')
+_TAB = ord('\t')
+_SLASH = ord('/')
+
+
+class ObjParseError(Exception):
+    pass
+
+
+class ObjMesh:
+    """Geometry of an OBJ file as NumPy arrays.
+
+    Faces are stored flat: the corners of face i are
+    face_vertices[face_offsets[i]:face_offsets[i + 1]] (0-based indices into
+    vertices), with matching face_uvs / face_normals when the file has them.
+    objects lists (name, first_face_index) for every 'o' / 'g' line.
+    """
+
+    def __init__(self):
+        self.vertices = np.zeros((0, 3))
+        self.uvs = np.zeros((0, 2))
+        self.normals = np.zeros((0, 3))
+        self.face_count = 0
+        # The face arrays stay None when the file was read with load_faces=False.
+        self.face_offsets = None
+        self.face_vertices = None
+        self.face_uvs = None
+        self.face_normals = None
+        self.objects = []
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    def face_arities(self):
+        return np.diff(self.face_offsets)
+
+    def triangle_count(self):
+        """Number of triangles after fan-triangulating every face."""
+        return int(np.maximum(self.face_arities() - 2, 0).sum())
+
+    def bbox(self):
+        """Returns (min_xyz, max_xyz) as arrays, or None for a mesh without vertices."""
+        if not len(self.vertices):
+            return None
+        return self.vertices.min(axis=0), self.vertices.max(axis=0)
+
+    def _fan_triangles(self):
+        """Corner index triples (into face_vertices) of the fan triangulation of every face."""
+        arities = self.face_arities()
+        face_of_corner = np.repeat(np.arange(len(arities)), arities)
+        local_index = np.arange(len(self.face_vertices)) - self.face_offsets[face_of_corner]
+        second_corners = np.flatnonzero((local_index >= 1) & (local_index <= arities[face_of_corner] - 2))
+        return self.face_offsets[face_of_corner[second_corners]], second_corners, second_corners + 1
+
+    def triangle_areas(self):
+        first, second, third = self._fan_triangles()
+        a = self.vertices[self.face_vertices[first]]
+        b = self.vertices[self.face_vertices[second]]
+        c = self.vertices[self.face_vertices[third]]
+        return 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+
+    def surface_area(self):
+        return float(self.triangle_areas().sum())
+
+    def uv_area(self):
+        """Area covered by the UV layout (overlapping islands counted twice), or None without UVs."""
+        if self.face_uvs is None or not len(self.face_uvs):
+            return None
+        first, second, third = self._fan_triangles()
+        a = self.uvs[self.face_uvs[first]]
+        b = self.uvs[self.face_uvs[second]]
+        c = self.uvs[self.face_uvs[third]]
+        ab, ac = b - a, c - a
+        return float(0.5 * np.abs(ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0]).sum())
+
+    def submesh(self, first_face, end_face):
+        """A new ObjMesh with faces first_face..end_face - 1 and only the vertices, UVs and normals they use."""
+        corner_slice = slice(self.face_offsets[first_face], self.face_offsets[end_face])
+        part = ObjMesh()
+        part.face_count = end_face - first_face
+        part.face_offsets = self.face_offsets[first_face:end_face + 1] - self.face_offsets[first_face]
+        used_vertices, part.face_vertices = np.unique(self.face_vertices[corner_slice], return_inverse=True)
+        part.vertices = self.vertices[used_vertices]
+        if self.face_uvs is not None:
+            used_uvs, part.face_uvs = np.unique(self.face_uvs[corner_slice], return_inverse=True)
+            part.uvs = self.uvs[used_uvs]
+        if self.face_normals is not None:
+            used_normals, part.face_normals = np.unique(self.face_normals[corner_slice], return_inverse=True)
+            part.normals = self.normals[used_normals]
+        part.objects = [(name, first - first_face) for name, first in self.objects if first_face <= first < end_face]
+        return part
+
+    def validate(self):
+        """Returns a list of problems (empty when the mesh looks sound)."""
+        problems = []
+        if not np.isfinite(self.vertices).all():
+            problems.append("vertex coordinates contain NaN or infinity")
+        if self.face_offsets is None:
+            return problems
+        short_faces = int((self.face_arities() < 3).sum())
+        if short_faces:
+            problems.append(f"{short_faces} face(s) with fewer than 3 corners")
+        for label, indices, count in (("vertex", self.face_vertices, len(self.vertices)),
+                                      ("UV", self.face_uvs, len(self.uvs)),
+                                      ("normal", self.face_normals, len(self.normals))):
+            if indices is None or not len(indices):
+                continue
+            out_of_range = int(((indices < 0) | (indices >= count)).sum())
+            if out_of_range:
+                problems.append(f"{out_of_range} face corner(s) reference a missing {label}")
+        return problems
+
+
+class _ChunkParser:
+    """Accumulates the arrays parsed from consecutive line-aligned chunks of one file."""
+
+    def __init__(self, load_faces):
+        self.load_faces = load_faces
+        self.vertex_parts, self.uv_parts, self.normal_parts = [], [], []
+        self.arity_parts, self.face_vertex_parts, self.face_uv_parts, self.face_normal_parts = [], [], [], []
+        self.counts = {"v": 0, "vt": 0, "vn": 0, "f": 0}
+        self.face_format = None
+        self.objects = []
+
+    def feed(self, data):
+        """Parses one chunk. data is a uint8 array of whole lines, ending with a line feed."""
+        line_ends = np.flatnonzero(data == _LF)
+        line_starts = np.empty_like(line_ends)
+        line_starts[0] = 0
+        line_starts[1:] = line_ends[:-1] + 1
+        last = len(data) - 1
+        c0 = data[line_starts]
+        c1 = data[np.minimum(line_starts + 1, last)]
+        c2 = data[np.minimum(line_starts + 2, last)]
+        ws1 = (c1 == _SPACE) | (c1 == _TAB)
+        ws2 = (c2 == _SPACE) | (c2 == _TAB)
+        is_v = (c0 == ord('v')) & ws1
+        is_vt = (c0 == ord('v')) & (c1 == ord('t')) & ws2
+        is_vn = (c0 == ord('v')) & (c1 == ord('n')) & ws2
+        is_f = (c0 == ord('f')) & ws1
+        is_object = ((c0 == ord('o')) | (c0 == ord('g'))) & ws1
+
+        object_lines = np.flatnonzero(is_object)
+        if len(object_lines):
+            faces_before_line = self.counts["f"] + np.cumsum(is_f)
+            for line_index in object_lines:
+                name = bytes(data[line_starts[line_index] + 2:line_ends[line_index]]).decode('utf-8', 'replace').strip()
+                self.objects.append((name, int(faces_before_line[line_index])))
+
+        if is_v.any():
+            self.vertex_parts.append(_parse_float_lines(data, line_starts, line_ends, is_v, 1, 3))
+        if is_vt.any():
+            self.uv_parts.append(_parse_float_lines(data, line_starts, line_ends, is_vt, 2, 2))
+        if is_vn.any():
+            self.normal_parts.append(_parse_float_lines(data, line_starts, line_ends, is_vn, 2, 3))
+        if is_f.any() and self.load_faces:
+            self._parse_faces(data, line_starts, line_ends, is_f, is_v, is_vt, is_vn)
+
+        self.counts["v"] += int(is_v.sum())
+        self.counts["vt"] += int(is_vt.sum())
+        self.counts["vn"] += int(is_vn.sum())
+        self.counts["f"] += int(is_f.sum())
+
+    def _parse_faces(self, data, line_starts, line_ends, is_f, is_v, is_vt, is_vn):
+        payload, payload_line_starts = _gather_line_payloads(data, line_starts, line_ends, is_f, 1)
+        token_starts = _token_starts(payload)
+        corners_per_face = np.diff(np.searchsorted(token_starts, np.append(payload_line_starts, len(payload))))
+        corner_count = int(corners_per_face.sum())
+
+        slashes = payload == _SLASH
+        slash_count = int(slashes.sum())
+        double_slash_count = int((slashes[:-1] & slashes[1:]).sum())
+        if slash_count == 0:
+            face_format = "v"
+        elif double_slash_count == corner_count and slash_count == 2 * corner_count:
+            face_format = "v//vn"
+        elif slash_count == corner_count and double_slash_count == 0:
+            face_format = "v/vt"
+        elif slash_count == 2 * corner_count and double_slash_count == 0:
+            face_format = "v/vt/vn"
+        else:
+            raise ObjParseError("Faces mix corner formats (v, v/vt, v//vn, v/vt/vn); only files with one format are supported.")
+        if self.face_format not in (None, face_format):
+            raise ObjParseError(f"Faces switch corner format from '{self.face_format}' to '{face_format}' part-way through the file.")
+        self.face_format = face_format
+
+        payload[slashes] = _SPACE
+        values_per_corner = {"v": 1, "v/vt": 2, "v//vn": 2, "v/vt/vn": 3}[face_format]
+        indices = _parse_numbers(payload, np.int64)
+        if indices is None or len(indices) != corner_count * values_per_corner:
+            raise ObjParseError("Could not parse all face indices (non-numeric or malformed 'f' line).")
+        indices = indices.reshape(corner_count, values_per_corner)
+
+        # OBJ indices are 1-based; negative ones count back from the last element defined before the face.
+        face_line_indices = np.flatnonzero(is_f)
+
+        def resolve(column, element_mask, key):
+            column = column.copy()
+            negative = column < 0
+            if negative.any():
+                defined_before = self.counts[key] + np.cumsum(element_mask)[face_line_indices]
+                column[negative] += np.repeat(defined_before, corners_per_face)[negative] + 1
+            return column - 1
+
+        self.arity_parts.append(corners_per_face)
+        self.face_vertex_parts.append(resolve(indices[:, 0], is_v, "v"))
+        if face_format in ("v/vt", "v/vt/vn"):
+            self.face_uv_parts.append(resolve(indices[:, 1], is_vt, "vt"))
+        if face_format in ("v//vn", "v/vt/vn"):
+            self.face_normal_parts.append(resolve(indices[:, -1], is_vn, "vn"))
+
+    def mesh(self):
+        mesh = ObjMesh()
+        if self.vertex_parts:
+            mesh.vertices = np.concatenate(self.vertex_parts)
+        if self.uv_parts:
+            mesh.uvs = np.concatenate(self.uv_parts)
+        if self.normal_parts:
+            mesh.normals = np.concatenate(self.normal_parts)
+        mesh.face_count = self.counts["f"]
+        mesh.objects = self.objects
+        if self.load_faces:
+            arities = np.concatenate(self.arity_parts) if self.arity_parts else np.zeros(0, dtype=np.int64)
+            mesh.face_offsets = np.zeros(len(arities) + 1, dtype=np.int64)
+            np.cumsum(arities, out=mesh.face_offsets[1:])
+            mesh.face_vertices = np.concatenate(self.face_vertex_parts) if self.face_vertex_parts else np.zeros(0, dtype=np.int64)
+            mesh.face_uvs = np.concatenate(self.face_uv_parts) if self.face_uv_parts else None
+            mesh.face_normals = np.concatenate(self.face_normal_parts) if self.face_normal_parts else None
+        return mesh
+
+
+def _gather_line_payloads(data, line_starts, line_ends, selected, keyword_length):
+    """Copies the selected lines (each including its line feed) into one array, blanking their keyword.
+
+    Returns (payload, payload_line_starts).
+    """
+    selected_lines = np.flatnonzero(selected)
+    first_line, last_line = selected_lines[0], selected_lines[-1]
+    if last_line - first_line + 1 == len(selected_lines):
+        # The usual case: all v (or vt, vn, f) lines of the chunk form one block.
+        payload = data[line_starts[first_line]:line_ends[last_line] + 1].copy()
+    else:
+        payload = data[np.repeat(selected, line_ends + 1 - line_starts)]
+    lengths = line_ends[selected] + 1 - line_starts[selected]
+    payload_line_starts = np.zeros(len(lengths), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=payload_line_starts[1:])
+    for keyword_offset in range(keyword_length):
+        payload[payload_line_starts + keyword_offset] = _SPACE
+    return payload, payload_line_starts
+
+
+def _token_starts(payload):
+    """Positions where a whitespace-separated token begins."""
+    whitespace = (payload == _SPACE) | (payload == _TAB) | (payload == _LF) | (payload == _CR)
+    previous_is_whitespace = np.empty_like(whitespace)
+    previous_is_whitespace[0] = True
+    previous_is_whitespace[1:] = whitespace[:-1]
+    return np.flatnonzero(~whitespace & previous_is_whitespace)
+
+
+def _parse_numbers(payload, dtype):
+    """Parses whitespace-separated numbers in C. Returns None if the text contains anything else."""
+    try:
+        return np.fromstring(payload.tobytes().decode('latin-1'), dtype=dtype, sep=' ')
+    except ValueError:
+        return None
+
+
+def _parse_number_rows(payload, payload_line_starts):
+    """Parses every number in payload. Returns (values, index of each line's first value, values per line)."""
+    values = _parse_numbers(payload, np.float64)
+    token_starts = _token_starts(payload)
+    if values is None or len(values) != len(token_starts):
+        raise ObjParseError("Could not parse all vertex data (non-numeric value in a 'v'/'vt'/'vn' line).")
+    first_token = np.searchsorted(token_starts, payload_line_starts)
+    tokens_per_line = np.diff(np.append(first_token, len(token_starts)))
+    return values, first_token, tokens_per_line
+
+
+def _parse_float_lines(data, line_starts, line_ends, selected, keyword_length, width):
+    """Parses the first `width` numbers of each selected line into a (lines, width) float array.
+
+    Extra values (the optional w of 'v', vertex colours, the w of 'vt') are dropped.
+    """
+    payload, payload_line_starts = _gather_line_payloads(data, line_starts, line_ends, selected, keyword_length)
+    values, first_token, tokens_per_line = _parse_number_rows(payload, payload_line_starts)
+    if (tokens_per_line == width).all():
+        return values.reshape(-1, width)
+    if (tokens_per_line < width).any():
+        raise ObjParseError(f"A vertex data line has fewer than {width} values.")
+    return values[first_token[:, None] + np.arange(width)]
+
+
+def read_obj(path, load_faces=True, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Reads an OBJ file into an ObjMesh via mmap, parsing it chunk by chunk with vectorized NumPy.
+
+    With load_faces=False only face_count is filled in for faces, which is much
+    faster when only vertex data (e.g. the bounding box) is needed.
+    Raises ObjParseError for files it cannot parse.
+    """
+    parser = _ChunkParser(load_faces)
+    _feed_file(path, parser, chunk_bytes)
+    return parser.mesh()
+
+
+def _feed_file(path, consumer, chunk_bytes):
+    """Memory-maps path and passes it to consumer.feed() in line-aligned chunks."""
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size == 0:
+            return
+        error = None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            try:
+                _feed_chunks(consumer, mapped, file_size, chunk_bytes)
+            except Exception as e:
+                # The traceback's frames hold NumPy views into the mapping, which would stop it from closing.
+                e.__traceback__ = None
+                error = e
+        if error is not None:
+            raise error
+
+
+def _feed_chunks(consumer, mapped, file_size, chunk_bytes):
+    buffer = np.frombuffer(mapped, dtype=np.uint8)
+    start = 0
+    while start < file_size:
+        end = min(start + chunk_bytes, file_size)
+        if end < file_size:
+            line_break = mapped.rfind(b'\n', start, end)
+            if line_break == -1:
+                line_break = mapped.find(b'\n', end)
+            end = line_break + 1 if line_break != -1 else file_size
+        chunk = buffer[start:end]
+        if chunk[-1] != _LF:
+            chunk = np.append(chunk, np.uint8(_LF))
+        consumer.feed(chunk)
+        start = end
+
+
+class _VertexScaler:
+    """Copies OBJ chunks to a file, rewriting 'v' lines with their positions scaled."""
+
+    def __init__(self, out_file, scale_factor, float_format, chunk_rows):
+        self.out_file = out_file
+        self.scale_factor = scale_factor
+        self.float_format = float_format
+        self.chunk_rows = chunk_rows
+        self.vertex_count = 0
+
+    def feed(self, data):
+        line_ends = np.flatnonzero(data == _LF)
+        line_starts = np.empty_like(line_ends)
+        line_starts[0] = 0
+        line_starts[1:] = line_ends[:-1] + 1
+        c1 = data[np.minimum(line_starts + 1, len(data) - 1)]
+        is_v = (data[line_starts] == ord('v')) & ((c1 == _SPACE) | (c1 == _TAB))
+        if not is_v.any():
+            self.out_file.write(data)
+            return
+
+        # Copy runs of other lines as they are; parse, scale and re-format runs of 'v' lines.
+        run_bounds = (np.flatnonzero(np.diff(is_v.astype(np.int8))) + 1).tolist()
+        for run_start, run_end in zip([0] + run_bounds, run_bounds + [len(line_ends)]):
+            block = data[line_starts[run_start]:line_ends[run_end - 1] + 1]
+            if is_v[run_start]:
+                self._write_vertices(block)
+            else:
+                self.out_file.write(block)
+
+    def _write_vertices(self, block):
+        block_line_ends = np.flatnonzero(block == _LF)
+        block_line_starts = np.empty_like(block_line_ends)
+        block_line_starts[0] = 0
+        block_line_starts[1:] = block_line_ends[:-1] + 1
+        all_lines = np.ones(len(block_line_ends), dtype=bool)
+        payload, payload_line_starts = _gather_line_payloads(block, block_line_starts, block_line_ends, all_lines, 1)
+        values, first_token, tokens_per_line = _parse_number_rows(payload, payload_line_starts)
+        if (tokens_per_line < 3).any():
+            raise ObjParseError("A 'v' line has fewer than 3 values.")
+        self.vertex_count += len(tokens_per_line)
+
+        width = int(tokens_per_line[0])
+        if (tokens_per_line == width).all():
+            # Extra values (w, vertex colours) are kept but not scaled.
+            rows = values.reshape(-1, width)
+            rows[:, :3] *= self.scale_factor
+            row_format = "v" + (" " + self.float_format) * width + "\n"
+            for start in range(0, len(rows), self.chunk_rows):
+                chunk = rows[start:start + self.chunk_rows]
+                self.out_file.write(((row_format * len(chunk)) % tuple(chunk.ravel().tolist())).encode('ascii'))
+            return
+
+        for first, count in zip(first_token.tolist(), tokens_per_line.tolist()):
+            line_values = values[first:first + count]
+            line_values[:3] *= self.scale_factor
+            self.out_file.write(("v" + (" " + self.float_format) * count + "\n").encode('ascii') % tuple(line_values.tolist()))
+
+
+def write_scaled_obj(source_path, target_path, scale_factor, float_format="%.6f",
+                     chunk_bytes=DEFAULT_CHUNK_BYTES, chunk_rows=DEFAULT_WRITE_CHUNK_ROWS):
+    """Streams an OBJ to target_path with every vertex position multiplied by scale_factor.
+
+    All other lines (UVs, normals, faces, groups, materials, comments) are
+    copied byte for byte. Only one chunk is in memory at a time, and the
+    output is written to a temporary file that replaces target_path at the
+    end. Returns the number of vertices written. Raises ObjParseError for
+    'v' lines it cannot parse.
+    """
+    temp_path = target_path + ".tmp"
+    try:
+        with open(temp_path, 'wb') as out_file:
+            scaler = _VertexScaler(out_file, scale_factor, float_format, chunk_rows)
+            _feed_file(source_path, scaler, chunk_bytes)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return scaler.vertex_count
+
+
+def _write_rows(f, tag, rows, float_format, chunk_rows):
+    if not len(rows):
+        return
+    row_format = tag + (" " + float_format) * rows.shape[1] + "\n"
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        f.write((row_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def _write_faces(f, mesh, first_face, end_face, chunk_rows):
+    corner_columns = [mesh.face_vertices]
+    if mesh.face_uvs is not None:
+        corner_columns.append(mesh.face_uvs)
+    if mesh.face_normals is not None:
+        corner_columns.append(mesh.face_normals)
+    if mesh.face_uvs is None and mesh.face_normals is not None:
+        corner_format = "%d//%d"
+    else:
+        corner_format = "/".join(["%d"] * len(corner_columns))
+
+    arities = mesh.face_arities()
+    # Faces are written in runs of equal corner count, so each run formats as one fixed-width table.
+    run_bounds = np.flatnonzero(np.diff(arities[first_face:end_face])) + 1 + first_face
+    run_starts = [first_face] + run_bounds.tolist()
+    run_ends = run_bounds.tolist() + [end_face]
+    for run_start, run_end in zip(run_starts, run_ends):
+        arity = int(arities[run_start])
+        row_format = "f" + (" " + corner_format) * arity + "\n"
+        for chunk_start in range(run_start, run_end, chunk_rows):
+            chunk_end = min(chunk_start + chunk_rows, run_end)
+            corner_slice = slice(mesh.face_offsets[chunk_start], mesh.face_offsets[chunk_end])
+            table = np.stack([column[corner_slice] for column in corner_columns], axis=-1) + 1
+            f.write((row_format * (chunk_end - chunk_start)) % tuple(table.ravel().tolist()))
+
+
+def write_obj(path, mesh, float_format="%.6f", chunk_rows=DEFAULT_WRITE_CHUNK_ROWS, header=None):
+    """Writes an ObjMesh as an OBJ file, formatting chunk_rows rows per write call.
+
+    All v/vt/vn data is written first, followed by the faces with an 'o' line
+    where each of mesh.objects starts.
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        if header:
+            f.write("".join(f"# {line}\n" for line in header.splitlines()))
+        _write_rows(f, "v", mesh.vertices, float_format, chunk_rows)
+        _write_rows(f, "vt", mesh.uvs, float_format, chunk_rows)
+        _write_rows(f, "vn", mesh.normals, float_format, chunk_rows)
+        if mesh.face_offsets is None:
+            return
+        face_total = len(mesh.face_offsets) - 1
+        segments = [(name, first_face) for name, first_face in mesh.objects if first_face <= face_total]
+        if not segments or segments[0][1] > 0:
+            segments.insert(0, (None, 0))
+        for segment_index, (name, first_face) in enumerate(segments):
+            end_face = segments[segment_index + 1][1] if segment_index + 1 < len(segments) else face_total
+            if name is not None:
+                f.write(f"o {name}\n")
+            if end_face > first_face:
+                _write_faces(f, mesh, first_face, end_face, chunk_rows)
+
+
+def concatenate_meshes(named_meshes):
+    """Joins a list of (name, ObjMesh) into one ObjMesh in which every pair is one object.
+
+    Face UVs and normals are kept only if every mesh has them.
+    """
+    meshes = [mesh for _, mesh in named_meshes]
+    keep_uvs = all(mesh.face_uvs is not None for mesh in meshes)
+    keep_normals = all(mesh.face_normals is not None for mesh in meshes)
+    vertex_starts = np.cumsum([0] + [len(mesh.vertices) for mesh in meshes])
+    uv_starts = np.cumsum([0] + [len(mesh.uvs) for mesh in meshes])
+    normal_starts = np.cumsum([0] + [len(mesh.normals) for mesh in meshes])
+    corner_starts = np.cumsum([0] + [len(mesh.face_vertices) for mesh in meshes])
+    face_starts = np.cumsum([0] + [len(mesh.face_offsets) - 1 for mesh in meshes])
+
+    joined = ObjMesh()
+    joined.vertices = np.concatenate([mesh.vertices for mesh in meshes])
+    joined.face_offsets = np.concatenate([np.zeros(1, dtype=np.int64)] +
+                                         [mesh.face_offsets[1:] + corner_starts[i] for i, mesh in enumerate(meshes)])
+    joined.face_vertices = np.concatenate([mesh.face_vertices + vertex_starts[i] for i, mesh in enumerate(meshes)])
+    if keep_uvs:
+        joined.uvs = np.concatenate([mesh.uvs for mesh in meshes])
+        joined.face_uvs = np.concatenate([mesh.face_uvs + uv_starts[i] for i, mesh in enumerate(meshes)])
+    if keep_normals:
+        joined.normals = np.concatenate([mesh.normals for mesh in meshes])
+        joined.face_normals = np.concatenate([mesh.face_normals + normal_starts[i] for i, mesh in enumerate(meshes)])
+    joined.face_count = int(face_starts[-1])
+    joined.objects = [(name, int(face_starts[i])) for i, (name, _) in enumerate(named_meshes)]
+    return joined
+
+
+def _shelf_layout(sides, shelf_width):
+    """Places squares left to right on shelves no wider than shelf_width. Returns (positions, extent of the layout)."""
+    positions = []
+    x = y = shelf_height = used_width = 0.0
+    for side in sides:
+        if x > 0 and x + side > shelf_width * (1 + 1e-9):
+            y += shelf_height
+            x = shelf_height = 0.0
+        positions.append((x, y))
+        x += side
+        shelf_height = max(shelf_height, side)
+        used_width = max(used_width, x)
+    return positions, max(used_width, y + shelf_height)
+
+
+def pack_square_tiles(weights, padding=0.0):
+    """Lays out one square tile per weight in the 0-1 UV square, each with an area proportional to its weight.
+
+    Tiles go on shelves, largest first, at whichever shelf width wastes the least space.
+    Returns one (scale, offset_u, offset_v) per weight: uv * scale + (offset_u, offset_v)
+    moves a 0-1 UV layout into its tile, inset by padding (a share of the tile's side) on every edge.
+    """
+    sides = np.sqrt(np.maximum(np.asarray(weights, dtype=np.float64), 0.0))
+    if not len(sides):
+        return []
+    if sides.max() <= 0:
+        sides[:] = 1.0
+    # A part without area still gets a small tile rather than none.
+    sides = np.maximum(sides, sides.max() * 0.01)
+    order = np.argsort(-sides, kind='stable')
+    sorted_sides = sides[order]
+
+    best_positions, best_extent = None, None
+    for shelf_width in np.cumsum(sorted_sides):
+        positions, extent = _shelf_layout(sorted_sides, shelf_width)
+        if best_extent is None or extent < best_extent:
+            best_positions, best_extent = positions, extent
+
+    tiles = [None] * len(sides)
+    for sorted_index, weight_index in enumerate(order):
+        side = sorted_sides[sorted_index] / best_extent
+        x, y = best_positions[sorted_index]
+        tiles[weight_index] = (float(side * (1 - 2 * padding)),
+                               float(x / best_extent + side * padding), float(y / best_extent + side * padding))
+    return tiles
@@ -1,30 +1,150 @@
-import sys 
 import json 
 import base64 
+import socket 
+import select 
+import asyncio 
 import subprocess 
  
-if sys.version_info >= (3, 0): 
- import http.client as http 
-else: 
- import httplib as http 
+import http.client as http 
  
-class RemotePainter() : 
- def __init__(self, port=60041, host='localhost'): 
+# Substance Painter's remote scripting API (/run.json) over HTTP/1.1. 
+# 
+# AsyncRemotePainter is the asyncio client. Every call can have its own timeout and can be 
+# cancelled, and one event loop can drive several Painter endpoints at once, one client each: 
+# 
+#   clients = [AsyncRemotePainter(port=port) for port in (60041, 60042)] 
+#   results = await asyncio.gather(*(client.execScript(script, "python", timeout=60) for client in clients)) 
+# 
+# Painter runs scripts one at a time, so a client sends its requests one after the other on a 
+# single kept-alive connection. RemotePainter is the blocking client: a thin wrapper that runs 
+# the asyncio client on an event loop of its own. 
+ 
+class AsyncRemotePainter() : 
+ def __init__(self, port=60041, host='localhost', timeout=3600) : 
   self._host = host 
   self._port = port 
+  self._timeout = timeout # Default per-call timeout in seconds (None waits forever) 
  
   # Json server connection 
   self._PAINTER_ROUTE = '/run.json' 
   self._HEADERS = {'Content-type': 'application/json', 'Accept': 'application/json'} 
  
- # Execute a HTTP POST request to the Substance Painter server and send/receive JSON data 
- def _jsonPostRequest( self, route, body, type ) : 
-  connection = http.HTTPConnection(self._host, self._port, timeout=3600) 
-  connection.request('POST', route, body, self._HEADERS) 
-  response = connection.getresponse() 
+  # One HTTP/1.1 connection, kept open between requests and reopened when the server drops it 
+  self._reader = None 
+  self._writer = None 
+  self._lock = None # Created on first use, inside the event loop that uses it 
+ 
+ def _getLock( self ) : 
+  if self._lock is None : 
+   self._lock = asyncio.Lock() 
+  return self._lock 
+ 
+ async def _connect( self ) : 
+  if self._writer is None : 
+   self._reader, self._writer = await asyncio.open_connection(self._host, self._port) 
+   sock = self._writer.get_extra_info('socket') 
+   if sock is not None : 
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) 
+ 
+ # Close the kept-alive connection (the next request opens a new one) 
+ def _closeConnection( self ) : 
+  if self._writer is not None : 
+   self._writer.close() 
+  self._reader = None 
+  self._writer = None 
+ 
+ async def close( self ) : 
+  writer = self._writer 
+  self._closeConnection() 
+  if writer is not None : 
+   try : 
+    await writer.wait_closed() 
+   except (OSError, asyncio.CancelledError) : 
+    pass 
+ 
+ async def _readResponse( self ) : 
+  reader = self._reader 
+  # Closed or reset before the first byte of an answer: the usual sign of a kept-alive 
+  # connection the server dropped. Once the answer has started, a failure is a real error. 
+  try : 
+   firstByte = await reader.read(1) 
+  except ConnectionError : 
+   firstByte = b'' 
+  if not firstByte : 
+   raise http.RemoteDisconnected('Remote end closed connection without response') 
+  try : 
+   statusLine = firstByte + await reader.readuntil(b'\r\n') 
+  except asyncio.IncompleteReadError as e : 
+   raise http.BadStatusLine(firstByte + e.partial) 
+  parts = statusLine.decode('iso-8859-1').split(None, 2) 
+  if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit() : 
+   raise http.BadStatusLine(statusLine) 
+  version = parts[0] 
+ 
+  headers = {} 
+  while True : 
+   line = await reader.readuntil(b'\r\n') 
+   if line == b'\r\n' : 
+    break 
+   name, _, value = line.decode('iso-8859-1').partition(':') 
+   headers[name.strip().lower()] = value.strip() 
+ 
+  connectionHeader = headers.get('connection', '').lower() 
+  willClose = connectionHeader == 'close' or (version == 'HTTP/1.0' and connectionHeader != 'keep-alive') 
+  if headers.get('transfer-encoding', '').lower() == 'chunked' : 
+   data = b'' 
+   while True : 
+    size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16) 
+    if size == 0 : 
+     while await reader.readuntil(b'\r\n') != b'\r\n' : # Trailers 
+      pass 
+     break 
+    data += await reader.readexactly(size) 
+    await reader.readexactly(2) 
+  elif 'content-length' in headers : 
+   data = await reader.readexactly(int(headers['content-length'])) 
+  else : 
+   data = await reader.read() 
+   willClose = True 
+  return data, willClose 
  
-  data = response.read() 
-  connection.close() 
+ async def _exchange( self, route, body ) : 
+  while True : 
+   reused = self._writer is not None 
+   sent = False 
+   try : 
+    await self._connect() 
+    request = 'POST {0} HTTP/1.1\r\nHost: {1}:{2}\r\nContent-Length: {3}\r\n'.format(route, self._host, self._port, len(body)) 
+    request += ''.join('{0}: {1}\r\n'.format(name, value) for name, value in self._HEADERS.items()) 
+    self._writer.write(request.encode('iso-8859-1') + b'\r\n' + body) 
+    await self._writer.drain() 
+    sent = True 
+    data, willClose = await self._readResponse() 
+   except ConnectionError as e : 
+    self._closeConnection() 
+    # A kept-alive connection the server has since closed fails while the request is written, 
+    # or is closed with no answer at all; the request is then sent once more on a new connection. 
+    # Anything that fails after part of an answer arrived may already have run the script 
+    # (a bake, a save, a submitted job), so it is never sent twice. 
+    if reused and (not sent or isinstance(e, http.RemoteDisconnected)) : 
+     continue 
+    raise 
+   except BaseException : 
+    # Timed out, cancelled or a broken response: the connection may still carry the 
+    # answer to this request, so it cannot be reused. Painter still finishes the script. 
+    self._closeConnection() 
+    raise 
+   if willClose : 
+    self._closeConnection() 
+   return data 
+ 
+ # Execute a HTTP POST request to the Substance Painter server and send/receive JSON data 
+ async def _jsonPostRequest( self, route, body, type, timeout ) : 
+  async with self._getLock() : 
+   try : 
+    data = await asyncio.wait_for(self._exchange(route, body), timeout) 
+   except asyncio.TimeoutError : 
+    raise socket.timeout('No answer from Substance Painter at {0}:{1} within {2}s'.format(self._host, self._port, timeout)) 
  
   if type == "js" : 
    data = json.loads( data.decode('utf-8') ) 
@@ -42,12 +162,23 @@ class RemotePainter() :
  
   return data 
  
- def checkConnection(self): 
-  connection = http.HTTPConnection(self._host, self._port) 
-  connection.connect() 
+ # Cheap liveness probe: an open connection the server has not closed is reused as it is, 
+ # otherwise the connection the next request will use is opened now. Raises if Painter is unreachable. 
+ async def checkConnection( self, timeout=None ) : 
+  async with self._getLock() : 
+   if self._writer is not None : 
+    sock = self._writer.get_extra_info('socket') 
+    readable = sock is not None and select.select([sock], [], [], 0)[0] 
+    if not readable and not self._reader.at_eof() : 
+     return 
+    self._closeConnection() # Readable while idle means the server closed it (or sent something unexpected) 
+   try : 
+    await asyncio.wait_for(self._connect(), timeout if timeout is not None else self._timeout) 
+   except asyncio.TimeoutError : 
+    raise socket.timeout('Could not connect to Substance Painter at {0}:{1}'.format(self._host, self._port)) 
  
- # Execute a command 
- def execScript( self, script, type ) : 
+ # Execute a command; timeout (seconds) overrides the client's default for this call 
+ async def execScript( self, script, type, timeout=None ) : 
   Command = base64.b64encode( script.encode('utf-8') ) 
  
   if type == "js" : 
@@ -57,7 +188,37 @@ class RemotePainter() :
  
   Command = Command.encode( "utf-8" ) 
  
-  return self._jsonPostRequest( self._PAINTER_ROUTE, Command, type ) 
+  return await self._jsonPostRequest( self._PAINTER_ROUTE, Command, type, timeout if timeout is not None else self._timeout ) 
+ 
+class RemotePainter() : 
+ def __init__(self, port=60041, host='localhost', timeout=3600) : 
+  self._client = AsyncRemotePainter(port, host, timeout) 
+  self._loop = asyncio.new_event_loop() # Private loop, so callers need no asyncio of their own 
+ 
+ def __enter__( self ) : 
+  return self 
+ 
+ def __exit__( self, excType, excValue, traceback ) : 
+  self.close() 
+ 
+ def _run( self, coroutine ) : 
+  return self._loop.run_until_complete(coroutine) 
+ 
+ # Close the connection and the client's event loop; the client cannot be used afterwards 
+ def close( self ) : 
+  if self._loop.is_closed() : 
+   return 
+  try : 
+   self._run(self._client.close()) 
+  finally : 
+   self._loop.close() 
+ 
+ def checkConnection( self, timeout=None ) : 
+  self._run(self._client.checkConnection(timeout)) 
+ 
+ # Execute a command 
+ def execScript( self, script, type, timeout=None ) : 
+  return self._run(self._client.execScript(script, type, timeout)) 
  
 class PainterError(Exception): 
  def __init__(self, message): 
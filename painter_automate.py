@@ -4,9 +4,21 @@ import os
 import time
 import json # For handling export configuration AND loading config
 import glob # For finding files
+import argparse # For --restart
+import lib_journal
+import math # For power-of-two texture sizes
+import base64 # For sending fused job parameters
+import shutil # For --install-agent
+import atexit # For closing the Painter client
+
+try:
+    import lib_obj
+except ImportError: # NumPy is not installed: every asset uses texture_resolution.
+    lib_obj = None
 
 # --- Load Configuration ---
-CONFIG_FILE_PATH = os.path.join(os.path.dirname(__file__), "config.json")
+# PIPELINE_CONFIG can point at a different config file (used by bench_stage1.py).
+CONFIG_FILE_PATH = os.environ.get("PIPELINE_CONFIG") or os.path.join(os.path.dirname(__file__), "config.json")
 def load_config():
     """Loads the configuration from config.json"""
     try:
@@ -34,40 +46,279 @@ try:
     SMART_MATERIAL_NAME = config["painter_settings"]["smart_material_name"]
     SMART_MATERIAL_LOCATION = config["painter_settings"]["smart_material_location"]
     BAKERS_TO_ENABLE = config["painter_settings"]["bakers_to_enable"]
+    # The high-poly format process_assets.py writes ("obj", "fbx" or "glb"); see blender_settings in config.json.
+    HIGH_POLY_FORMAT = config.get("blender_settings", {}).get("high_poly_format", "obj")
+
+    painter_settings = config["painter_settings"]
+    # Texture size of every asset when texel_density is 0, and the fallback when a mesh cannot be measured.
+    TEXTURE_RESOLUTION = painter_settings.get("texture_resolution", 4096)
+    # Target texels per scene unit of _low.obj (after scale_factor). 0 = TEXTURE_RESOLUTION for every asset.
+    TEXEL_DENSITY = painter_settings.get("texel_density", 0)
+    # Limits for the per-asset size derived from TEXEL_DENSITY.
+    MIN_TEXTURE_RESOLUTION = painter_settings.get("min_texture_resolution", 512)
+    MAX_TEXTURE_RESOLUTION = painter_settings.get("max_texture_resolution", 4096)
+    # Longest wait for Painter to finish loading a project, or to become idle after a step.
+    STEP_TIMEOUT_SECONDS = painter_settings.get("step_timeout_seconds", 300)
+    # Longest wait for a bake to end.
+    BAKE_TIMEOUT_SECONDS = painter_settings.get("bake_timeout_seconds", 3600)
+    # How often Painter's state is queried while waiting.
+    STATE_POLL_SECONDS = painter_settings.get("state_poll_seconds", 1.0)
+    # "steps": one remote script per step. "fused": one job per asset runs every step inside Painter (painter_pipeline_job.py).
+    # "agent": the painter_job_agent.py plugin, installed in Painter, runs all assets back to back.
+    PAINTER_JOB_MODE = painter_settings.get("job_mode", "steps")
+    # Painter's user python folder, for --install-agent. Empty = Documents/Adobe/Adobe Substance 3D Painter/python.
+    PAINTER_PYTHON_FOLDER = painter_settings.get("python_folder", "") or os.path.join(
+        os.path.expanduser("~"), "Documents", "Adobe", "Adobe Substance 3D Painter", "python")
 except KeyError as e:
     print(f"ERROR: Missing a required key in config.json: {e}")
     print("Please check your config.json structure against the expected format.")
     exit(1)
 
+if PAINTER_JOB_MODE not in ("steps", "fused", "agent"):
+    print(f"ERROR: Unknown job_mode '{PAINTER_JOB_MODE}' in painter_settings. Use \"steps\", \"fused\" or \"agent\".")
+    exit(1)
+
+# Texture sizes Painter accepts for a texture set: powers of two from 128 to 8192.
+PAINTER_TEXTURE_RESOLUTIONS = [2 ** exponent for exponent in range(7, 14)]
+for resolution_key, resolution_value in (("texture_resolution", TEXTURE_RESOLUTION),
+                                         ("min_texture_resolution", MIN_TEXTURE_RESOLUTION),
+                                         ("max_texture_resolution", MAX_TEXTURE_RESOLUTION)):
+    if type(resolution_value) is not int or resolution_value not in PAINTER_TEXTURE_RESOLUTIONS:
+        print(f"ERROR: {resolution_key} {resolution_value!r} in painter_settings is not a texture size Painter supports.")
+        print(f"Use a power of two from {PAINTER_TEXTURE_RESOLUTIONS[0]} to {PAINTER_TEXTURE_RESOLUTIONS[-1]}.")
+        exit(1)
+if MIN_TEXTURE_RESOLUTION > MAX_TEXTURE_RESOLUTION:
+    print(f"ERROR: min_texture_resolution ({MIN_TEXTURE_RESOLUTION}) is larger than max_texture_resolution ({MAX_TEXTURE_RESOLUTION}) in painter_settings.")
+    exit(1)
+
+# Step journal shared with process_assets.py (see lib_journal.py).
+JOURNAL_PATH = os.path.join(PROCESSED_OBJS_FOLDER, "_pipeline", "journal.jsonl")
+
+HIGH_POLY_FORMATS = ("obj", "fbx", "glb")
+
+# One Painter client shared by every step of every asset. lib_remote keeps its HTTP connection
+# open between requests, so a step costs one request instead of two new connections.
+# Polls of Painter's state and job results pass step_timeout_seconds as their own timeout; the
+# client's default (3600s) only covers the step scripts.
+PAINTER_REMOTE = lib_remote.RemotePainter()
+atexit.register(PAINTER_REMOTE.close) # Closes its connection and event loop on every exit path
+
+
+def find_high_poly_mesh(asset_base_name):
+    """Returns the path of the asset's high-poly mesh, in the configured format if it exists, else in any other known one (or None)."""
+    for extension in [HIGH_POLY_FORMAT] + [f for f in HIGH_POLY_FORMATS if f != HIGH_POLY_FORMAT]:
+        candidate_path = os.path.join(PROCESSED_OBJS_FOLDER, f"{asset_base_name}_high.{extension}")
+        if os.path.exists(candidate_path):
+            if extension != HIGH_POLY_FORMAT:
+                print(f"  Note: No _high.{HIGH_POLY_FORMAT} for '{asset_base_name}'; using '{candidate_path}' instead.")
+            return candidate_path
+    return None
+
+
+def texture_resolution_for_mesh(low_poly_path):
+    """Returns (resolution, details) for an asset's texture set.
+
+    With texel_density set, the side length is chosen so the low-poly surface gets about
+    texel_density texels per scene unit: sqrt(surface area / UV area) * texel_density, where
+    the UV area is the share of the 0-1 square its UV islands cover. The result is rounded to
+    the nearest power of two and clamped to min/max_texture_resolution. details is a short
+    description for the log.
+    """
+    if not TEXEL_DENSITY:
+        return TEXTURE_RESOLUTION, "fixed texture_resolution"
+    if lib_obj is None:
+        return TEXTURE_RESOLUTION, "texture_resolution (texel_density needs NumPy)"
+    try:
+        mesh = lib_obj.read_obj(low_poly_path)
+    except (OSError, lib_obj.ObjParseError) as e:
+        return TEXTURE_RESOLUTION, f"texture_resolution (could not read mesh: {e})"
+    surface_area = mesh.surface_area() if mesh.face_count else 0.0
+    if surface_area <= 0:
+        return TEXTURE_RESOLUTION, "texture_resolution (mesh has no surface area)"
+    uv_area = mesh.uv_area()
+    # Overlapping or out-of-range islands can add up to more than the square; a layout without UVs counts as filling it.
+    uv_coverage = min(max(uv_area, 0.01), 1.0) if uv_area else 1.0
+    wanted_side = math.sqrt(surface_area / uv_coverage) * TEXEL_DENSITY
+    resolution = 2 ** round(math.log2(max(wanted_side, 1.0)))
+    resolution = int(min(max(resolution, MIN_TEXTURE_RESOLUTION), MAX_TEXTURE_RESOLUTION))
+    return resolution, (f"surface area {surface_area:.4g}, UV coverage {uv_coverage:.0%}, "
+                        f"{wanted_side:.0f}px for {TEXEL_DENSITY:g} texels/unit")
+
+
+# --- Waiting on Painter's state ---
+# Steps end when Painter says so instead of after fixed sleeps. A small tracker installed in
+# Painter's Python counts the events that mark the end of asynchronous work (project ready for
+# edition, bake ended, export ended, project saved) with their status; the client polls it
+# together with project.is_open(), is_in_edition_state() and is_busy().
+
+PAINTER_EVENT_TRACKER_SCRIPT = """
+import sys
+import types
+import substance_painter.event
+
+if "pipeline_painter_events" not in sys.modules:
+    tracker = types.ModuleType("pipeline_painter_events")
+    tracker.events = {}
+    tracker.handlers = [] # Keeps the callbacks alive; the dispatcher may only hold weak references
+
+    def make_handler(name):
+        def handler(event):
+            entry = tracker.events.setdefault(name, {"count": 0, "status": None})
+            entry["count"] += 1
+            entry["status"] = str(getattr(event, "status", "")) or None
+        return handler
+
+    for name, event_type in (("project_edition_entered", substance_painter.event.ProjectEditionEntered),
+                             ("baking_ended", substance_painter.event.BakingProcessEnded),
+                             ("export_ended", substance_painter.event.ExportTexturesEnded),
+                             ("project_saved", substance_painter.event.ProjectSaved)):
+        handler = make_handler(name)
+        tracker.handlers.append(handler)
+        substance_painter.event.DISPATCHER.connect(event_type, handler)
+    sys.modules["pipeline_painter_events"] = tracker
+    print("[PAINTER LOG] Pipeline event tracker installed.")
+print("PYTHON_SCRIPT_EVENT_TRACKER_READY")
+"""
+
+PAINTER_STATE_QUERY_SCRIPT = """
+import sys
+import json
+import substance_painter.project
+
+tracker = sys.modules.get("pipeline_painter_events")
+project_open = substance_painter.project.is_open()
+state = {
+    "open": project_open,
+    "edition": bool(project_open and substance_painter.project.is_in_edition_state()),
+    "busy": bool(substance_painter.project.is_busy()) if hasattr(substance_painter.project, "is_busy") else None,
+    "events": tracker.events if tracker is not None else None,
+}
+print("PIPELINE_PAINTER_STATE " + json.dumps(state))
+"""
+
+
+def install_painter_event_tracker():
+    """Installs the event tracker in Painter (once per Painter session). Returns True if it is in place."""
+    try:
+        response_from_painter = PAINTER_REMOTE.execScript(PAINTER_EVENT_TRACKER_SCRIPT, "python")
+    except Exception as e:
+        print(f"  WARNING: Could not install the Painter event tracker: {e}")
+        return False
+    return bool(response_from_painter) and "PYTHON_SCRIPT_EVENT_TRACKER_READY" in response_from_painter
+
+
+def query_painter_state():
+    """Returns Painter's state as {"open", "edition", "busy", "events"}, or None if it cannot be read right now."""
+    try:
+        response_from_painter = PAINTER_REMOTE.execScript(PAINTER_STATE_QUERY_SCRIPT, "python", timeout=STEP_TIMEOUT_SECONDS)
+    except Exception:
+        return None # Painter can be too busy to answer (e.g. while loading a mesh); ask again on the next poll
+    for line in (response_from_painter or "").splitlines():
+        if line.startswith("PIPELINE_PAINTER_STATE "):
+            try:
+                return json.loads(line[len("PIPELINE_PAINTER_STATE "):])
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def event_count(state, event_name):
+    """How often the tracker has seen an event (0 if the state or tracker is unknown)."""
+    events = (state or {}).get("events") or {}
+    return events.get(event_name, {}).get("count", 0)
+
+
+def read_event_count(event_name, step_description):
+    """The tracker's count for event_name before a step starts, so the step's own event can be told from earlier ones.
+
+    Asks again until Painter answers, for up to step_timeout_seconds. Returns None if it never does;
+    the step must then not be started, since its end could not be recognised.
+    """
+    start_time = time.monotonic()
+    while True:
+        state = query_painter_state()
+        if state is not None:
+            return event_count(state, event_name)
+        if time.monotonic() - start_time >= STEP_TIMEOUT_SECONDS:
+            print(f"  WARNING: Painter did not report its state within {STEP_TIMEOUT_SECONDS:g}s; not starting the {step_description}.")
+            return None
+        time.sleep(STATE_POLL_SECONDS)
+
+
+def wait_for_painter(description, is_ready, timeout_seconds):
+    """Polls Painter's state until is_ready(state) is true. Returns (ready, last state).
+
+    Returns as soon as Painter reports the condition; gives up after timeout_seconds.
+    """
+    start_time = time.monotonic()
+    state = None
+    while True:
+        state = query_painter_state()
+        if state is not None and is_ready(state):
+            print(f"  Painter {description} after {time.monotonic() - start_time:.1f}s.")
+            return True, state
+        if time.monotonic() - start_time >= timeout_seconds:
+            print(f"  WARNING: Painter not {description} after {timeout_seconds:g}s (last state: {state}); moving on.")
+            return False, state
+        time.sleep(STATE_POLL_SECONDS)
+
+
+def painter_is_idle(state):
+    return state["open"] and state["busy"] is not True
+
+
+def painter_project_ready(state):
+    return state["open"] and state["edition"] and state["busy"] is not True
+
+
+def event_seen_since(event_name, count_before):
+    """A readiness check for wait_for_painter: the event fired again since count_before was read.
+
+    Without the tracker (e.g. Painter was restarted since it was installed) the step counts as
+    done once the project is idle.
+    """
+    def is_ready(state):
+        if state["events"] is None:
+            return painter_is_idle(state)
+        return event_count(state, event_name) > count_before and painter_is_idle(state)
+    return is_ready
+
+
+def event_status(state, event_name):
+    """The status the tracker recorded for the event's last occurrence (e.g. "BakingStatus.Success"), or None."""
+    return ((state or {}).get("events") or {}).get(event_name, {}).get("status")
+
+# Project settings for every new project. These could be moved to config.json if more control is
+# needed; for now they are common defaults. The resolution is chosen per asset (texture_resolution_for_mesh).
+PROJECT_SETTINGS = {
+    "normal_map_format": "DirectX", # Options: "DirectX", "OpenGL"
+    "compute_tangent_space_per_fragment": True,
+    "use_uv_tile_workflow": False, # Set to True for UDIM workflows
+    "import_cameras": False,
+}
+
 # Part1: Project Creation
 # Part1: Project Creation
-def run_project_creation_only(low_poly_mesh_path_for_project): # NEW: Takes specific low-poly mesh path
+def run_project_creation_only(low_poly_mesh_path_for_project, texture_resolution=TEXTURE_RESOLUTION): # NEW: Takes specific low-poly mesh path
     print(f"Attempting to create project with: {low_poly_mesh_path_for_project}")
+    creation_successful_signal = False
 
     if not os.path.exists(low_poly_mesh_path_for_project):
         print(f"!!! ERROR: Low-poly mesh path does not exist: {low_poly_mesh_path_for_project}")
-        return # Exit this function call if mesh not found
+        return False # Exit this function call if mesh not found
 
     try:
-        remote = lib_remote.RemotePainter()
+        remote = PAINTER_REMOTE
         remote.checkConnection()
     except Exception as e:
         print(f"Error: Could not connect to Substance Painter: {e}")
         print("Ensure Painter is running with '--enable-remote-scripting'.")
-        return # Exit this function call if connection fails
+        return False # Exit this function call if connection fails
 
     # Escape backslashes for the Painter script string
     lp_mesh_path_escaped = low_poly_mesh_path_for_project.replace('\\', '\\\\')
 
-    # These project settings could be moved to config.json if more control is needed
-    # For now, keeping them here as they are common defaults.
-    project_settings_from_ui = {
-        "default_texture_resolution": 4096,
-        "normal_map_format": "DirectX", # Options: "DirectX", "OpenGL"
-        "compute_tangent_space_per_fragment": True,
-        "use_uv_tile_workflow": False, # Set to True for UDIM workflows
-        "import_cameras": False,
-    }
+    project_settings_from_ui = dict(PROJECT_SETTINGS, default_texture_resolution=texture_resolution)
 
     command_to_execute_create_project = f"""
 import substance_painter.project
@@ -142,6 +393,7 @@ try:
 
     if substance_painter.project.is_open():
         print("[PAINTER LOG] SUCCESS: Project creation call completed. Project is now open.")
+        print("PYTHON_SCRIPT_PROJECT_CREATED_SUCCESSFULLY")
     else:
         print("[PAINTER LOG] ERROR: Project creation call completed, but NO project seems to be open. This is unexpected.")
 
@@ -169,11 +421,65 @@ print("[PAINTER LOG] --- Python Project Creation Script End ---")
             print("No explicit stdout from Painter's Python script, check Painter's log/UI.")
         print("----------------------------------------------------------\n")
         print("Project creation command sent. Please check Substance Painter UI and its Log window for results.")
+        creation_successful_signal = bool(response_from_painter) and "PYTHON_SCRIPT_PROJECT_CREATED_SUCCESSFULLY" in response_from_painter
     except lib_remote.ExecuteScriptError as ese:
         print(f"!!! Painter's API reported an ERROR during Python script execution: {ese}")
     except Exception as e:
         print(f"!!! An error occurred sending the Python command or processing response: {e}")
 
+    return creation_successful_signal
+
+
+# Resume: Open a saved project
+def run_open_project(project_spp_path):
+    """Opens an .spp saved by an earlier run (baked and textured), so only the steps after saving are repeated."""
+    print(f"Attempting to open saved project: {project_spp_path}")
+    open_successful_signal = False
+
+    try:
+        remote = PAINTER_REMOTE
+        remote.checkConnection()
+    except Exception as e:
+        print(f"Error: Could not connect to Substance Painter for opening project: {e}")
+        return False
+
+    spp_path_for_painter_cmd = project_spp_path.replace('\\', '/')
+    command_to_execute_open = f"""
+import substance_painter.project
+import substance_painter.exception
+
+print("[PAINTER LOG] --- Python Open Project Script Start ---")
+try:
+    if substance_painter.project.is_open():
+        print("[PAINTER LOG] A project is already open. Closing it first.")
+        substance_painter.project.close()
+    substance_painter.project.open("{spp_path_for_painter_cmd}")
+    if substance_painter.project.is_open():
+        print("[PAINTER LOG] SUCCESS: Opened '{spp_path_for_painter_cmd}'.")
+        print("PYTHON_SCRIPT_PROJECT_OPENED_SUCCESSFULLY")
+    else:
+        print("[PAINTER LOG] ERROR: Open call completed, but no project is open.")
+except substance_painter.exception.ProjectError as pe:
+    print(f"[PAINTER LOG] !!! ProjectError while opening project: {{str(pe)}}")
+except Exception as e_open:
+    print(f"[PAINTER LOG] !!! EXCEPTION while opening project: {{str(e_open)}}")
+print("[PAINTER LOG] --- Python Open Project Script End ---")
+"""
+    print(f"\n--- Sending Open Project Command to Painter ---")
+    try:
+        response_from_painter = remote.execScript(command_to_execute_open, "python")
+        if response_from_painter:
+            print(response_from_painter)
+            open_successful_signal = "PYTHON_SCRIPT_PROJECT_OPENED_SUCCESSFULLY" in response_from_painter
+        else:
+            print("No explicit stdout from Painter's Python script for opening the project, check Painter's log/UI.")
+    except lib_remote.ExecuteScriptError as ese:
+        print(f"!!! Painter's API reported an ERROR while opening the project: {ese}")
+    except Exception as e:
+        print(f"!!! An error occurred sending the open project command: {e}")
+
+    return open_successful_signal
+
 
 # Part 2: Rename Texture Set
 # Part 2: Rename Texture Set
@@ -183,7 +489,7 @@ def run_rename_texture_set(target_material_name):
     rename_successful_signal = False  # To indicate if Painter script confirmed success
 
     try:
-        remote = lib_remote.RemotePainter()
+        remote = PAINTER_REMOTE
         remote.checkConnection()
     except Exception as e:
         print(f"Error: Could not connect to Substance Painter for renaming: {e}")
@@ -262,7 +568,7 @@ def run_apply_smart_material(smart_material_name_to_apply, smart_material_shelf_
     print(f"\n--- Applying Smart Material '{smart_material_name_to_apply}' from shelf '{smart_material_shelf_context}' ---")
 
     try:
-        remote = lib_remote.RemotePainter()
+        remote = PAINTER_REMOTE
         remote.checkConnection()
     except Exception as e:
         print(f"Error: Could not connect to Substance Painter for applying Smart Material: {e}")
@@ -387,7 +693,7 @@ def run_bake_high_res_mesh(target_texture_set_name, high_poly_mesh_path_str):
         return False # Return False if high-poly mesh is missing
 
     try:
-        remote = lib_remote.RemotePainter()
+        remote = PAINTER_REMOTE
         remote.checkConnection()
     except Exception as e:
         print(f"Error: Could not connect to Substance Painter for baking: {e}")
@@ -465,11 +771,7 @@ else:
                 }})
                 print(f"[PAINTER LOG] Common parameters set: HipolyMesh={{hp_mesh_qurl_str}}. OutputSize will use Painter defaults.")
 
-                # Pause as originally requested in one of the script versions
                 print("[PAINTER LOG] High-poly mesh path parameter has been set.")
-                print("[PAINTER LOG] Pausing for 30 seconds before configuring bakers and starting bake...")
-                time.sleep(30) # The requested 30-second pause
-                print("[PAINTER LOG] Pause finished. Continuing with bake setup.")
 
                 # Configure which bakers to enable
                 baker_enums_to_enable = []
@@ -557,7 +859,7 @@ def run_save_project(project_full_save_path): # Takes the full path for the .spp
     save_successful_signal = False
 
     try:
-        remote = lib_remote.RemotePainter()
+        remote = PAINTER_REMOTE
         remote.checkConnection()
     except Exception as e:
         print(f"Error: Could not connect to Substance Painter for saving project: {e}")
@@ -639,27 +941,8 @@ print("[PAINTER LOG] --- Python Save Project Script End ---")
     return save_successful_signal
 
 # Part 6: Export Textures using glTF PBR Metal Roughness PREDEFINED PRESET
-def run_export_textures_gltf_preset(texture_set_name_to_export, output_directory_for_textures):
-    print(f"\n--- Attempting to Export Textures for '{texture_set_name_to_export}' using 'glTF PBR Metal Roughness' preset ---")
-    print(f"Output directory for textures: {output_directory_for_textures}")
-    export_successful_signal = False
-
-    # Ensure the output directory for textures exists
-    if not os.path.exists(output_directory_for_textures):
-        try:
-            os.makedirs(output_directory_for_textures)
-            print(f"Created output directory for textures: {output_directory_for_textures}")
-        except OSError as e:
-            print(f"!!! ERROR: Could not create output directory '{output_directory_for_textures}' for textures: {e}")
-            return False # Cannot export if directory can't be made
-
-    try:
-        remote = lib_remote.RemotePainter()
-        remote.checkConnection()
-    except Exception as e:
-        print(f"Error: Could not connect to Substance Painter for exporting textures: {e}")
-        return False # Cannot export if not connected
-
+def gltf_export_config(texture_set_name_to_export, output_directory_for_textures, texture_resolution):
+    """The export_project_textures configuration for one texture set, shared by both job modes."""
     # Convert output directory path to forward slashes for the Painter script
     output_dir_for_painter_cmd = output_directory_for_textures.replace('\\', '/')
 
@@ -684,15 +967,40 @@ def run_export_textures_gltf_preset(texture_set_name_to_export, output_directory
                 "parameters": {
                     "paddingAlgorithm": "infinite", # Common padding options: "infinite", "dilation" (older), "passthrough"
                     "dilationDistance": 16, # Used if paddingAlgorithm is "dilation" or similar
-                    # File format, bit depth, and size are usually determined by the export preset itself.
+                    # Export at the asset's texture resolution: 11 for 2048 (2^11), 12 for 4096 (2^12)
+                    "sizeLog2": int(math.log2(texture_resolution)),
+                    # File format and bit depth are usually determined by the export preset itself.
                     # If you need to override them, you can add keys like:
                     # "fileFormat": "png",
                     # "bitDepth": "8",
-                    # "sizeLog2": "11" # for 2048 (2^11), 12 for 4096 (2^12)
                 }
             }
         ]
     }
+    return export_config_dict
+
+def run_export_textures_gltf_preset(texture_set_name_to_export, output_directory_for_textures, texture_resolution=TEXTURE_RESOLUTION):
+    print(f"\n--- Attempting to Export Textures for '{texture_set_name_to_export}' using 'glTF PBR Metal Roughness' preset ---")
+    print(f"Output directory for textures: {output_directory_for_textures}")
+    export_successful_signal = False
+
+    # Ensure the output directory for textures exists
+    if not os.path.exists(output_directory_for_textures):
+        try:
+            os.makedirs(output_directory_for_textures)
+            print(f"Created output directory for textures: {output_directory_for_textures}")
+        except OSError as e:
+            print(f"!!! ERROR: Could not create output directory '{output_directory_for_textures}' for textures: {e}")
+            return False # Cannot export if directory can't be made
+
+    try:
+        remote = PAINTER_REMOTE
+        remote.checkConnection()
+    except Exception as e:
+        print(f"Error: Could not connect to Substance Painter for exporting textures: {e}")
+        return False # Cannot export if not connected
+
+    export_config_dict = gltf_export_config(texture_set_name_to_export, output_directory_for_textures, texture_resolution)
     # Convert the dictionary to a JSON string to safely embed it in the f-string
     export_config_json_str_for_fstring = json.dumps(export_config_dict)
 
@@ -788,9 +1096,237 @@ print("[PAINTER LOG] --- Python Texture Export (glTF Preset) Script End ---")
 
 
 
+# Fused mode: one Painter job per asset
+# painter_pipeline_job.py runs every step inside Painter, advancing on Painter's own events, and keeps
+# a structured result there. The client sends it once per asset and then only polls that result.
+PAINTER_JOB_SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "painter_pipeline_job.py")
+PAINTER_JOB_RESULT_PREFIX = "PIPELINE_JOB_RESULT "
+PAINTER_JOB_RESULT_SCRIPT = """
+import sys
+module = sys.modules.get("pipeline_painter_job")
+if module is not None and hasattr(module, "print_result"):
+    module.print_result()
+"""
+PAINTER_JOB_CANCEL_SCRIPT = """
+import sys
+module = sys.modules.get("pipeline_painter_job")
+if module is not None and hasattr(module, "cancel_job"):
+    module.cancel_job({reason!r})
+"""
+
+
+def parse_job_result(response_from_painter):
+    """The job result printed by painter_pipeline_job.py, or None."""
+    for line in (response_from_painter or "").splitlines():
+        if line.startswith(PAINTER_JOB_RESULT_PREFIX):
+            try:
+                return json.loads(line[len(PAINTER_JOB_RESULT_PREFIX):])
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def print_new_job_steps(result, reported_steps):
+    """Prints the job's steps from index reported_steps on. Returns the new number of reported steps."""
+    for step_result in result["steps"][reported_steps:]:
+        message = f" ({step_result['message']})" if step_result.get("message") else ""
+        print(f"  [{step_result['step']}] {step_result['status']} in {step_result['seconds']:.1f}s{message}")
+    return len(result["steps"])
+
+
+def job_step_timeout(result):
+    """A reason to cancel the job if its current step has run past its timeout, else None."""
+    current = result.get("current")
+    if current is None:
+        return None
+    timeout_seconds = BAKE_TIMEOUT_SECONDS if current["step"] == "bake" else STEP_TIMEOUT_SECONDS
+    if current["seconds"] <= timeout_seconds:
+        return None
+    return f"{current['step']} did not finish within {timeout_seconds:g}s"
+
+
+def run_fused_painter_job(job_params):
+    """Sends one asset's steps to Painter as a single job and polls until it ends.
+
+    Returns the job's result, {"state", "steps": [{"step", "status", "seconds", "message"}], ...},
+    or None if the job could not be started. A step that runs past step_timeout_seconds
+    (bake_timeout_seconds for the bake) cancels the job.
+    """
+    print(f"\n--- Sending fused Painter job for '{job_params['asset']}': {' -> '.join(job_params['steps'])} ---")
+    try:
+        with open(PAINTER_JOB_SCRIPT_PATH, 'r', encoding='utf-8') as f:
+            job_script = f.read()
+    except OSError as e:
+        print(f"!!! ERROR: Could not read {PAINTER_JOB_SCRIPT_PATH}: {e}")
+        return None
+    encoded_params = base64.b64encode(json.dumps(job_params).encode('utf-8')).decode('ascii')
+    try:
+        PAINTER_REMOTE.checkConnection()
+        response_from_painter = PAINTER_REMOTE.execScript(f"{job_script}\nstart_job('{encoded_params}')\n", "python")
+    except Exception as e:
+        print(f"!!! An error occurred sending the Painter job: {e}")
+        return None
+    result = parse_job_result(response_from_painter)
+    if result is None:
+        print("!!! Painter did not start the job. Response:")
+        print(response_from_painter)
+        return None
+
+    reported_steps = 0
+    last_answer_time = time.monotonic()
+    while True:
+        reported_steps = print_new_job_steps(result, reported_steps)
+        if result["state"] != "running":
+            print(f"  Painter job {result['state']} after {result['total_seconds']:.1f}s.")
+            return result
+        reason = job_step_timeout(result)
+        if reason is not None:
+            print(f"  WARNING: {reason}; cancelling the Painter job.")
+            try:
+                result = parse_job_result(PAINTER_REMOTE.execScript(PAINTER_JOB_CANCEL_SCRIPT.format(reason=reason), "python")) or result
+            except Exception as e:
+                print(f"  WARNING: Could not cancel the Painter job: {e}")
+            if result["state"] == "running":
+                result["state"] = "cancelled"
+            continue
+        time.sleep(STATE_POLL_SECONDS)
+        try:
+            polled_result = parse_job_result(PAINTER_REMOTE.execScript(PAINTER_JOB_RESULT_SCRIPT, "python", timeout=STEP_TIMEOUT_SECONDS))
+        except Exception:
+            polled_result = None # Painter can be too busy to answer (e.g. while loading a mesh)
+        if polled_result is not None:
+            result = polled_result
+            last_answer_time = time.monotonic()
+        elif time.monotonic() - last_answer_time > STEP_TIMEOUT_SECONDS:
+            print(f"  WARNING: Painter has not answered for {STEP_TIMEOUT_SECONDS:g}s; giving up on this job.")
+            result["state"] = "unanswered"
+            return result
+
+
+def record_fused_job_steps(journal, asset_base_name, job_steps, result, key):
+    """Journals the steps of a fused or agent job (a step without a "done" result counts as failed).
+
+    job_steps are the steps the job was sent with; steps it ran instead (fallback_steps) are journaled too.
+    Returns True if the export succeeded.
+    """
+    step_statuses = {step_result["step"]: step_result["status"] for step_result in (result or {}).get("steps", [])}
+    for step in lib_journal.PAINTER_STEPS: # "open" is not a journaled step
+        if step not in job_steps and step not in step_statuses:
+            continue
+        succeeded = step_statuses.get(step) == "done"
+        if step == "save":
+            # Only a save that follows a confirmed bake is a checkpoint a later run may resume from.
+            succeeded = succeeded and step_statuses.get("bake") == "done"
+        record_painter_step(journal, asset_base_name, step, succeeded, key)
+    return step_statuses.get("export") == "done"
+
+
+# Agent mode: the resident painter_job_agent.py plugin
+# The plugin keeps painter_pipeline_job.py loaded in Painter, so a request is a two-line script with
+# JSON arguments. All queued assets are submitted at once and run back to back inside Painter.
+AGENT_VERSION = 1 # Must match painter_job_agent.AGENT_VERSION
+AGENT_RESPONSE_PREFIX = "PIPELINE_AGENT_RESPONSE "
+AGENT_PLUGIN_FILES = (("painter_job_agent.py", "plugins"), ("painter_pipeline_job.py", "modules"))
+
+
+def install_job_agent():
+    """Copies the agent plugin and the job module into Painter's python folder."""
+    repo_folder = os.path.dirname(os.path.abspath(__file__))
+    for file_name, subfolder in AGENT_PLUGIN_FILES:
+        target_folder = os.path.join(PAINTER_PYTHON_FOLDER, subfolder)
+        try:
+            os.makedirs(target_folder, exist_ok=True)
+            shutil.copy2(os.path.join(repo_folder, file_name), os.path.join(target_folder, file_name))
+        except OSError as e:
+            print(f"ERROR: Could not install {file_name} into '{target_folder}': {e}")
+            print("Set painter_settings.python_folder in config.json to Painter's python folder if it is elsewhere.")
+            exit(1)
+        print(f"Installed {file_name} -> {target_folder}")
+    print("Restart Substance Painter (or reload plugins) and enable 'painter_job_agent' in the Python menu once.")
+
+
+def agent_request(request):
+    """Sends one request to the job agent. Returns its response, or None if the agent did not answer."""
+    script = f"import painter_job_agent\nprint(painter_job_agent.handle_request({json.dumps(request)!r}))\n"
+    try:
+        response_from_painter = PAINTER_REMOTE.execScript(script, "python", timeout=STEP_TIMEOUT_SECONDS)
+    except Exception:
+        return None # Not installed (ImportError) or Painter too busy to answer
+    for line in (response_from_painter or "").splitlines():
+        if line.startswith(AGENT_RESPONSE_PREFIX):
+            try:
+                return json.loads(line[len(AGENT_RESPONSE_PREFIX):])
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def run_agent_queue(job_params_list):
+    """Submits every job to the agent and polls until all have ended.
+
+    Yields (job_params, result) as each job ends, so the caller can journal it right away.
+    result is None for jobs the agent never reported on.
+    """
+    params_by_asset = {job_params["asset"]: job_params for job_params in job_params_list}
+    response = agent_request({"op": "submit", "jobs": job_params_list})
+    if response is None or not response.get("ok"):
+        print(f"!!! The Painter job agent did not accept the jobs: {response.get('error') if response else 'no answer'}")
+        for job_params in job_params_list:
+            yield job_params, None
+        return
+    print(f"Submitted {len(job_params_list)} asset(s) to the Painter job agent.")
+    finished_seen = response["finished_base"]
+    reported_steps = {} # asset -> steps already printed
+    last_answer_time = time.monotonic()
+    while True:
+        for result in response["finished"] + ([response["active"]] if response["active"] else []):
+            asset = result["asset"]
+            if asset not in params_by_asset:
+                continue # Queued by another client
+            if asset not in reported_steps:
+                print(f"\n--- Painter job agent: '{asset}' ({' -> '.join(params_by_asset[asset]['steps'])}) ---")
+            reported_steps[asset] = print_new_job_steps(result, reported_steps.get(asset, 0))
+            if result["state"] != "running":
+                print(f"  Painter job {result['state']} after {result['total_seconds']:.1f}s.")
+                yield params_by_asset.pop(asset), result
+        finished_seen += len(response["finished"])
+        if not params_by_asset:
+            return
+        reason = job_step_timeout(response["active"]) if response["active"] else None
+        if reason is not None and response["active"]["asset"] in params_by_asset:
+            print(f"  WARNING: {reason}; cancelling the job for '{response['active']['asset']}'.")
+            agent_request({"op": "cancel", "asset": response["active"]["asset"], "reason": reason})
+        time.sleep(STATE_POLL_SECONDS)
+        polled_response = agent_request({"op": "status", "finished_seen": finished_seen})
+        if polled_response is not None and polled_response.get("ok"):
+            response = polled_response
+            last_answer_time = time.monotonic()
+        else:
+            response = {"finished": [], "active": None}
+            if time.monotonic() - last_answer_time > STEP_TIMEOUT_SECONDS:
+                print(f"  WARNING: The Painter job agent has not answered for {STEP_TIMEOUT_SECONDS:g}s; giving up on {len(params_by_asset)} asset(s).")
+                for job_params in list(params_by_asset.values()):
+                    yield job_params, None
+                return
+
+
 # Last Part: Main Automation Loop (Entry point when script is run directly)
 
+def record_painter_step(journal, asset_base_name, step, succeeded, key):
+    journal.record("painter", asset_base_name, step, "done" if succeeded else "failed", key)
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Stage 2: texture every processed asset in Substance Painter.")
+    arg_parser.add_argument("--restart", action="store_true", help="Ignore the journal and run every step for every asset again.")
+    arg_parser.add_argument("--assets", nargs="+", metavar="ASSET", help="Only process these assets (used by watch_assets.py).")
+    arg_parser.add_argument("--install-agent", action="store_true", help="Install the Painter job agent plugin (job_mode \"agent\") into Painter's python folder and exit.")
+    cli_args = arg_parser.parse_args()
+
+    if cli_args.install_agent:
+        install_job_agent()
+        exit()
+
     print("--- Substance Painter Batch Automation Script ---")
     print(f"Loading configuration from: {CONFIG_FILE_PATH}")
     # Config is already loaded globally at the script start, so 'config' variable is available.
@@ -804,6 +1340,10 @@ if __name__ == "__main__":
     # glob.glob finds files matching the pattern
     search_pattern_low_poly = os.path.join(PROCESSED_OBJS_FOLDER, "*_low.obj")
     low_poly_files = glob.glob(search_pattern_low_poly)
+    if cli_args.assets:
+        # Parts of a split asset (split_objects "separate") are named <asset>__<part>.
+        low_poly_files = [path for path in low_poly_files
+                          if os.path.basename(path)[:-8] in cli_args.assets or os.path.basename(path)[:-8].rsplit("__", 1)[0] in cli_args.assets]
 
     if not low_poly_files:
         print(f"No qualifying '*_low.obj' files found in '{PROCESSED_OBJS_FOLDER}'. Exiting.")
@@ -815,17 +1355,38 @@ if __name__ == "__main__":
     assets_processed_count = 0
     assets_skipped_count = 0
     assets_with_errors_count = 0
+    assets_already_done_count = 0
+
+    # Steps finished by earlier (possibly interrupted) runs are read from the journal.
+    journal = lib_journal.Journal(JOURNAL_PATH)
+    print(f"Run journal: {JOURNAL_PATH}{' (ignored: --restart)' if cli_args.restart else ''}")
 
     # --- Initial Painter Connection Check (Optional but good for early failure) ---
     try:
         print("Attempting initial connection to Substance Painter...")
-        remote_check = lib_remote.RemotePainter() # Create an instance
+        remote_check = PAINTER_REMOTE # The shared client
         remote_check.checkConnection()      # Check the connection
         print("Successfully connected to Substance Painter instance.")
     except Exception as e:
         print(f"CRITICAL ERROR: Could not connect to Substance Painter: {e}")
         print("Ensure Painter is running with '--enable-remote-scripting'. Exiting script.")
         exit(1) # Exit if initial connection fails
+    if PAINTER_JOB_MODE == "agent":
+        agent_hello = agent_request({"op": "hello"})
+        if agent_hello is None:
+            print("WARNING: The Painter job agent is not running. Install it with 'python painter_automate.py --install-agent' and enable it in Painter's Python menu.")
+            print("Using job_mode \"fused\" for this run.")
+            PAINTER_JOB_MODE = "fused"
+        elif agent_hello.get("version") != AGENT_VERSION:
+            print(f"WARNING: The Painter job agent is version {agent_hello.get('version')}, this script needs {AGENT_VERSION}. Re-run --install-agent and restart Painter.")
+            print("Using job_mode \"fused\" for this run.")
+            PAINTER_JOB_MODE = "fused"
+        else:
+            print(f"Painter job agent {AGENT_VERSION} is running.")
+    agent_jobs = [] # Job params queued for the agent
+    agent_job_keys = {} # asset -> journal key
+    if PAINTER_JOB_MODE == "steps" and not install_painter_event_tracker():
+        print("WARNING: Painter's bake and export events cannot be observed; those steps end when Painter is no longer busy.")
     print("-" * 60)
 
     # --- Loop Through Each Asset ---
@@ -834,91 +1395,170 @@ if __name__ == "__main__":
         # Derive asset_base_name by removing "_low.obj"
         asset_base_name = asset_filename_low[:-8] if asset_filename_low.endswith("_low.obj") else os.path.splitext(asset_filename_low)[0]
 
-        high_poly_filename = f"{asset_base_name}_high.obj"
-        high_poly_path = os.path.join(PROCESSED_OBJS_FOLDER, high_poly_filename)
+        high_poly_path = find_high_poly_mesh(asset_base_name)
 
         print(f"\n\n{'='*25} Processing Asset: {asset_base_name} {'='*25}")
         print(f"  Low Poly Path: {low_poly_path}")
         print(f"  High Poly Path: {high_poly_path}")
 
         # Check if the corresponding high-poly mesh exists
-        if not os.path.exists(high_poly_path):
-            print(f"  WARNING: Corresponding high-poly mesh '{high_poly_path}' not found.")
+        if high_poly_path is None:
+            print(f"  WARNING: Corresponding high-poly mesh '{asset_base_name}_high.{HIGH_POLY_FORMAT}' not found in '{PROCESSED_OBJS_FOLDER}'.")
             print(f"  Skipping asset: {asset_base_name}")
             assets_skipped_count += 1
             print("-" * 60)
             continue # Move to the next asset in the loop
 
+        # A _low.obj from a Blender run that crashed or failed must not be textured.
+        if journal.has_history(asset_base_name, ["blender"]) and not journal.is_done(asset_base_name, "blender"):
+            print(f"  WARNING: Stage 1 did not finish for '{asset_base_name}' (journal: {journal.get(asset_base_name, 'blender')['status']}). Rerun process_assets.py.")
+            print(f"  Skipping asset: {asset_base_name}")
+            assets_skipped_count += 1
+            print("-" * 60)
+            continue
+
         # Define output paths for this specific asset
         # Textures and .spp project file will go into a subfolder named after the asset_base_name
         asset_specific_output_folder = os.path.join(PAINTER_OUTPUT_BASE_FOLDER, asset_base_name)
         project_spp_full_save_path = os.path.join(asset_specific_output_folder, f"{asset_base_name}.spp")
         # Texture export will also use asset_specific_output_folder
 
-        # --- Step 1: Create the project ---
-        print("\n--- Starting Part 1: Project Creation ---")
-        # Note: run_project_creation_only handles its own Painter connection and error returns
-        run_project_creation_only(low_poly_path)
-        print("Part 1 (Project Creation) command sequence sent.")
-        inter_step_wait_1 = 30 # Seconds
-        print(f"Waiting for {inter_step_wait_1} seconds for Painter to process project creation...")
-        time.sleep(inter_step_wait_1)
-
-        # --- Step 2: Rename the texture set ---
-        print("\n--- Starting Part 2: Texture Set Renaming ---")
+        texture_resolution, resolution_details = texture_resolution_for_mesh(low_poly_path)
+        print(f"  Texture resolution: {texture_resolution}x{texture_resolution} ({resolution_details})")
+
+        # Journal key: the meshes as Stage 1 left them plus the Painter settings. A rebuilt mesh, a
+        # different smart material/baker list or a different texture resolution makes every step run again.
+        painter_key_settings = {"smart_material": [SMART_MATERIAL_NAME, SMART_MATERIAL_LOCATION], "bakers": BAKERS_TO_ENABLE,
+                                "texture_resolution": texture_resolution}
+        painter_key = lib_journal.file_fingerprint([low_poly_path, high_poly_path], painter_key_settings)
+        # Only the saved .spp and the exported textures outlive Painter, so those are the points a run
+        # can resume from; create/rename/smart material/bake are redone together if the save was lost.
+        resume_step = "save" if cli_args.restart else journal.first_incomplete_step(asset_base_name, ["save", "export"], painter_key)
+        if resume_step is None:
+            print(f"  Already baked, saved and exported by an earlier run (journal); skipping '{asset_base_name}'.")
+            assets_already_done_count += 1
+            print("-" * 60)
+            continue
+        if resume_step == "export" and PAINTER_JOB_MODE != "steps" and not os.path.exists(project_spp_full_save_path):
+            print(f"  WARNING: Saved project '{project_spp_full_save_path}' is missing; starting this asset from project creation.")
+            resume_step = "save"
+        elif resume_step == "export" and PAINTER_JOB_MODE == "steps":
+            print(f"\n--- Resuming: project was saved by an earlier run; reopening it for texture export ---")
+            if (os.path.exists(project_spp_full_save_path) and run_open_project(project_spp_full_save_path)
+                    and wait_for_painter("finished loading the saved project", painter_project_ready, STEP_TIMEOUT_SECONDS)[0]):
+                resume_step = "export"
+            else:
+                print(f"  WARNING: Could not reopen '{project_spp_full_save_path}'; starting this asset from project creation.")
+                resume_step = "save"
+
         # Derive texture set name (e.g., M_Hull019)
         intended_texture_set_name = f"M_{asset_base_name}"
-        print(f"Target texture set name: '{intended_texture_set_name}'.")
-        rename_ok = run_rename_texture_set(intended_texture_set_name)
-        if not rename_ok:
-            print(f"  WARNING: Renaming texture set for {asset_base_name} might have failed or was not confirmed.")
-            # Proceeding with intended_texture_set_name for subsequent steps
         current_texture_set_name_for_ops = intended_texture_set_name # Use this for subsequent steps
-        inter_step_wait_2 = 1
-        print(f"Waiting for {inter_step_wait_2} seconds...")
-        time.sleep(inter_step_wait_2)
-
-        # --- Step 3: Apply Smart Material ---
-        print("\n--- Starting Part 3: Apply Smart Material ---")
-        print(f"Applying Smart Material '{SMART_MATERIAL_NAME}' from shelf '{SMART_MATERIAL_LOCATION}'.")
-        apply_sm_ok = run_apply_smart_material(SMART_MATERIAL_NAME, SMART_MATERIAL_LOCATION)
-        if not apply_sm_ok:
-            print(f"  WARNING: Applying Smart Material for {asset_base_name} might have failed or was not confirmed.")
-        inter_step_wait_3 = 5
-        print(f"Waiting for {inter_step_wait_3} seconds...")
-        time.sleep(inter_step_wait_3)
-
-        # --- Step 4: Bake High-Resolution Mesh ---
-        print("\n--- Starting Part 4: Mesh Baking ---")
-        print(f"Baking for texture set '{current_texture_set_name_for_ops}' using high-poly '{high_poly_path}'.")
-        bake_initiated_ok = run_bake_high_res_mesh(current_texture_set_name_for_ops, high_poly_path)
-        if bake_initiated_ok:
-            print("  Bake successfully initiated by Painter. Waiting for baking process to run...")
-            baking_process_wait_time = 1  # Adjust as needed based on mesh complexity and PC speed
-            for i in range(baking_process_wait_time):
-                time.sleep(1)
-                print(f"  Baking observation wait: {i+1}/{baking_process_wait_time}s completed.", end='\r')
-            print(f"\n  Assumed baking observation time of {baking_process_wait_time}s has passed.                            ")
-        else:
-            print(f"  WARNING: Bake initiation failed or was not confirmed for {asset_base_name}.")
-        inter_step_wait_4 = 60
-        print(f"Waiting for {inter_step_wait_4} seconds post-bake-wait...")
-        time.sleep(inter_step_wait_4)
-
-        # --- Step 5: Save the project ---
-        print("\n--- Starting Part 5: Save Project ---")
-        print(f"Saving project to: {project_spp_full_save_path}")
-        save_ok = run_save_project(project_spp_full_save_path)
-        if not save_ok:
-            print(f"  WARNING: Saving project {project_spp_full_save_path} might have failed or was not confirmed.")
-        inter_step_wait_5 = 10
-        print(f"Waiting for {inter_step_wait_5} seconds post-save...")
-        time.sleep(inter_step_wait_5)
+
+        if PAINTER_JOB_MODE in ("fused", "agent"):
+            os.makedirs(asset_specific_output_folder, exist_ok=True)
+            job_params = {
+                "asset": asset_base_name,
+                "low_poly_path": low_poly_path.replace('\\', '/'),
+                "high_poly_path": high_poly_path.replace('\\', '/'),
+                "project_path": project_spp_full_save_path.replace('\\', '/'),
+                "texture_set_name": intended_texture_set_name,
+                "smart_material_name": SMART_MATERIAL_NAME,
+                "smart_material_location": SMART_MATERIAL_LOCATION,
+                "bakers": BAKERS_TO_ENABLE,
+                "project_settings": dict(PROJECT_SETTINGS, default_texture_resolution=texture_resolution),
+                "export_config": gltf_export_config(intended_texture_set_name, asset_specific_output_folder, texture_resolution),
+                "steps": list(lib_journal.PAINTER_STEPS),
+            }
+            if resume_step == "export":
+                print(f"  Resuming: the project was saved by an earlier run; the job reopens it for texture export.")
+                # If the saved project cannot be opened, the job starts over from project creation.
+                job_params.update(steps=["open", "export"], fallback_steps=list(lib_journal.PAINTER_STEPS))
+            if PAINTER_JOB_MODE == "agent":
+                agent_jobs.append(job_params)
+                agent_job_keys[asset_base_name] = painter_key
+                print(f"  Queued for the Painter job agent.")
+                continue
+            job_result = run_fused_painter_job(job_params)
+            export_ok = record_fused_job_steps(journal, asset_base_name, job_params["steps"], job_result, painter_key)
+            if not export_ok:
+                print(f"  WARNING: Texture export for {asset_base_name} did not succeed (Painter job: {job_result['state'] if job_result else 'not started'}).")
+                assets_with_errors_count += 1
+            else:
+                assets_processed_count += 1
+            print(f"\n--- Finished processing asset: {asset_base_name} ---")
+            print("-" * 60)
+            continue
+
+        if resume_step != "export":
+            # --- Step 1: Create the project ---
+            print("\n--- Starting Part 1: Project Creation ---")
+            # Note: run_project_creation_only handles its own Painter connection and error returns
+            create_ok = run_project_creation_only(low_poly_path, texture_resolution)
+            print("Part 1 (Project Creation) command sequence sent.")
+            if create_ok:
+                # Painter keeps loading the mesh after project.create() returns.
+                create_ok = wait_for_painter("finished loading the project", painter_project_ready, STEP_TIMEOUT_SECONDS)[0]
+            record_painter_step(journal, asset_base_name, "create", create_ok, painter_key)
+
+            # --- Step 2: Rename the texture set ---
+            print("\n--- Starting Part 2: Texture Set Renaming ---")
+            print(f"Target texture set name: '{intended_texture_set_name}'.")
+            rename_ok = run_rename_texture_set(intended_texture_set_name)
+            record_painter_step(journal, asset_base_name, "rename", rename_ok, painter_key)
+            if not rename_ok:
+                print(f"  WARNING: Renaming texture set for {asset_base_name} might have failed or was not confirmed.")
+                # Proceeding with intended_texture_set_name for subsequent steps
+            wait_for_painter("idle after renaming", painter_is_idle, STEP_TIMEOUT_SECONDS)
+
+            # --- Step 3: Apply Smart Material ---
+            print("\n--- Starting Part 3: Apply Smart Material ---")
+            print(f"Applying Smart Material '{SMART_MATERIAL_NAME}' from shelf '{SMART_MATERIAL_LOCATION}'.")
+            apply_sm_ok = run_apply_smart_material(SMART_MATERIAL_NAME, SMART_MATERIAL_LOCATION)
+            record_painter_step(journal, asset_base_name, "smart_material", apply_sm_ok, painter_key)
+            if not apply_sm_ok:
+                print(f"  WARNING: Applying Smart Material for {asset_base_name} might have failed or was not confirmed.")
+            wait_for_painter("idle after applying the smart material", painter_is_idle, STEP_TIMEOUT_SECONDS)
+
+            # --- Step 4: Bake High-Resolution Mesh ---
+            print("\n--- Starting Part 4: Mesh Baking ---")
+            print(f"Baking for texture set '{current_texture_set_name_for_ops}' using high-poly '{high_poly_path}'.")
+            bakes_before = read_event_count("baking_ended", "bake")
+            bake_initiated_ok = bakes_before is not None and run_bake_high_res_mesh(current_texture_set_name_for_ops, high_poly_path)
+            if bake_initiated_ok:
+                print("  Bake successfully initiated by Painter. Waiting for the bake to end...")
+                bake_ended, bake_state = wait_for_painter("finished baking", event_seen_since("baking_ended", bakes_before), BAKE_TIMEOUT_SECONDS)
+                bake_status = event_status(bake_state, "baking_ended")
+                if bake_ended and bake_status and "Success" not in bake_status:
+                    print(f"  WARNING: Painter reported the bake ended with {bake_status}.")
+                    bake_ended = False
+                bake_initiated_ok = bake_ended
+            else:
+                print(f"  WARNING: Bake initiation failed or was not confirmed for {asset_base_name}.")
+            record_painter_step(journal, asset_base_name, "bake", bake_initiated_ok, painter_key)
+
+            # --- Step 5: Save the project ---
+            print("\n--- Starting Part 5: Save Project ---")
+            print(f"Saving project to: {project_spp_full_save_path}")
+            save_ok = run_save_project(project_spp_full_save_path)
+            # Only a save that follows a confirmed bake is a checkpoint a later run may resume from.
+            record_painter_step(journal, asset_base_name, "save", save_ok and bake_initiated_ok, painter_key)
+            if not save_ok:
+                print(f"  WARNING: Saving project {project_spp_full_save_path} might have failed or was not confirmed.")
+            wait_for_painter("idle after saving", painter_is_idle, STEP_TIMEOUT_SECONDS)
 
         # --- Step 6: Export Textures ---
         print("\n--- Starting Part 6: Texture Export ---")
         print(f"Exporting textures for '{current_texture_set_name_for_ops}' to directory '{asset_specific_output_folder}'.")
-        export_ok = run_export_textures_gltf_preset(current_texture_set_name_for_ops, asset_specific_output_folder)
+        exports_before = read_event_count("export_ended", "export")
+        export_ok = exports_before is not None and run_export_textures_gltf_preset(current_texture_set_name_for_ops, asset_specific_output_folder, texture_resolution)
+        if export_ok:
+            export_ended, export_state = wait_for_painter("finished exporting", event_seen_since("export_ended", exports_before), STEP_TIMEOUT_SECONDS)
+            export_status = event_status(export_state, "export_ended")
+            if export_ended and export_status and "Success" not in export_status and "Warning" not in export_status:
+                print(f"  WARNING: Painter reported the export ended with {export_status}.")
+                export_ok = False
+        record_painter_step(journal, asset_base_name, "export", export_ok, painter_key)
         if not export_ok:
             print(f"  WARNING: Texture export for {asset_base_name} might have failed or was not confirmed.")
             assets_with_errors_count +=1 # Increment if a crucial step like export fails
@@ -931,12 +1571,23 @@ if __name__ == "__main__":
         # print("Pausing briefly before starting next asset...")
         # time.sleep(10)
 
+    # --- Agent mode: every queued asset runs back to back inside Painter ---
+    for job_params, job_result in run_agent_queue(agent_jobs) if agent_jobs else ():
+        asset_base_name = job_params["asset"]
+        if record_fused_job_steps(journal, asset_base_name, job_params["steps"], job_result, agent_job_keys[asset_base_name]):
+            assets_processed_count += 1
+        else:
+            print(f"  WARNING: Texture export for {asset_base_name} did not succeed (Painter job: {job_result['state'] if job_result else 'no result'}).")
+            assets_with_errors_count += 1
+
     # --- Batch Process Summary ---
     print("\n\n" + "="*70)
     print("Substance Painter Batch Automation Complete.")
     print(f"Total low-poly files found: {len(low_poly_files)}")
     print(f"Successfully processed and exported: {assets_processed_count} assets.")
     print(f"Assets skipped (e.g., missing high-poly): {assets_skipped_count} assets.")
+    if assets_already_done_count > 0:
+        print(f"Assets already finished by an earlier run (journal): {assets_already_done_count} assets.")
     if assets_with_errors_count > 0 : # Only show if there were errors on processed assets
          print(f"Assets processed but with warnings/errors in later stages (e.g. export): {assets_with_errors_count} assets.")
     print("="*70)
\ No newline at end of file
@@ -0,0 +1,118 @@
+import json
+import collections
+
+import substance_painter.project
+import painter_pipeline_job
+
+# Substance Painter plugin for "job_mode": "agent". `python painter_automate.py --install-agent`
+# copies it to Painter's python/plugins folder and painter_pipeline_job.py to python/modules; enable
+# it once from Painter's Python menu. Both stay loaded for the whole Painter session, so the job
+# code is compiled once, and the smart material lookups and baker mapping stay resolved between
+# assets.
+#
+# painter_automate.py talks to it over the normal remote-scripting channel, but each request is
+# only a JSON argument string for handle_request():
+#
+#   {"op": "hello"}                              -> {"ok": true, "version": AGENT_VERSION}
+#   {"op": "submit", "jobs": [params, ...]}      -> queues the assets; they run back to back.
+#                                                   finished_base is where their results start
+#   {"op": "status", "finished_seen": n}         -> results of finished jobs from index n on,
+#                                                   the running job's result and the pending assets
+#   {"op": "cancel", "asset": name, "reason": r} -> cancels the running or a pending job
+#
+# A job's params are the ones the fused mode sends (see painter_pipeline_job.py).
+
+AGENT_VERSION = 1
+RESPONSE_PREFIX = "PIPELINE_AGENT_RESPONSE "
+
+
+class AgentQueue:
+    """Runs submitted jobs one after the other; each starts as soon as the previous one ends."""
+
+    def __init__(self):
+        self.pending = collections.deque() # Job params waiting to run
+        self.active = None # The running PipelineJob
+        self.finished = [] # Results of ended jobs, in the order they ended, for the whole Painter session
+
+    def submit(self, jobs):
+        """Queues jobs. Returns the index in finished at which their results will start to appear.
+
+        finished is never reset: each client reads from its own offset, so a submit cannot drop
+        results another client has not read yet.
+        """
+        finished_base = len(self.finished)
+        self.pending.extend(jobs)
+        if self.active is None:
+            self._start_next()
+        return finished_base
+
+    def _start_next(self):
+        if self.active is not None or not self.pending:
+            return
+        self.active = painter_pipeline_job.PipelineJob(self.pending.popleft(), on_end=self._job_ended)
+        self.active.start()
+
+    def _job_ended(self, job):
+        self.finished.append(job.result())
+        if job is self.active:
+            self.active = None
+        if hasattr(substance_painter.project, "execute_when_not_busy"):
+            substance_painter.project.execute_when_not_busy(self._start_next)
+        else:
+            self._start_next()
+
+    def cancel(self, asset, reason):
+        if self.active is not None and self.active.params["asset"] == asset:
+            self.active.cancel(reason) # Ends through _job_ended, which starts the next job
+            return True
+        for params in list(self.pending):
+            if params["asset"] == asset:
+                self.pending.remove(params)
+                self.finished.append({"asset": asset, "state": "cancelled", "current": None, "total_seconds": 0.0,
+                                      "steps": [{"step": step, "status": "skipped", "seconds": 0.0, "message": reason}
+                                                for step in params["steps"]]})
+                return True
+        return False
+
+    def status(self, finished_seen):
+        return {"ok": True, "finished": self.finished[finished_seen:],
+                "active": self.active.result() if self.active is not None else None,
+                "pending": [params["asset"] for params in self.pending]}
+
+    def cancel_all(self, reason):
+        for params in list(self.pending):
+            self.cancel(params["asset"], reason)
+        if self.active is not None:
+            self.active.cancel(reason)
+
+
+AGENT_QUEUE = AgentQueue()
+
+
+def handle_request(request_json):
+    """Runs one client request. Returns the response line the client looks for."""
+    try:
+        request = json.loads(request_json)
+        op = request.get("op")
+        if op == "hello":
+            response = {"ok": True, "version": AGENT_VERSION}
+        elif op == "submit":
+            finished_base = AGENT_QUEUE.submit(request["jobs"])
+            response = dict(AGENT_QUEUE.status(finished_base), finished_base=finished_base)
+        elif op == "status":
+            response = AGENT_QUEUE.status(request.get("finished_seen", 0))
+        elif op == "cancel":
+            response = {"ok": AGENT_QUEUE.cancel(request["asset"], request.get("reason", "cancelled by the client"))}
+        else:
+            response = {"ok": False, "error": f"unknown op {op!r}"}
+    except Exception as e:
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return RESPONSE_PREFIX + json.dumps(response)
+
+
+def start_plugin():
+    painter_pipeline_job.log(f"Pipeline job agent {AGENT_VERSION} ready.")
+
+
+def close_plugin():
+    AGENT_QUEUE.cancel_all("the job agent was closed")
@@ -0,0 +1,328 @@
+import sys
+import json
+import time
+import base64
+import traceback
+
+import substance_painter.event
+import substance_painter.export
+import substance_painter.baking
+import substance_painter.project
+import substance_painter.resource
+import substance_painter.exception
+import substance_painter.layerstack
+import substance_painter.textureset
+from PySide6 import QtCore
+
+# Runs inside Substance Painter. With "job_mode": "fused" in painter_settings, painter_automate.py
+# sends this file once per asset, followed by a start_job(...) call carrying the asset's parameters
+# (base64-encoded JSON). With "job_mode": "agent" it is installed in Painter's python/modules folder
+# and imported once by the painter_job_agent.py plugin, which keeps it loaded. Either way the job
+# runs the whole sequence inside Painter:
+#
+#   create -> rename -> smart_material -> bake -> save -> export      (a new project)
+#   open -> export                                                    (resuming from a saved .spp)
+#
+# A resumed job may carry fallback_steps, which replace the remaining steps if the open fails.
+#
+# Steps that finish synchronously are chained directly; loading a project and baking are
+# asynchronous, so the job waits for ProjectEditionEntered and BakingProcessEnded before moving on.
+# Work is only started when Painter is not busy. The client polls job_result(), which returns one
+# JSON object with the job's state and every step's status, timing and message. A failed create
+# or open ends the job; later steps run after a failed rename, smart material or bake, as in the
+# step-by-step mode.
+
+JOB_MODULE_NAME = "pipeline_painter_job" # Where the running job is kept between remote calls
+RESULT_PREFIX = "PIPELINE_JOB_RESULT "
+
+MESH_MAP_USAGES = {
+    "Normal": substance_painter.baking.MeshMapUsage.Normal,
+    "WorldSpaceNormal": substance_painter.baking.MeshMapUsage.WorldSpaceNormal,
+    "ID": substance_painter.baking.MeshMapUsage.ID,
+    "AO": substance_painter.baking.MeshMapUsage.AO,
+    "Curvature": substance_painter.baking.MeshMapUsage.Curvature,
+    "Position": substance_painter.baking.MeshMapUsage.Position,
+    "Thickness": substance_painter.baking.MeshMapUsage.Thickness,
+}
+
+
+# Smart material resources by (shelf, name). Resolved once per Painter session when this module
+# stays loaded (agent mode); a resource that fails to insert is looked up again next time.
+SMART_MATERIAL_CACHE = {}
+
+
+def log(message):
+    print(f"[PAINTER LOG] [job] {message}")
+
+
+def find_smart_material(shelf, name):
+    """The smart material resource in the shelf (exact name first, then a wildcard match), or None."""
+    cached_resource = SMART_MATERIAL_CACHE.get((shelf, name))
+    if cached_resource is not None:
+        return cached_resource
+    found_resources = (substance_painter.resource.search(f"s:{shelf} u:smartmaterial n:{name}")
+                       or substance_painter.resource.search(f"s:{shelf} u:smartmaterial n:*{name}*"))
+    if not found_resources:
+        return None
+    SMART_MATERIAL_CACHE[(shelf, name)] = found_resources[0]
+    return found_resources[0]
+
+
+class StepFailed(Exception):
+    pass
+
+
+class PipelineJob:
+    """One asset's Painter steps, advanced by Painter events until every step has a result."""
+
+    def __init__(self, params, on_end=None):
+        self.params = params
+        self.on_end = on_end # Called with the job once it is done, failed or cancelled
+        self.steps = list(params["steps"])
+        self.results = [] # {"step", "status", "seconds", "message"} per finished step
+        self.state = "running" # running -> done | failed | cancelled
+        self.current_step = None
+        self.step_serial = 0 # Increases with every step started, to tell whether an event already finished the step
+        self.step_started_at = None
+        self.job_started_at = time.monotonic()
+        self.waiting_for = None # Event class the current step is waiting for
+        self.bake_stop_source = None
+        self.bake_failed = False
+        self._handlers = []
+
+    # --- Running the sequence ---
+
+    def start(self):
+        self._connect(substance_painter.event.ProjectEditionEntered, self._on_project_edition_entered)
+        self._connect(substance_painter.event.BakingProcessEnded, self._on_baking_ended)
+        self._run_when_not_busy(self._next_step)
+
+    def _connect(self, event_type, handler):
+        substance_painter.event.DISPATCHER.connect(event_type, handler)
+        self._handlers.append((event_type, handler))
+
+    def _disconnect_all(self):
+        for event_type, handler in self._handlers:
+            try:
+                substance_painter.event.DISPATCHER.disconnect(event_type, handler)
+            except Exception:
+                pass
+        self._handlers = []
+
+    def _run_when_not_busy(self, callback):
+        if hasattr(substance_painter.project, "execute_when_not_busy"):
+            substance_painter.project.execute_when_not_busy(callback)
+        else:
+            callback()
+
+    def _next_step(self):
+        if self.state != "running":
+            return
+        if not self.steps:
+            # An open that was replaced by fallback_steps does not fail the job.
+            failed = any(r["status"] == "failed" and not (r["step"] == "open" and self.params.get("fallback_steps"))
+                         for r in self.results)
+            self._end("failed" if failed else "done")
+            return
+        self.current_step = self.steps.pop(0)
+        self.step_serial += 1
+        serial = self.step_serial
+        self.step_started_at = time.monotonic()
+        log(f"{self.params['asset']}: {self.current_step}")
+        try:
+            waits = getattr(self, f"_step_{self.current_step}")()
+        except Exception as e:
+            log(traceback.format_exc())
+            waits, failure = False, f"{type(e).__name__}: {e}"
+        else:
+            failure = None
+        # The event a step waits for can arrive while the step is still running; it then finished the step already.
+        if not waits and self.step_serial == serial and self.current_step is not None:
+            self._finish_step(failure is None, failure)
+
+    def _finish_step(self, succeeded, message=None):
+        step = self.current_step
+        self.results.append({"step": step, "status": "done" if succeeded else "failed",
+                             "seconds": round(time.monotonic() - self.step_started_at, 3), "message": message})
+        self.current_step = None
+        self.waiting_for = None
+        if not succeeded and step == "open" and self.params.get("fallback_steps"):
+            log(f"{self.params['asset']}: could not reopen the saved project; running {', '.join(self.params['fallback_steps'])} instead")
+            self.steps = list(self.params["fallback_steps"])
+        elif not succeeded and step in ("create", "open"):
+            for skipped_step in self.steps:
+                self.results.append({"step": skipped_step, "status": "skipped", "seconds": 0.0, "message": f"{step} failed"})
+            self.steps = []
+        self._run_when_not_busy(self._next_step)
+
+    def _end(self, state):
+        self.state = state
+        self._disconnect_all()
+        log(f"{self.params['asset']}: job {state} after {time.monotonic() - self.job_started_at:.1f}s")
+        if self.on_end is not None:
+            self.on_end(self)
+
+    def cancel(self, reason):
+        """Stops the job (used by the client when a step runs past its timeout)."""
+        if self.state != "running":
+            return
+        if self.current_step is not None:
+            if self.current_step == "bake" and self.bake_stop_source is not None:
+                for method_name in ("request_stop", "cancel"):
+                    if hasattr(self.bake_stop_source, method_name):
+                        getattr(self.bake_stop_source, method_name)()
+                        break
+            self.results.append({"step": self.current_step, "status": "failed",
+                                 "seconds": round(time.monotonic() - self.step_started_at, 3), "message": reason})
+            self.current_step = None
+        for skipped_step in self.steps:
+            self.results.append({"step": skipped_step, "status": "skipped", "seconds": 0.0, "message": reason})
+        self.steps = []
+        self._end("cancelled")
+
+    # --- Events ---
+
+    def _on_project_edition_entered(self, event):
+        if self.waiting_for is substance_painter.event.ProjectEditionEntered:
+            self._finish_step(True)
+
+    def _on_baking_ended(self, event):
+        if self.waiting_for is not substance_painter.event.BakingProcessEnded:
+            return
+        status = str(getattr(event, "status", ""))
+        succeeded = "Success" in status
+        self.bake_failed = not succeeded
+        self._finish_step(succeeded, None if succeeded else f"bake ended with {status}")
+
+    # --- Steps. Each returns True if it finishes later, from an event handler. ---
+
+    def _step_create(self):
+        settings = substance_painter.project.Settings()
+        project_settings = self.params["project_settings"]
+        settings.default_texture_resolution = project_settings["default_texture_resolution"]
+        settings.normal_map_format = getattr(substance_painter.project.NormalMapFormat, project_settings["normal_map_format"])
+        settings.tangent_space_mode = (substance_painter.project.TangentSpace.PerFragment if project_settings["compute_tangent_space_per_fragment"]
+                                       else substance_painter.project.TangentSpace.PerVertex)
+        settings.project_workflow = (substance_painter.project.ProjectWorkflow.UVTile if project_settings["use_uv_tile_workflow"]
+                                     else substance_painter.project.ProjectWorkflow.Default)
+        settings.import_cameras = project_settings["import_cameras"]
+        if substance_painter.project.is_open():
+            substance_painter.project.close()
+        self.waiting_for = substance_painter.event.ProjectEditionEntered
+        substance_painter.project.create(mesh_file_path=self.params["low_poly_path"], settings=settings)
+        if not substance_painter.project.is_open():
+            raise StepFailed("project.create() returned without an open project")
+        return not substance_painter.project.is_in_edition_state()
+
+    def _step_open(self):
+        if substance_painter.project.is_open():
+            substance_painter.project.close()
+        self.waiting_for = substance_painter.event.ProjectEditionEntered
+        substance_painter.project.open(self.params["project_path"])
+        if not substance_painter.project.is_open():
+            raise StepFailed("project.open() returned without an open project")
+        return not substance_painter.project.is_in_edition_state()
+
+    def _texture_set(self):
+        texture_sets = substance_painter.textureset.all_texture_sets()
+        if not texture_sets:
+            raise StepFailed("the project has no texture sets")
+        for texture_set in texture_sets:
+            if texture_set.name == self.params["texture_set_name"]:
+                return texture_set
+        return texture_sets[0]
+
+    def _step_rename(self):
+        texture_set = self._texture_set()
+        texture_set.name = self.params["texture_set_name"]
+        if texture_set.name != self.params["texture_set_name"]:
+            raise StepFailed(f"texture set is still named '{texture_set.name}'")
+        return False
+
+    def _step_smart_material(self):
+        shelf, name = self.params["smart_material_location"], self.params["smart_material_name"]
+        smart_material = find_smart_material(shelf, name)
+        if smart_material is None:
+            raise StepFailed(f"smart material '{name}' not found in shelf '{shelf}'")
+        stack = self._texture_set().get_stack()
+        insert_position = substance_painter.layerstack.InsertPosition.from_textureset_stack(stack)
+        try:
+            inserted = substance_painter.layerstack.insert_smart_material(insert_position, smart_material.identifier())
+        except Exception:
+            SMART_MATERIAL_CACHE.pop((shelf, name), None)
+            raise
+        if not inserted:
+            SMART_MATERIAL_CACHE.pop((shelf, name), None)
+            raise StepFailed("insert_smart_material() did not return a layer")
+        return False
+
+    def _step_bake(self):
+        texture_set = self._texture_set()
+        baking_parameters = substance_painter.baking.BakingParameters.from_texture_set(texture_set)
+        common_parameters = baking_parameters.common()
+        high_poly_url = QtCore.QUrl.fromLocalFile(self.params["high_poly_path"]).toString()
+        substance_painter.baking.BakingParameters.set({common_parameters['HipolyMesh']: high_poly_url})
+        bakers = [MESH_MAP_USAGES[name] for name in self.params["bakers"] if name in MESH_MAP_USAGES]
+        if bakers:
+            baking_parameters.set_enabled_bakers(bakers)
+        self.waiting_for = substance_painter.event.BakingProcessEnded
+        self.bake_stop_source = substance_painter.baking.bake_async(texture_set)
+        if not self.bake_stop_source:
+            raise StepFailed("bake_async() did not start a bake")
+        return True
+
+    def _step_save(self):
+        if self.bake_failed:
+            log("Saving after a failed bake; the project is not a resume checkpoint.")
+        substance_painter.project.save_as(self.params["project_path"], mode=substance_painter.project.ProjectSaveMode.Full)
+        return False
+
+    def _step_export(self):
+        export_result = substance_painter.export.export_project_textures(self.params["export_config"])
+        status = str(export_result.status)
+        if "Success" not in status and "Warning" not in status:
+            raise StepFailed(f"export ended with {status}: {export_result.message}")
+        return False
+
+    # --- Result ---
+
+    def result(self):
+        current = None
+        if self.current_step is not None:
+            current = {"step": self.current_step, "seconds": round(time.monotonic() - self.step_started_at, 3)}
+        return {"asset": self.params["asset"], "state": self.state, "steps": self.results, "current": current,
+                "total_seconds": round(time.monotonic() - self.job_started_at, 3)}
+
+
+def job_module():
+    module = sys.modules.get(JOB_MODULE_NAME)
+    if module is None:
+        import types
+        module = sys.modules[JOB_MODULE_NAME] = types.ModuleType(JOB_MODULE_NAME)
+        module.job = None
+    return module
+
+
+def start_job(encoded_params):
+    """Starts a job for one asset, cancelling one that is still running. Prints the initial result."""
+    module = job_module()
+    # Later remote calls only run a few lines; they reach the job through the module.
+    module.print_result = job_result
+    module.cancel_job = cancel_job
+    if module.job is not None and module.job.state == "running":
+        module.job.cancel("replaced by a new job")
+    module.job = PipelineJob(json.loads(base64.b64decode(encoded_params).decode('utf-8')))
+    module.job.start()
+    print(RESULT_PREFIX + json.dumps(module.job.result()))
+
+
+def job_result():
+    module = job_module()
+    print(RESULT_PREFIX + json.dumps(module.job.result() if module.job is not None else None))
+
+
+def cancel_job(reason):
+    module = job_module()
+    if module.job is not None:
+        module.job.cancel(reason)
+    job_result()
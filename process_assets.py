@@ -3,9 +3,31 @@ import shutil
 import subprocess
 import platform
 import json # For loading config
+import time # For per-asset timing
+import concurrent.futures # For running several Blender processes at once
+import queue # For handing idle Blender workers between threads
+import math # For sizing manifest batches
+import argparse # For command-line options
+import errno # For recognising "not supported" errors from link/reflink attempts
+import threading # For the timeout watchdog and console lock
+import collections # For bounded log tails
+import socket # For naming queue workers
+import re # For file-name-safe part labels
+import glob # For finding the outputs of an earlier split
+import lib_build_cache
+import lib_mesh_index
+import lib_job_queue
+import lib_journal
+import lib_memory
+
+try:
+    import lib_obj
+except ImportError: # NumPy is not installed: Blender exports _high.obj itself.
+    lib_obj = None
 
 # --- CONFIG FILE LOADING ---
-CONFIG_FILE_PATH = os.path.join(os.path.dirname(__file__), "config.json")
+# PIPELINE_CONFIG can point at a different config file (used by bench_stage1.py).
+CONFIG_FILE_PATH = os.environ.get("PIPELINE_CONFIG") or os.path.join(os.path.dirname(__file__), "config.json")
 
 def load_app_config():
     """Loads the main application configuration from config.json"""
@@ -39,9 +61,56 @@ try:
     else: # Linux
         BLENDER_EXECUTABLE = blender_settings["executable_path_linux"]
 
+    # Number of Blender processes to run at the same time. 0 or missing means one per CPU core.
+    MAX_WORKERS = blender_settings.get("max_workers", 0) or os.cpu_count() or 1
+    # "per_asset": launch Blender once per asset. "worker": keep MAX_WORKERS Blender processes
+    # running in --worker mode and feed them jobs, so startup is only paid once per worker.
+    # "manifest": launch one Blender per batch of assets, listed in a JSON manifest.
+    EXECUTION_MODE = blender_settings.get("execution_mode", "per_asset")
+    # Upper bound on assets per manifest in "manifest" mode. Smaller batches spread better over the workers.
+    MANIFEST_MAX_ASSETS = blender_settings.get("manifest_max_assets", 8)
+    # Skip assets whose input OBJ, script_params and Blender script are unchanged since their last build.
+    # When disabled, existing outputs trigger the interactive overwrite/skip prompt instead.
+    USE_BUILD_CACHE = blender_settings.get("use_build_cache", True)
+    # How Blender gets the input OBJ. "auto": hardlink, then reflink, then let Blender read the
+    # original file in place, and only copy as a last resort. "copy": always copy (old behaviour).
+    INPUT_HANDOFF = blender_settings.get("input_handoff", "auto")
+    # Kill a Blender process that spends longer than this on one asset. 0 disables the timeout.
+    BLENDER_TIMEOUT_SECONDS = blender_settings.get("blender_timeout_seconds", 0)
+    # Start the assets predicted to take longest first (from the mesh index), so a big asset
+    # does not start last and hold up the end of a parallel run.
+    SCHEDULE_LARGEST_FIRST = blender_settings.get("schedule_largest_first", True)
+    # Who writes _high.obj. "external": process_assets.py streams the source OBJ through lib_obj,
+    # scaling the vertices, while Blender decimates. "blender": Blender re-exports the imported mesh.
+    # "auto": external when NumPy is installed.
+    HIGH_POLY_WRITER = blender_settings.get("high_poly_writer", "auto")
+    # File format of the high-poly mesh Painter bakes from. "obj" (ASCII), "fbx" (binary) or "glb"
+    # (binary glTF). The binary formats are smaller and load faster in Painter on dense meshes;
+    # they are always written by Blender, since the external writer only produces OBJ.
+    HIGH_POLY_FORMAT = blender_settings.get("high_poly_format", "obj")
+    # Shared job queue for --coordinator / --queue-worker runs across several machines. Every
+    # machine must see the queue, input and output folders under the same paths.
+    # Empty means "_pipeline/queue" in processed_objs_folder.
+    QUEUE_FOLDER_SETTING = blender_settings.get("queue_folder", "")
+    # A claimed job whose worker has not renewed its lease for this long is given to another worker.
+    QUEUE_LEASE_SECONDS = blender_settings.get("queue_lease_seconds", 60)
+    # Memory the concurrent Blender jobs may use together, in GB. A job only starts while the
+    # predicted peak memory of the running jobs plus its own fits; a job predicted above the
+    # budget runs alone. 0 means 80% of this machine's RAM, a negative value disables the check.
+    MEMORY_BUDGET_GB = blender_settings.get("memory_budget_gb", 0)
+
     # Blender script parameters from config to be passed to blender_decimate_unwrap.py
     blender_script_params = blender_settings["script_params"]
     DECIMATE_RATIO = blender_script_params["decimate_ratio"]
+    # How each asset's Decimate ratio is chosen. "ratio": decimate_ratio for every asset.
+    # "triangles": aim at target_triangles. "density": aim at triangles_per_area triangles per
+    # square unit of the scaled mesh's surface. The budget modes clamp the ratio to
+    # [min_decimate_ratio, max_decimate_ratio], so tiny parts are not collapsed to nothing.
+    DECIMATE_MODE = blender_script_params.get("decimate_mode", "ratio")
+    TARGET_TRIANGLES = blender_script_params.get("target_triangles", 0)
+    TRIANGLES_PER_AREA = blender_script_params.get("triangles_per_area", 0)
+    MIN_DECIMATE_RATIO = blender_script_params.get("min_decimate_ratio", 0.0)
+    MAX_DECIMATE_RATIO = blender_script_params.get("max_decimate_ratio", 1.0)
     SCALE_FACTOR = blender_script_params["scale_factor"] # Changed from UPSCALE_FACTOR
     SP_UV_ANGLE_DEGREES = blender_script_params["sp_angle_degrees"]
     SP_ISLAND_MARGIN = blender_script_params["sp_island_margin"]
@@ -52,6 +121,19 @@ try:
     SP_ROTATE_METHOD = blender_script_params["sp_rotate_method"]
     UV_FILL_HOLES_BEFORE_UNWRAP = blender_script_params["uv_fill_holes"]
     APPLY_SCALE_BEFORE_UNWRAP = blender_script_params["apply_scale"] # For original scale
+    # Extra LODs after _low.obj (LOD 0), written as _lod1.obj, _lod2.obj, ... in the same Blender
+    # session. Each value is a ratio of the original face count (<= 1) or a face count (> 1).
+    LOD_TARGETS = blender_script_params.get("lod_targets", [])
+    # "reuse": the LODs keep _low.obj's UVs (one texture set for every level). "unwrap": each LOD is unwrapped again.
+    LOD_UV_MODE = blender_script_params.get("lod_uv_mode", "reuse")
+    # Split an input OBJ with several objects ('o'/'g' lines) into one Blender job per part, run in
+    # parallel. "join": the parts' _low.obj and LODs are reassembled into the asset's, each part's
+    # UVs moved into its own tile of one texture set. "separate": every part becomes an asset of its
+    # own (<asset>__<part>_low.obj, _high, .blend) with its own texture set in Painter. "off": one
+    # Blender job per asset, which joins all the imported objects into one mesh.
+    SPLIT_OBJECTS = blender_script_params.get("split_objects", "off")
+    # Neighbouring parts with fewer faces than this share a job, so dozens of greebles do not each pay for a Blender run.
+    SPLIT_MIN_FACES = blender_script_params.get("split_min_faces", 5000)
 
 except KeyError as e:
     print(f"ERROR: Missing a required key in config.json: {e}")
@@ -61,64 +143,164 @@ except KeyError as e:
 # Assuming blender_decimate_unwrap.py is in the same directory as this script
 BLENDER_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "blender_decimate_unwrap.py")
 
-# --- Main Logic ---
-if not os.path.exists(OUTPUT_PROCESSED_OBJS_FOLDER):
-    os.makedirs(OUTPUT_PROCESSED_OBJS_FOLDER)
-    print(f"Created output directory: {OUTPUT_PROCESSED_OBJS_FOLDER}")
+EXECUTION_MODES = ("per_asset", "worker", "manifest")
+INPUT_HANDOFF_MODES = ("auto", "copy")
+HIGH_POLY_WRITERS = ("auto", "external", "blender")
+HIGH_POLY_FORMATS = ("obj", "fbx", "glb")
+LOD_UV_MODES = ("reuse", "unwrap")
+DECIMATE_MODES = ("ratio", "triangles", "density")
+SPLIT_MODES = ("off", "join", "separate")
+# Share of a part's tile left empty on every edge of the joined UV layout, so bakes do not bleed between parts.
+SPLIT_TILE_PADDING = 0.01
+# The run report lists budget-mode assets whose achieved triangle count is further than this from the target.
+TRIANGLE_BUDGET_TOLERANCE = 0.1
 
-print(" STAGE 1: RUNNING BLENDER PROCESSING (process_assets.py)")
-print("=" * 60 + "\n")
+# Blender's OBJ import/export round trip leaves positions unchanged apart from scale_factor
+# (apply_scale is a no-op for an imported OBJ, whose object scale is always 1), so the
+# external writer only needs to scale the 'v' lines. A negative factor would also flip
+# normals and winding, which is left to Blender.
+USE_EXTERNAL_HIGH_POLY_WRITER = HIGH_POLY_FORMAT == "obj" and (
+    HIGH_POLY_WRITER == "external" or (HIGH_POLY_WRITER == "auto" and lib_obj is not None and SCALE_FACTOR > 0))
 
-print(f"Starting asset processing for Blender...")
-print(f"Input base: {INPUT_BASE_FOLDER}")
-print(f"Outputting .blend, _high.obj & _low.obj OBJs to: {OUTPUT_PROCESSED_OBJS_FOLDER}")
-print(f"Using Blender: {BLENDER_EXECUTABLE}")
-print(f"Using Blender script: {BLENDER_SCRIPT_PATH}")
+# Bookkeeping written by the pipeline itself (result files, manifests) lives next to the processed meshes.
+PIPELINE_STATE_FOLDER = os.path.join(OUTPUT_PROCESSED_OBJS_FOLDER, "_pipeline")
+RESULTS_FOLDER = os.path.join(PIPELINE_STATE_FOLDER, "results")
+MANIFESTS_FOLDER = os.path.join(PIPELINE_STATE_FOLDER, "manifests")
+BUILD_CACHE_PATH = os.path.join(PIPELINE_STATE_FOLDER, "build_cache.json")
+STATS_FOLDER = os.path.join(PIPELINE_STATE_FOLDER, "stats")
+LOGS_FOLDER = os.path.join(PIPELINE_STATE_FOLDER, "logs")
+REPORTS_FOLDER = os.path.join(PIPELINE_STATE_FOLDER, "reports")
+MESH_INDEX_PATH = os.path.join(PIPELINE_STATE_FOLDER, "mesh_index.sqlite")
+# Step journal shared with painter_automate.py (see lib_journal.py).
+JOURNAL_PATH = os.path.join(PIPELINE_STATE_FOLDER, "journal.jsonl")
+QUEUE_FOLDER = QUEUE_FOLDER_SETTING or os.path.join(PIPELINE_STATE_FOLDER, "queue")
+# Split multi-object OBJs: parts/<asset>/ holds each part's OBJ and, in "join" mode, its Blender outputs.
+PARTS_FOLDER = os.path.join(PIPELINE_STATE_FOLDER, "parts")
+# How often the queue coordinator and idle queue workers look at the queue folder.
+QUEUE_POLL_SECONDS = 1.0
 
+# Share of physical memory used as the budget when memory_budget_gb is 0.
+AUTO_MEMORY_BUDGET_FRACTION = 0.8
+PHYSICAL_MEMORY_BYTES = lib_memory.physical_memory_bytes()
+if MEMORY_BUDGET_GB > 0:
+    MEMORY_BUDGET_BYTES = int(MEMORY_BUDGET_GB * 1024 ** 3)
+elif MEMORY_BUDGET_GB == 0 and PHYSICAL_MEMORY_BYTES:
+    MEMORY_BUDGET_BYTES = int(PHYSICAL_MEMORY_BYTES * AUTO_MEMORY_BUDGET_FRACTION)
+else:
+    MEMORY_BUDGET_BYTES = None # No admission control
+# Shared by all job threads: admits Blender jobs while their projected memory fits MEMORY_BUDGET_BYTES.
+MEMORY_GATE = lib_memory.MemoryGate(MEMORY_BUDGET_BYTES)
 
-processed_count = 0
-skipped_count = 0
-overwrite_all_decision = None
+# How many entries the run report lists in its "slowest" rankings.
+REPORT_TOP_N = 10
 
-if not os.path.isdir(INPUT_BASE_FOLDER):
-    print(f"ERROR: Input base folder '{INPUT_BASE_FOLDER}' does not exist or is not a directory. Please check config.json.")
-    exit(1)
-if not os.path.exists(BLENDER_SCRIPT_PATH):
-    print(f"ERROR: Blender script '{BLENDER_SCRIPT_PATH}' not found. Ensure it's in the same directory as process_assets.py.")
-    exit(1)
+# Prefix of the line a --worker Blender process prints after each job. Must match blender_decimate_unwrap.py.
+WORKER_RESULT_PREFIX = "@@PIPELINE_WORKER_RESULT@@ "
+# Prefix of the line a --manifest Blender process prints before each job. Must match blender_decimate_unwrap.py.
+JOB_START_PREFIX = "@@PIPELINE_JOB_START@@ "
+# Blender output lines containing this are echoed to the console as live progress (printed by StageRecorder).
+PROGRESS_LINE_MARKER = "[stage]"
+# How many of the last Blender output lines are kept in memory per asset, for error reports.
+LOG_TAIL_LINES = 40
 
+# Serialises console output from the job threads.
+CONSOLE_LOCK = threading.Lock()
 
-for folder_name in os.listdir(INPUT_BASE_FOLDER):
-    current_asset_folder_path = os.path.join(INPUT_BASE_FOLDER, folder_name)
 
-    if os.path.isdir(current_asset_folder_path):
-        print(f"\nProcessing asset folder: {folder_name}")
-        original_obj_from_input_folder_path = None
-        for item_in_folder in os.listdir(current_asset_folder_path):
-            if item_in_folder.lower().endswith(".obj"):
-                original_obj_from_input_folder_path = os.path.join(current_asset_folder_path, item_in_folder)
-                break
+def find_source_obj(asset_folder_path):
+    """Returns the path of the first .obj file in an asset folder, or None."""
+    for item_in_folder in os.listdir(asset_folder_path):
+        if item_in_folder.lower().endswith(".obj"):
+            return os.path.join(asset_folder_path, item_in_folder)
+    return None
+
+
+def find_input_assets(only_asset_names=None):
+    """Scans INPUT_BASE_FOLDER (or only the given asset folders). Returns ([(asset_name, source_obj_path)], skipped_count)."""
+    assets = []
+    skipped_count = 0
+    for folder_name in os.listdir(INPUT_BASE_FOLDER):
+        if only_asset_names is not None and folder_name not in only_asset_names:
+            continue
+        current_asset_folder_path = os.path.join(INPUT_BASE_FOLDER, folder_name)
+        if not os.path.isdir(current_asset_folder_path):
+            continue
 
+        original_obj_from_input_folder_path = find_source_obj(current_asset_folder_path)
         if not original_obj_from_input_folder_path:
+            print(f"\nProcessing asset folder: {folder_name}")
             print(f"  WARNING: No .obj file found in folder '{folder_name}'. Skipping.")
             skipped_count += 1
             continue
+        assets.append((folder_name, original_obj_from_input_folder_path))
+    return assets, skipped_count
+
 
+def make_asset_job(folder_name, original_obj_from_input_folder_path, output_folder=OUTPUT_PROCESSED_OBJS_FOLDER):
+    """Returns the job dict describing one asset's Blender run and its output paths."""
+    return {
+        "asset_name": folder_name,
+        "source_obj": original_obj_from_input_folder_path,
         # Path for the copied original OBJ in the 'Meshes' folder (e.g., Meshes/AssetName.obj)
         # This will be the input to the Blender script.
-        intermediate_obj_for_blender_path = os.path.join(OUTPUT_PROCESSED_OBJS_FOLDER, f"{folder_name}.obj")
-        
-        # Paths for files Blender script will create (used for checking existence)
-        blend_output_path = os.path.join(OUTPUT_PROCESSED_OBJS_FOLDER, f"{folder_name}.blend")
-        high_poly_output_path = os.path.join(OUTPUT_PROCESSED_OBJS_FOLDER, f"{folder_name}_high.obj")
-        low_poly_output_path = os.path.join(OUTPUT_PROCESSED_OBJS_FOLDER, f"{folder_name}_low.obj")
+        "intermediate_obj": os.path.join(output_folder, f"{folder_name}.obj"),
+        # Paths for files Blender script will create
+        "blend_output": os.path.join(output_folder, f"{folder_name}.blend"),
+        "high_output": os.path.join(output_folder, f"{folder_name}_high.{HIGH_POLY_FORMAT}"),
+        "low_output": os.path.join(output_folder, f"{folder_name}_low.obj"),
+        "lod_outputs": [os.path.join(output_folder, f"{folder_name}_lod{lod_level}.obj") for lod_level in range(1, len(LOD_TARGETS) + 1)],
+        "result_file": os.path.join(RESULTS_FOLDER, f"{folder_name}.result.json"),
+        "stats_file": stats_file_path(folder_name),
+        "log_file": os.path.join(LOGS_FOLDER, f"{folder_name}.log"),
+    }
+
+
+def stats_file_path(asset_name):
+    """Where Blender writes the per-stage timing sidecar for an asset."""
+    return os.path.join(STATS_FOLDER, f"{asset_name}.stats.json")
+
+
+def job_output_paths(job):
+    """Files a successful build leaves behind (what the build cache checks for)."""
+    if "output_paths" in job: # An asset built from split parts (see split_multi_object_jobs)
+        return job["output_paths"]
+    high_outputs = [] if job.get("skip_high_export") else [job["high_output"]]
+    return [job["blend_output"]] + high_outputs + [job["low_output"]] + job["lod_outputs"]
+
+
+def collect_asset_jobs(build_cache=None, force_rebuild=False, journal=None, only_asset_names=None, overwrite_existing=False):
+    """Scans INPUT_BASE_FOLDER and returns (jobs, skipped_count, up_to_date_count).
 
+    With a build cache, unchanged assets are skipped and everything else is
+    rebuilt without asking. Without one, assets the journal records as built
+    from the same input and settings are skipped, and other existing outputs
+    trigger the interactive overwrite/skip prompt (unless overwrite_existing),
+    which is why this runs before any Blender process is started.
+    """
+    assets, skipped_count = find_input_assets(only_asset_names)
+    if build_cache is not None:
+        jobs, up_to_date_count = select_jobs_with_build_cache(assets, build_cache, force_rebuild)
+        return jobs, skipped_count, up_to_date_count
+
+    jobs = []
+    overwrite_all_decision = True if overwrite_existing else None
+    up_to_date_count = 0
+
+    for folder_name, original_obj_from_input_folder_path in assets:
+        print(f"\nProcessing asset folder: {folder_name}")
+        job = make_asset_job(folder_name, original_obj_from_input_folder_path)
+
+        if (journal is not None and not force_rebuild and journal.is_done(folder_name, "blender", journal_key(job))
+                and all(os.path.exists(path) for path in journal.get(folder_name, "blender").get("outputs") or job_output_paths(job))):
+            print(f"  Already built from this input and settings (journal); skipping '{folder_name}'.")
+            up_to_date_count += 1
+            continue
 
         # Check existence of files that will be created or overwritten
-        intermediate_exists = os.path.exists(intermediate_obj_for_blender_path)
-        blend_exists = os.path.exists(blend_output_path)
-        high_exists = os.path.exists(high_poly_output_path)
-        low_exists = os.path.exists(low_poly_output_path)
+        intermediate_exists = os.path.exists(job["intermediate_obj"])
+        blend_exists = os.path.exists(job["blend_output"])
+        high_exists = os.path.exists(job["high_output"])
+        low_exists = os.path.exists(job["low_output"])
 
         if intermediate_exists or blend_exists or high_exists or low_exists:
             if overwrite_all_decision is None:
@@ -126,7 +308,7 @@ for folder_name in os.listdir(INPUT_BASE_FOLDER):
                     existing_files_msg_parts = []
                     if intermediate_exists: existing_files_msg_parts.append(f"'{folder_name}.obj' (intermediate)")
                     if blend_exists: existing_files_msg_parts.append(f"'{folder_name}.blend'")
-                    if high_exists: existing_files_msg_parts.append(f"'{folder_name}_high.obj'")
+                    if high_exists: existing_files_msg_parts.append(f"'{os.path.basename(job['high_output'])}'")
                     if low_exists: existing_files_msg_parts.append(f"'{folder_name}_low.obj'")
                     existing_files_display = ', '.join(existing_files_msg_parts)
 
@@ -142,7 +324,7 @@ for folder_name in os.listdir(INPUT_BASE_FOLDER):
                         break
                     else:
                         print("  Invalid choice. Please enter O or S.")
-            
+
             if not overwrite_all_decision:
                 print(f"  Skipping asset '{folder_name}' as output files exist and user chose to skip all.")
                 skipped_count += 1
@@ -150,58 +332,1498 @@ for folder_name in os.listdir(INPUT_BASE_FOLDER):
             else:
                 print(f"  Output files for '{folder_name}' exist and will be overwritten based on user choice.")
 
+        jobs.append(job)
+
+    return jobs, skipped_count, up_to_date_count
+
+
+def current_build_key_params():
+    """Settings that change Blender's outputs: script_params plus the high-poly writer and format."""
+    return dict(blender_script_params, high_poly_writer="external" if USE_EXTERNAL_HIGH_POLY_WRITER else "blender",
+                high_poly_format=HIGH_POLY_FORMAT)
+
+
+def journal_key(job):
+    """The journal key of an asset's Stage 1 steps: its source OBJ (size and mtime) and the build settings."""
+    return lib_journal.file_fingerprint([job["source_obj"]], current_build_key_params())
+
+
+def select_jobs_with_build_cache(assets, build_cache, force_rebuild):
+    """Returns (jobs, up_to_date_count): a job for every asset whose build key changed (or all, if forced)."""
+    print(f"\nChecking build cache ({len(assets)} asset(s), hashing changed inputs on {MAX_WORKERS} thread(s))...")
+    script_source_digest = lib_build_cache.sha256_of_file(BLENDER_SCRIPT_PATH)
+    input_digests = build_cache.input_digests(assets, MAX_WORKERS)
+    # The high-poly writer and format change the outputs, so they are part of the key too.
+    build_key_params = current_build_key_params()
+
+    jobs = []
+    up_to_date_count = 0
+    for folder_name, original_obj_from_input_folder_path in assets:
+        job = make_asset_job(folder_name, original_obj_from_input_folder_path)
+        job["input_digest"] = input_digests[folder_name]
+        job["build_key"] = build_cache.build_key(job["input_digest"], build_key_params, script_source_digest)
+
+        if not force_rebuild and build_cache.is_up_to_date(folder_name, job["build_key"]):
+            print(f"  {folder_name}: up to date (build cache). Skipping.")
+            up_to_date_count += 1
+            continue
+
+        print(f"  {folder_name}: {'rebuild forced' if force_rebuild else 'changed or not built yet'}. Queued for Blender.")
+        build_cache.invalidate(folder_name)
+        jobs.append(job)
+
+    build_cache.save()
+    return jobs, up_to_date_count
+
+
+def group_object_parts(mesh, min_faces):
+    """Groups a mesh's objects into parts. Returns [(object names, first_face, end_face)].
+
+    Each object with at least min_faces faces is a part. Runs of smaller neighbouring objects
+    share a part until it reaches min_faces; a run that stays smaller joins the part before it
+    (or after it, at the start of the file).
+    """
+    face_total = mesh.face_count
+    segments = [(name, first_face) for name, first_face in mesh.objects if first_face <= face_total]
+    if not segments or segments[0][1] > 0:
+        segments.insert(0, ("part", 0))
+    parts = []
+    for segment_index, (name, first_face) in enumerate(segments):
+        end_face = segments[segment_index + 1][1] if segment_index + 1 < len(segments) else face_total
+        if end_face <= first_face:
+            continue # An 'o' line directly followed by a 'g' line, or a name without faces
+        if parts and end_face - first_face < min_faces and parts[-1][2] - parts[-1][1] < min_faces:
+            parts[-1][0].append(name)
+            parts[-1][2] = end_face
+        else:
+            parts.append([[name], first_face, end_face])
+
+    part_index = 0
+    while len(parts) > 1 and part_index < len(parts):
+        names, first_face, end_face = parts[part_index]
+        if end_face - first_face >= min_faces:
+            part_index += 1
+        elif part_index > 0:
+            parts[part_index - 1][0].extend(names)
+            parts[part_index - 1][2] = end_face
+            del parts[part_index]
+        else:
+            parts[1][0][:0] = names
+            parts[1][1] = first_face
+            del parts[0]
+    return [tuple(part) for part in parts]
+
+
+def part_label(part_number, object_names):
+    """File-name-safe label of a part: its number and first object name (never containing '__')."""
+    name = re.sub(r"[^A-Za-z0-9.-]+", "_", object_names[0]).strip("_") or "part"
+    return f"{part_number:02d}_{name}" + (f"_and_{len(object_names) - 1}_more" if len(object_names) > 1 else "")
+
+
+def split_source_obj(source_obj, parts_folder, min_faces, high_output=None, scale_factor=1.0):
+    """Writes every part of a multi-object OBJ to parts_folder. Runs in a worker process.
+
+    Returns [(label, part_obj_path, faces)], or [] when the OBJ has fewer than two parts
+    (it is then processed whole). With high_output, the asset's scaled _high.obj is
+    written from the source as well, since "join" parts do not export their own.
+    """
+    mesh = lib_obj.read_obj(source_obj)
+    problems = mesh.validate()
+    if problems:
+        raise lib_obj.ObjParseError("; ".join(problems))
+    groups = group_object_parts(mesh, min_faces)
+    if len(groups) < 2:
+        return []
+
+    if os.path.isdir(parts_folder):
+        shutil.rmtree(parts_folder) # Parts (and their outputs) of an earlier split of this asset
+    os.makedirs(parts_folder)
+    parts = []
+    for part_number, (object_names, first_face, end_face) in enumerate(groups, start=1):
+        label = part_label(part_number, object_names)
+        part_obj_path = os.path.join(parts_folder, f"{label}.obj")
+        lib_obj.write_obj(part_obj_path, mesh.submesh(first_face, end_face))
+        parts.append((label, part_obj_path, end_face - first_face))
+    del mesh
+    if high_output:
+        os.makedirs(os.path.dirname(high_output), exist_ok=True)
+        lib_obj.write_scaled_obj(source_obj, high_output, scale_factor)
+    return parts
+
+
+def make_part_job(parent_job, label, part_obj_path):
+    """A Blender job for one part of a split asset, named <asset>__<label>.
+
+    "separate" parts write their outputs into the processed folder like any asset;
+    "join" parts write them next to their OBJ, to be reassembled by join_split_outputs.
+    """
+    part_name = f"{parent_job['asset_name']}__{label}"
+    if SPLIT_OBJECTS == "separate":
+        job = make_asset_job(part_name, part_obj_path)
+    else:
+        job = make_asset_job(part_name, part_obj_path, output_folder=os.path.dirname(part_obj_path))
+        job["skip_high_export"] = True
+    job["intermediate_obj"] = part_obj_path
+    job["split_parent"] = parent_job["asset_name"]
+    return job
+
+
+def remove_stale_split_outputs(job):
+    """Deletes what the other split_objects mode left for this asset, so Painter does not texture it as well.
+
+    "separate" removes the asset's own meshes from an unsplit or "join" build; "join"
+    removes the <asset>__<part> meshes of a "separate" build.
+    """
+    if SPLIT_OBJECTS == "separate":
+        stale_paths = [job["blend_output"], job["high_output"], job["low_output"]] + job["lod_outputs"]
+    else:
+        stale_paths = glob.glob(os.path.join(OUTPUT_PROCESSED_OBJS_FOLDER, f"{glob.escape(job['asset_name'])}__*"))
+    for stale_path in stale_paths:
+        if os.path.isfile(stale_path):
+            os.remove(stale_path)
+            print(f"  Removed output of an earlier build: {stale_path}")
+
+
+def split_multi_object_jobs(jobs):
+    """Replaces every job whose OBJ holds several objects by one job per part (split_objects "join" or "separate").
+
+    The OBJs are split in parallel worker processes. Returns (jobs, split_parents): the jobs
+    to run, with parts in place of their asset, and the replaced asset jobs, each listing its
+    part jobs under "split_parts". An OBJ that cannot be split is processed whole.
+    """
+    worker_count = min(MAX_WORKERS, len(jobs))
+    print(f"\nSplitting multi-object OBJs into parts of at least {SPLIT_MIN_FACES:,} faces ({SPLIT_OBJECTS} mode, {worker_count} process(es))...")
+    with concurrent.futures.ProcessPoolExecutor(max_workers=worker_count) as split_pool:
+        futures = {job["asset_name"]: split_pool.submit(split_source_obj, job["source_obj"], os.path.join(PARTS_FOLDER, job["asset_name"]),
+                                                        SPLIT_MIN_FACES, job["high_output"] if SPLIT_OBJECTS == "join" else None, SCALE_FACTOR)
+                   for job in jobs}
+        concurrent.futures.wait(futures.values())
+
+    run_jobs, split_parents = [], []
+    for job in jobs:
         try:
-            print(f"  Copying '{original_obj_from_input_folder_path}' to '{intermediate_obj_for_blender_path}' for Blender input...")
-            shutil.copy2(original_obj_from_input_folder_path, intermediate_obj_for_blender_path)
+            parts = futures[job["asset_name"]].result()
         except Exception as e:
-            print(f"  ERROR: Could not copy original OBJ for {folder_name}: {e}. Skipping.")
-            skipped_count += 1
+            print(f"  WARNING: Could not split '{job['asset_name']}' ({e}); processing it as one mesh.")
+            parts = []
+        if not parts:
+            run_jobs.append(job)
             continue
+        remove_stale_split_outputs(job)
+        job["split_parts"] = [make_part_job(job, label, part_obj_path) for label, part_obj_path, _ in parts]
+        if SPLIT_OBJECTS == "join":
+            job["output_paths"] = [job["high_output"], job["low_output"]] + job["lod_outputs"]
+        else:
+            job["output_paths"] = [path for part_job in job["split_parts"] for path in job_output_paths(part_job)]
+        split_parents.append(job)
+        run_jobs.extend(job["split_parts"])
+        print(f"  {job['asset_name']}: {len(parts)} parts ({', '.join(f'{label}: {faces:,} faces' for label, _, faces in parts)})")
+    print(f"  Split {len(split_parents)} of {len(jobs)} asset(s); {len(run_jobs)} Blender job(s) to run.")
+    return run_jobs, split_parents
+
+
+def join_split_outputs(part_names, part_low_paths, low_output, part_lod_paths, lod_outputs, tile_padding):
+    """Reassembles a "join" asset's _low.obj and LODs from its parts. Runs in a worker process; returns elapsed seconds.
+
+    Each part keeps its own UV layout, scaled into a tile of the 0-1 square sized by the
+    part's surface area, so the asset stays one texture set. Every LOD level uses the same
+    tiles as _low.obj. part_lod_paths holds one list of part paths per LOD level.
+    """
+    start_time = time.monotonic()
+    low_meshes = [lib_obj.read_obj(path) for path in part_low_paths]
+    tiles = lib_obj.pack_square_tiles([mesh.surface_area() for mesh in low_meshes], tile_padding)
+    levels = [(low_meshes, low_output)] + [([lib_obj.read_obj(path) for path in level_paths], lod_output)
+                                           for level_paths, lod_output in zip(part_lod_paths, lod_outputs)]
+    for meshes, output_path in levels:
+        for mesh, (scale, offset_u, offset_v) in zip(meshes, tiles):
+            mesh.uvs = mesh.uvs * scale + (offset_u, offset_v)
+        lib_obj.write_obj(output_path, lib_obj.concatenate_meshes(list(zip(part_names, meshes))))
+    return time.monotonic() - start_time
+
+
+def assemble_split_assets(split_parents, results, build_cache=None, journal=None):
+    """Finishes the assets split by split_multi_object_jobs once their parts have run.
+
+    An asset succeeds when all of its parts did; "join" assets are then reassembled
+    (in parallel worker processes). Each asset is recorded in the journal and build cache.
+    Returns (results, part_results): the results with each asset's parts replaced by one
+    result for the asset, and the part results (for the run report).
+    """
+    part_names = {part_job["asset_name"] for parent_job in split_parents for part_job in parent_job["split_parts"]}
+    results_by_name = {result["asset_name"]: result for result in results}
+    part_results = [result for result in results if result["asset_name"] in part_names]
+    results = [result for result in results if result["asset_name"] not in part_names]
+    record_build = make_build_recorder(split_parents, build_cache, None, journal)
+
+    print(f"\nAssembling {len(split_parents)} split asset(s)...")
+    join_futures = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(MAX_WORKERS, len(split_parents))) as join_pool:
+        for parent_job in split_parents:
+            parent_result = new_job_result(parent_job)
+            parent_result["parts"] = [part_job["asset_name"] for part_job in parent_job["split_parts"]]
+            results_by_name[parent_job["asset_name"]] = parent_result
+            failed_parts = [name for name in parent_result["parts"]
+                            if results_by_name.get(name, {}).get("status") != "processed"]
+            if failed_parts:
+                parent_result["message"] = f"{len(failed_parts)} of {len(parent_result['parts'])} part(s) failed: {', '.join(failed_parts)}"
+            elif SPLIT_OBJECTS == "join":
+                part_jobs = parent_job["split_parts"]
+                join_futures[parent_job["asset_name"]] = join_pool.submit(
+                    join_split_outputs, [part_job["asset_name"] for part_job in part_jobs], [part_job["low_output"] for part_job in part_jobs],
+                    parent_job["low_output"], [[part_job["lod_outputs"][lod_index] for part_job in part_jobs] for lod_index in range(len(LOD_TARGETS))],
+                    parent_job["lod_outputs"], SPLIT_TILE_PADDING)
+            else:
+                parent_result["status"] = "processed"
+
+        for parent_job in split_parents:
+            parent_result = results_by_name[parent_job["asset_name"]]
+            future = join_futures.get(parent_job["asset_name"])
+            if future is not None:
+                try:
+                    parent_result["elapsed_seconds"] = future.result()
+                    parent_result["status"] = "processed"
+                except Exception as e:
+                    parent_result["message"] = f"Reassembling the parts failed: {e}"
+            if parent_result["status"] == "processed":
+                how = f"joined into {os.path.basename(parent_job['low_output'])} in {parent_result['elapsed_seconds']:.1f}s" if future is not None else "written as separate meshes"
+                print(f"  {parent_job['asset_name']}: {len(parent_result['parts'])} part(s) {how}.")
+            else:
+                print(f"  ERROR: {parent_job['asset_name']}: {parent_result['message']}")
+            record_build(parent_result)
+            results.append(parent_result)
+    return results, part_results
+
+
+def job_cost(job):
+    """Predicted Blender seconds for a job (see schedule_jobs); 1.0 when there is no prediction."""
+    return max(job.get("predicted_seconds") or 1.0, 1e-6)
+
+
+def schedule_jobs(jobs, mesh_index):
+    """Updates the mesh index for the queued assets, predicts each job's Blender time and orders the jobs.
+
+    With SCHEDULE_LARGEST_FIRST the jobs come back most expensive first. Returns
+    (jobs, predicted_run_seconds), where the prediction assumes
+    min(MAX_WORKERS, len(jobs)) parallel workers.
+    """
+    print(f"\nIndexing {len(jobs)} queued mesh(es) ({MESH_INDEX_PATH})...")
+    scanned_count = mesh_index.update([(job["asset_name"], job["source_obj"]) for job in jobs], MAX_WORKERS)
+    print(f"  Scanned {scanned_count} new or changed mesh(es); {len(jobs) - scanned_count} unchanged.")
 
-        print(f"  Launching Blender for full processing pipeline...")
-        blender_cmd = [
-            BLENDER_EXECUTABLE,
-            "--background",
-            "--python", BLENDER_SCRIPT_PATH,
-            "--", # Separator for script arguments
-            "--input_mesh", intermediate_obj_for_blender_path, # Blender script reads this
-            "--output_mesh", low_poly_output_path,         # Blender script saves final _low.obj here
-            
-            "--decimate_ratio", str(DECIMATE_RATIO),
-            "--scale_factor", str(SCALE_FACTOR), # Changed from --upscale_factor
-            "--sp_angle", str(SP_UV_ANGLE_DEGREES),
-            "--sp_margin", str(SP_ISLAND_MARGIN),
-            "--sp_area_weight", str(SP_AREA_WEIGHT),
-            "--sp_correct_aspect", str(SP_CORRECT_ASPECT),
-            "--sp_scale_to_bounds", str(SP_SCALE_TO_BOUNDS),
-            "--sp_margin_method", SP_MARGIN_METHOD,
-            "--sp_rotate_method", SP_ROTATE_METHOD,
-            "--uv_fill_holes", str(UV_FILL_HOLES_BEFORE_UNWRAP),
-            "--apply_scale", str(APPLY_SCALE_BEFORE_UNWRAP), # For original model's scale
-        ]
+    model = mesh_index.cost_model()
+    memory_model = mesh_index.memory_model()
+    for job in jobs:
+        indexed_mesh = mesh_index.get(job["asset_name"])
+        job["faces"] = indexed_mesh["faces"]
+        job["predicted_seconds"] = mesh_index.predict_seconds(indexed_mesh["faces"], model)
+        job["predicted_peak_bytes"] = mesh_index.predict_peak_bytes(indexed_mesh["faces"], memory_model)
 
+    if SCHEDULE_LARGEST_FIRST:
+        jobs = sorted(jobs, key=job_cost, reverse=True)
+
+    worker_count = min(MAX_WORKERS, len(jobs))
+    total_work_seconds = sum(job["predicted_seconds"] for job in jobs)
+    predicted_run_seconds = lib_mesh_index.predict_makespan([job["predicted_seconds"] for job in jobs], worker_count)
+    model_source = f"fitted to {model[2]} previous build(s)" if model[2] >= lib_mesh_index.MIN_BUILDS_FOR_FIT else "default estimate, not enough build history yet"
+    print(f"  Cost model: {model[0]:.1f}s + {model[1]:.1f}s per million faces ({model_source}).")
+    print(f"  Predicted Blender time: {predicted_run_seconds:.0f}s on {worker_count} worker(s) ({total_work_seconds:.0f}s of work in total).")
+    if MEMORY_BUDGET_BYTES is not None:
+        memory_model_source = f"fitted to {memory_model[2]} measured build(s)" if memory_model[2] >= lib_mesh_index.MIN_BUILDS_FOR_FIT else "default estimate, not enough measured builds yet"
+        print(f"  Memory model: {format_bytes(memory_model[0])} + {format_bytes(memory_model[1])} per million faces ({memory_model_source}).")
+        over_budget_jobs = [job for job in jobs if job["predicted_peak_bytes"] > MEMORY_BUDGET_BYTES]
+        if over_budget_jobs:
+            print(f"  {len(over_budget_jobs)} asset(s) are predicted to need more than the {format_bytes(MEMORY_BUDGET_BYTES)} memory budget and will run alone.")
+    if SCHEDULE_LARGEST_FIRST:
+        for job in jobs[:3]:
+            print(f"    Starting early: {job['asset_name']} ({job['faces']:,} faces, ~{job['predicted_seconds']:.0f}s)")
+    return jobs, predicted_run_seconds
+
+
+def build_script_args(job):
+    """Builds the blender_decimate_unwrap.py arguments (everything after '--') for one asset job."""
+    return [
+        "--input_mesh", job.get("blender_input", job["intermediate_obj"]), # Blender script reads this
+        "--output_mesh", job["low_output"],      # Blender script saves final _low.obj here
+        "--blend_output", job["blend_output"],   # Explicit, since the input may not live in the Meshes folder
+        "--high_output", job["high_output"],
+        "--high_format", HIGH_POLY_FORMAT,
+        "--result_file", job["result_file"],     # Blender script writes the job's status here
+        "--stats_output", job["stats_file"],     # ...and per-stage timings, peak memory and mesh counts here
+        # _high.obj is written by write_high_poly_obj (or, for the parts of a "join" asset, by split_source_obj)
+        *(["--skip_high_export"] if USE_EXTERNAL_HIGH_POLY_WRITER or job.get("skip_high_export") else []),
+
+        "--decimate_ratio", str(DECIMATE_RATIO),
+        "--decimate_mode", DECIMATE_MODE,
+        *(["--target_triangles", str(TARGET_TRIANGLES)] if DECIMATE_MODE == "triangles" else []),
+        *(["--triangles_per_area", str(TRIANGLES_PER_AREA)] if DECIMATE_MODE == "density" else []),
+        "--min_decimate_ratio", str(MIN_DECIMATE_RATIO),
+        "--max_decimate_ratio", str(MAX_DECIMATE_RATIO),
+        "--scale_factor", str(SCALE_FACTOR), # Changed from --upscale_factor
+        "--sp_angle", str(SP_UV_ANGLE_DEGREES),
+        "--sp_margin", str(SP_ISLAND_MARGIN),
+        "--sp_area_weight", str(SP_AREA_WEIGHT),
+        "--sp_correct_aspect", str(SP_CORRECT_ASPECT),
+        "--sp_scale_to_bounds", str(SP_SCALE_TO_BOUNDS),
+        "--sp_margin_method", SP_MARGIN_METHOD,
+        "--sp_rotate_method", SP_ROTATE_METHOD,
+        "--uv_fill_holes", str(UV_FILL_HOLES_BEFORE_UNWRAP),
+        "--apply_scale", str(APPLY_SCALE_BEFORE_UNWRAP), # For original model's scale
+        *(["--lod_targets", *[str(lod_target) for lod_target in LOD_TARGETS],
+            "--lod_outputs", *job["lod_outputs"],
+            "--lod_uv_mode", LOD_UV_MODE] if LOD_TARGETS else []),
+    ]
+
+
+def build_blender_command(script_args):
+    """Builds the full Blender command line around blender_decimate_unwrap.py arguments."""
+    return [
+        BLENDER_EXECUTABLE,
+        "--background",
+        "--python", BLENDER_SCRIPT_PATH,
+        "--", # Separator for script arguments
+    ] + script_args
+
+
+def new_job_result(job):
+    return {
+        "asset_name": job["asset_name"],
+        "status": "failed",
+        "message": "",
+        "stdout": "",
+        "stderr": "",
+        "log_file": job.get("log_file"),
+        "high_poly_writer": "external" if USE_EXTERNAL_HIGH_POLY_WRITER else "blender",
+        "high_poly_seconds": None,
+        "returncode": None,
+        "elapsed_seconds": 0.0,
+        "input_handoff": None,
+        "predicted_peak_bytes": job.get("predicted_peak_bytes"),
+        "memory_wait_seconds": 0.0,
+    }
+
+
+# Linux FICLONE ioctl: share the source file's extents with the destination (btrfs, XFS, ...).
+FICLONE = 0x40049409
+
+# errno values meaning "this filesystem/OS cannot do that", as opposed to a real I/O error.
+UNSUPPORTED_LINK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EACCES, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS, errno.EMLINK}
+
+
+def try_hardlink(source_path, destination_path):
+    try:
+        os.link(source_path, destination_path)
+        return True
+    except (OSError, NotImplementedError):
+        return False
+
+
+def try_reflink(source_path, destination_path):
+    """Creates a copy-on-write clone of source_path. Returns False if the filesystem cannot."""
+    system_name = platform.system()
+    if system_name == "Linux":
+        import fcntl
         try:
-            completed_process = subprocess.run(blender_cmd, check=True, capture_output=True, text=True, encoding='utf-8')
-            print(f"  Blender processing successful for {folder_name}.")
-            if completed_process.stdout and completed_process.stdout.strip():
-                 print("  Blender stdout:\n", completed_process.stdout.strip())
-            if completed_process.stderr and completed_process.stderr.strip():
-                 print("  Blender stderr:\n", completed_process.stderr.strip())
-            processed_count += 1
-        except subprocess.CalledProcessError as e:
-            print(f"  ERROR: Blender script failed for {folder_name}.")
-            print(f"  Return code: {e.returncode}")
-            print(f"  Stdout: {e.stdout.strip() if e.stdout else 'N/A'}")
-            print(f"  Stderr: {e.stderr.strip() if e.stderr else 'N/A'}")
-            skipped_count += 1
+            with open(source_path, 'rb') as source_file, open(destination_path, 'wb') as destination_file:
+                fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+            shutil.copystat(source_path, destination_path)
+            return True
+        except OSError as e:
+            if os.path.exists(destination_path):
+                os.remove(destination_path)
+            if e.errno not in UNSUPPORTED_LINK_ERRNOS:
+                raise
+            return False
+    if system_name == "Darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(libc, "clonefile"):
+            return False
+        return libc.clonefile(os.fsencode(source_path), os.fsencode(destination_path), 0) == 0
+    return False
+
+
+def remove_stale_intermediate(job):
+    """Deletes an intermediate OBJ from an earlier run, so it cannot be mistaken for the current input."""
+    if os.path.lexists(job["intermediate_obj"]):
+        os.remove(job["intermediate_obj"])
+
+
+def hand_off_input(job):
+    """Makes the source OBJ available to Blender without copying it if at all possible.
+
+    Sets job["blender_input"] and returns the method used: "hardlink" or "reflink"
+    (the intermediate OBJ in the Meshes folder shares the source's data),
+    "direct" (Blender reads the original file; there is no intermediate OBJ),
+    or "copy" (a full copy, only when nothing else is possible or INPUT_HANDOFF is "copy").
+    """
+    source_path = job["source_obj"]
+    intermediate_path = job["intermediate_obj"]
+    if "split_parent" in job:
+        # A part written by split_source_obj is already a pipeline file; Blender reads it in place.
+        job["blender_input"] = source_path
+        return "direct"
+
+    if INPUT_HANDOFF != "copy":
+        if os.path.exists(intermediate_path) and os.path.samefile(source_path, intermediate_path):
+            job["blender_input"] = intermediate_path
+            return "hardlink"
+        remove_stale_intermediate(job)
+        if try_hardlink(source_path, intermediate_path):
+            job["blender_input"] = intermediate_path
+            return "hardlink"
+        if try_reflink(source_path, intermediate_path):
+            job["blender_input"] = intermediate_path
+            return "reflink"
+        if os.access(source_path, os.R_OK):
+            job["blender_input"] = source_path
+            return "direct"
+    else:
+        remove_stale_intermediate(job)
+
+    shutil.copy2(source_path, intermediate_path)
+    job["blender_input"] = intermediate_path
+    return "copy"
+
+
+def prepare_blender_input(job, result):
+    """Hands the source OBJ to Blender (see hand_off_input). Returns False (and fills result) on failure."""
+    try:
+        # Result/stats/log files left over from an earlier run must not be mistaken for this run's outcome.
+        for previous_run_file in (job["result_file"], job["stats_file"], job["log_file"]):
+            if os.path.exists(previous_run_file):
+                os.remove(previous_run_file)
+        result["input_handoff"] = hand_off_input(job)
+        return True
+    except Exception as e:
+        result["message"] = f"Could not hand original OBJ '{job['source_obj']}' to Blender: {e}"
+        return False
+
+
+def read_result_file(job):
+    """Returns the result dict Blender wrote for this job, or None if there is none."""
+    try:
+        with open(job["result_file"], 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def apply_result_file(job, result):
+    """Sets result status from the job's result file. Returns False if Blender never wrote one."""
+    blender_result = read_result_file(job)
+    if blender_result is None:
+        return False
+    if blender_result.get("status") == "ok":
+        result["status"] = "processed"
+    else:
+        result["status"] = "failed"
+        result["message"] = f"Blender script failed: {blender_result.get('message')}"
+    return True
+
+
+class Watchdog:
+    """Kills a process if it is not re-armed or cancelled within timeout_seconds (0 = never)."""
+
+    def __init__(self, process, timeout_seconds):
+        self.process = process
+        self.timeout_seconds = timeout_seconds
+        self.fired = False
+        self._timer = None
+
+    def _expire(self):
+        self.fired = True
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+    def arm(self):
+        self.cancel()
+        if self.timeout_seconds and self.timeout_seconds > 0:
+            self._timer = threading.Timer(self.timeout_seconds, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+
+# The Blender process each job thread is running, so a queue worker that loses a job's lease can stop it.
+JOB_PROCESSES = {} # thread ident -> subprocess.Popen
+JOB_PROCESSES_LOCK = threading.Lock()
+
+
+def set_job_process(process):
+    """Records (or, with None, forgets) the Blender process running the calling thread's job."""
+    with JOB_PROCESSES_LOCK:
+        if process is None:
+            JOB_PROCESSES.pop(threading.get_ident(), None)
+        else:
+            JOB_PROCESSES[threading.get_ident()] = process
+
+
+def stop_job_process(thread_ident):
+    """Kills the Blender process of another thread's job, if it is running one."""
+    with JOB_PROCESSES_LOCK:
+        process = JOB_PROCESSES.get(thread_ident)
+        if process is not None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+
+class AssetLog:
+    """One asset's Blender output: written line by line to its log file, with a bounded in-memory tail."""
+
+    def __init__(self, job):
+        self.asset_name = job["asset_name"]
+        self.log_file_path = job["log_file"]
+        os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
+        self.log_file = open(self.log_file_path, 'w', encoding='utf-8', buffering=1)
+        self.tail = collections.deque(maxlen=LOG_TAIL_LINES)
+
+    def write(self, line):
+        self.log_file.write(line)
+        self.tail.append(line)
+        if PROGRESS_LINE_MARKER in line:
+            with CONSOLE_LOCK:
+                print(f"  [{self.asset_name}] {line.strip()}")
+
+    def tail_text(self):
+        return "".join(self.tail)
+
+    def close(self):
+        self.log_file.close()
+
+
+def start_blender_process(script_args, stdin=None):
+    """Starts Blender with stdout and stderr merged into one pipe that is read line by line."""
+    return subprocess.Popen(
+        build_blender_command(script_args),
+        stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding='utf-8', errors='replace', bufsize=1,
+    )
+
+
+def write_high_poly_obj(source_obj, high_output, scale_factor):
+    """Writes _high.obj from the source OBJ without Blender. Runs in a worker process; returns elapsed seconds."""
+    start_time = time.monotonic()
+    os.makedirs(os.path.dirname(high_output), exist_ok=True)
+    lib_obj.write_scaled_obj(source_obj, high_output, scale_factor)
+    return time.monotonic() - start_time
+
+
+def start_high_poly_export(job, high_poly_pool):
+    """Starts writing the job's _high.obj on high_poly_pool, alongside Blender. Returns a future, or None."""
+    if high_poly_pool is None or job.get("skip_high_export"):
+        return None
+    return high_poly_pool.submit(write_high_poly_obj, job["source_obj"], job["high_output"], SCALE_FACTOR)
+
+
+def finish_high_poly_export(future, result):
+    """Waits for a start_high_poly_export future. If the write failed, so does the asset."""
+    if future is None:
+        return
+    try:
+        result["high_poly_seconds"] = future.result()
+    except Exception as e:
+        if result["status"] == "processed":
+            result["status"] = "failed"
+            result["message"] = (f"Writing _high.obj outside Blender failed ({e}) "
+                                 f"Set \"high_poly_writer\": \"blender\" in config.json to have Blender export it.")
+
+
+def run_blender_job(job, high_poly_pool=None):
+    """Hands over the source OBJ and runs a fresh Blender process for one asset.
+
+    Blender's output is streamed into the asset's log file rather than held in
+    memory; only stage progress lines are echoed to the console. Everything the
+    main thread needs to report is returned in the result dict.
+    """
+    result = new_job_result(job)
+    start_time = time.monotonic()
+
+    if not prepare_blender_input(job, result):
+        result["elapsed_seconds"] = time.monotonic() - start_time
+        return result
+
+    high_poly_future = start_high_poly_export(job, high_poly_pool)
+    try:
+        process = start_blender_process(build_script_args(job))
+    except FileNotFoundError:
+        result["status"] = "blender_missing"
+        result["message"] = f"Blender executable not found at '{BLENDER_EXECUTABLE}'."
+        return result
+    MEMORY_GATE.track_process(process.pid)
+    set_job_process(process)
+
+    asset_log = AssetLog(job)
+    watchdog = Watchdog(process, BLENDER_TIMEOUT_SECONDS)
+    try:
+        watchdog.arm()
+        for line in process.stdout:
+            asset_log.write(line)
+        result["returncode"] = process.wait()
+        watchdog.cancel()
+        if watchdog.fired:
+            result["message"] = f"Blender timed out after {BLENDER_TIMEOUT_SECONDS}s and was killed."
+        elif not apply_result_file(job, result):
+            result["message"] = f"Blender exited with code {result['returncode']} without writing a result file."
+    except Exception as e:
+        process.kill()
+        process.wait()
+        result["message"] = f"An unexpected error occurred during Blender processing: {e}"
+    finally:
+        set_job_process(None)
+        watchdog.cancel()
+        asset_log.close()
+    result["stdout"] = asset_log.tail_text()
+    finish_high_poly_export(high_poly_future, result)
+
+    result["elapsed_seconds"] = time.monotonic() - start_time
+    return result
+
+
+class BlenderWorkerCrashed(Exception):
+    pass
+
+
+class BlenderWorker:
+    """A long-lived Blender process running blender_decimate_unwrap.py in --worker mode.
+
+    Jobs are sent as one JSON line on stdin; Blender answers with one
+    WORKER_RESULT_PREFIX line on stdout. Everything else it prints goes to the
+    current job's AssetLog.
+    """
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.process = None
+
+    def start(self):
+        self.process = start_blender_process(["--worker"], stdin=subprocess.PIPE)
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, job, asset_log):
+        """Sends one job and blocks until its result arrives. Returns the result dict.
+
+        If the job exceeds BLENDER_TIMEOUT_SECONDS the worker process is killed,
+        which surfaces here as BlenderWorkerCrashed.
+        """
+        if not self.is_running():
+            self.start()
+        MEMORY_GATE.track_process(self.process.pid)
+
+        request = {"asset_name": job["asset_name"], "args": build_script_args(job)}
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            raise BlenderWorkerCrashed(f"Could not send job to Blender worker {self.worker_id}: {e}")
+
+        watchdog = Watchdog(self.process, BLENDER_TIMEOUT_SECONDS)
+        watchdog.arm()
+        set_job_process(self.process)
+        try:
+            for line in self.process.stdout:
+                if line.startswith(WORKER_RESULT_PREFIX):
+                    return json.loads(line[len(WORKER_RESULT_PREFIX):])
+                asset_log.write(line)
+        finally:
+            set_job_process(None)
+            watchdog.cancel()
+
+        # stdout closed before a result line: Blender died (or was killed) in the middle of the job.
+        returncode = self.process.wait()
+        if watchdog.fired:
+            raise BlenderWorkerCrashed(f"Blender worker {self.worker_id} timed out after {BLENDER_TIMEOUT_SECONDS}s and was killed.")
+        raise BlenderWorkerCrashed(f"Blender worker {self.worker_id} exited with code {returncode} before reporting a result.")
+
+    def stop(self):
+        if not self.is_running():
+            return
+        try:
+            self.process.stdin.write(json.dumps({"command": "shutdown"}) + "\n")
+            self.process.stdin.flush()
+            self.process.stdin.close()
+            self.process.wait(timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class BlenderWorkerPool:
+    """A fixed set of BlenderWorkers shared by the job threads. A crashed worker is respawned on its next job."""
+
+    def __init__(self, size):
+        self.workers = [BlenderWorker(worker_id) for worker_id in range(1, size + 1)]
+        self.idle_workers = queue.Queue()
+        for worker in self.workers:
+            self.idle_workers.put(worker)
+
+    def run_job(self, job, high_poly_pool=None):
+        """Hands over the source OBJ and runs the job on the next idle worker. Same result shape as run_blender_job."""
+        result = new_job_result(job)
+        start_time = time.monotonic()
+
+        if not prepare_blender_input(job, result):
+            result["elapsed_seconds"] = time.monotonic() - start_time
+            return result
+
+        high_poly_future = start_high_poly_export(job, high_poly_pool)
+        worker = self.idle_workers.get()
+        asset_log = AssetLog(job)
+        try:
+            worker_result = worker.run(job, asset_log)
+            if worker_result.get("status") == "ok":
+                result["status"] = "processed"
+            else:
+                result["message"] = f"Blender script failed: {worker_result.get('message')}"
         except FileNotFoundError:
-            print(f"  ERROR: Blender executable not found at '{BLENDER_EXECUTABLE}'. Please check path in config.json.")
-            print("  Halting script.")
-            exit(1)
+            result["status"] = "blender_missing"
+            result["message"] = f"Blender executable not found at '{BLENDER_EXECUTABLE}'."
+        except BlenderWorkerCrashed as e:
+            # Leave the dead process behind; worker.run() starts a new one for the next job.
+            result["message"] = f"Blender worker crashed: {e}"
         except Exception as e:
-            print(f"  An unexpected error occurred during Blender processing for {folder_name}: {e}")
-            skipped_count += 1
+            result["message"] = f"An unexpected error occurred during Blender processing: {e}"
+        finally:
+            asset_log.close()
+            self.idle_workers.put(worker)
+        result["stdout"] = asset_log.tail_text()
+        finish_high_poly_export(high_poly_future, result)
+
+        result["elapsed_seconds"] = time.monotonic() - start_time
+        return result
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.stop()
+
+
+def split_into_manifest_batches(jobs, worker_count):
+    """Groups jobs into manifest batches.
+
+    Uses at least one batch per worker so no worker idles, and more when a batch
+    would exceed MANIFEST_MAX_ASSETS, so one slow batch cannot hold the run's tail.
+    Each job goes to the non-full batch with the least predicted work so far
+    (largest job first), and the batches are returned most expensive first.
+    Without predictions every job counts the same, which deals them round-robin.
+    """
+    batch_count = max(worker_count, math.ceil(len(jobs) / max(1, MANIFEST_MAX_ASSETS)))
+    batch_count = min(batch_count, len(jobs))
+    batch_capacity = max(MANIFEST_MAX_ASSETS, math.ceil(len(jobs) / batch_count))
+    batches = [[] for _ in range(batch_count)]
+    batch_costs = [0.0] * batch_count
+    for job in sorted(jobs, key=job_cost, reverse=True):
+        open_batches = [index for index in range(batch_count) if len(batches[index]) < batch_capacity]
+        target_index = min(open_batches, key=lambda index: batch_costs[index])
+        batches[target_index].append(job)
+        batch_costs[target_index] += job_cost(job)
+    order = sorted(range(batch_count), key=lambda index: batch_costs[index], reverse=True)
+    return [batches[index] for index in order]
+
+
+def run_manifest_batch(batch, batch_id, high_poly_pool=None):
+    """Runs a batch of jobs in one Blender session via a JSON manifest. Returns one result per job.
+
+    If Blender dies part-way through, the asset it was on is reported as failed and
+    the rest of the batch is retried in a new Blender session.
+    """
+    results = []
+    pending_jobs = []
+    pending_results = {}
+    high_poly_futures = {}
+    batch_start_time = time.monotonic()
+    for job in batch:
+        result = new_job_result(job)
+        if prepare_blender_input(job, result):
+            pending_jobs.append(job)
+            pending_results[job["asset_name"]] = result
+            high_poly_futures[job["asset_name"]] = start_high_poly_export(job, high_poly_pool)
+        else:
+            results.append(result)
+
+    def finish_job(result):
+        finish_high_poly_export(high_poly_futures.pop(result["asset_name"], None), result)
+        results.append(result)
+
+    attempt = 0
+    while pending_jobs:
+        attempt += 1
+        manifest_path = os.path.join(MANIFESTS_FOLDER, f"batch_{batch_id:03d}_{attempt}.json")
+        manifest = {"jobs": [{"asset_name": job["asset_name"], "args": build_script_args(job)} for job in pending_jobs]}
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        try:
+            process = start_blender_process(["--manifest", manifest_path])
+        except FileNotFoundError:
+            for job in pending_jobs:
+                result = pending_results[job["asset_name"]]
+                result["status"] = "blender_missing"
+                result["message"] = f"Blender executable not found at '{BLENDER_EXECUTABLE}'."
+                finish_job(result)
+            return results
+        MEMORY_GATE.track_process(process.pid)
+
+        # Blender announces each job with a JOB_START_PREFIX line; output is routed to that asset's log
+        # and the timeout watchdog restarts, so BLENDER_TIMEOUT_SECONDS applies per asset, not per batch.
+        jobs_by_name = {job["asset_name"]: job for job in pending_jobs}
+        asset_logs = {}
+        current_log = asset_logs[pending_jobs[0]["asset_name"]] = AssetLog(pending_jobs[0])
+        watchdog = Watchdog(process, BLENDER_TIMEOUT_SECONDS)
+        watchdog.arm()
+        try:
+            for line in process.stdout:
+                if line.startswith(JOB_START_PREFIX):
+                    asset_name = line[len(JOB_START_PREFIX):].strip()
+                    if asset_name in jobs_by_name:
+                        if asset_name not in asset_logs:
+                            asset_logs[asset_name] = AssetLog(jobs_by_name[asset_name])
+                        current_log = asset_logs[asset_name]
+                        watchdog.arm()
+                    continue
+                current_log.write(line)
+            returncode = process.wait()
+        finally:
+            watchdog.cancel()
+            for asset_log in asset_logs.values():
+                asset_log.close()
+
+        still_pending = []
+        crash_reported = False
+        for job in pending_jobs:
+            result = pending_results[job["asset_name"]]
+            result["elapsed_seconds"] = time.monotonic() - batch_start_time
+            if job["asset_name"] in asset_logs:
+                result["stdout"] = asset_logs[job["asset_name"]].tail_text()
+            if apply_result_file(job, result):
+                finish_job(result)
+            elif not crash_reported:
+                # Jobs run in manifest order, so the first one without a result is the one Blender died on.
+                crash_reported = True
+                result["returncode"] = returncode
+                if watchdog.fired:
+                    result["message"] = f"Blender timed out after {BLENDER_TIMEOUT_SECONDS}s on this asset and was killed (manifest '{manifest_path}')."
+                else:
+                    result["message"] = f"Blender exited with code {returncode} while processing this asset (manifest '{manifest_path}')."
+                finish_job(result)
+            else:
+                still_pending.append(job)
+        pending_jobs = still_pending
+
+    return results
+
+
+def job_peak_bytes(job):
+    """Predicted peak memory of a job (see schedule_jobs), or the default model's base when it has no prediction."""
+    return job.get("predicted_peak_bytes") or lib_mesh_index.DEFAULT_PEAK_BASE_BYTES
+
+
+def run_with_memory_admission(jobs, run_work):
+    """Waits until MEMORY_GATE admits the jobs, then returns run_work()'s list of results.
+
+    jobs is a single job or a manifest batch; a batch runs in one Blender session,
+    one asset after another, so it is counted as its largest job.
+    """
+    predicted_bytes = max(job_peak_bytes(job) for job in jobs)
+    label = jobs[0]["asset_name"] if len(jobs) == 1 else f"batch of {len(jobs)} ({jobs[0]['asset_name']}, ...)"
+
+    def announce_wait(in_use_bytes):
+        with CONSOLE_LOCK:
+            print(f"  Waiting for memory: {label} needs ~{format_bytes(predicted_bytes)}; "
+                  f"running jobs hold ~{format_bytes(in_use_bytes)} of the {format_bytes(MEMORY_BUDGET_BYTES)} budget.")
+
+    wait_seconds = MEMORY_GATE.acquire(label, predicted_bytes, announce_wait)
+    try:
+        results = run_work()
+    finally:
+        MEMORY_GATE.release()
+    for result in results:
+        result["memory_wait_seconds"] = wait_seconds
+    return results
+
+
+def report_job_result(result, finished_index, total_jobs):
+    """Prints the outcome of one finished job. Only called from the main thread."""
+    asset_name = result["asset_name"]
+    with CONSOLE_LOCK:
+        print(f"\n[{finished_index}/{total_jobs}] Finished asset: {asset_name} ({result['elapsed_seconds']:.1f}s)")
+        if result["status"] == "processed":
+            high_poly_note = f", _high.obj written externally in {result['high_poly_seconds']:.1f}s" if result["high_poly_seconds"] is not None else ""
+            print(f"  Blender processing successful for {asset_name} (input handoff: {result['input_handoff']}{high_poly_note}).")
+            if result["log_file"] and os.path.exists(result["log_file"]):
+                print(f"  Blender log: {result['log_file']}")
+        else:
+            print(f"  ERROR: {result['message']} ({asset_name})")
+            if result["returncode"] is not None:
+                print(f"  Return code: {result['returncode']}")
+            if result["stdout"].strip():
+                print(f"  Last {LOG_TAIL_LINES} lines of Blender output:\n{result['stdout'].rstrip()}")
+            if result["log_file"] and os.path.exists(result["log_file"]):
+                print(f"  Full Blender log: {result['log_file']}")
+
+
+def make_build_recorder(jobs, build_cache, mesh_index, journal=None):
+    """Returns a callback that records a result in the journal and, if it succeeded, in the build cache and the mesh index."""
+    jobs_by_name = {job["asset_name"]: job for job in jobs}
+    # Keyed on the inputs as they were when the run started, not when each job finishes.
+    journal_keys = {job["asset_name"]: journal_key(job) for job in jobs} if journal is not None else {}
+
+    def record_build(result):
+        job = jobs_by_name[result["asset_name"]]
+        if journal is not None:
+            key = journal_keys[job["asset_name"]]
+            if result["input_handoff"]:
+                journal.record("blender", job["asset_name"], "copy", "done", key, method=result["input_handoff"])
+            journal.record("blender", job["asset_name"], "blender", "done" if result["status"] == "processed" else "failed", key,
+                           message=result["message"], seconds=round(result["elapsed_seconds"], 2), outputs=job_output_paths(job))
+        if result["status"] != "processed":
+            return
+        if build_cache is not None and "split_parent" not in job: # Parts are cached through their asset
+            build_cache.record(job["asset_name"], job["build_key"], job["source_obj"], job["input_digest"], job_output_paths(job))
+            build_cache.save()
+        if mesh_index is not None:
+            # Time spent inside Blender (from its stats file); the orchestrator's timing is per batch in manifest mode.
+            stats = read_stats_file(job["asset_name"]) or {}
+            stage_peaks = [stage.get("peak_rss_bytes") for stage in stats.get("stages", []) if stage.get("peak_rss_bytes")]
+            mesh_index.record_build(job["asset_name"], stats.get("total_seconds") or result["elapsed_seconds"],
+                                    max(stage_peaks) if stage_peaks else None)
+
+    return record_build
+
+
+def run_jobs(jobs, build_cache=None, mesh_index=None, journal=None):
+    """Runs all jobs on a pool of MAX_WORKERS threads, each driving one Blender process.
+
+    Returns the list of job results. Results (and the build cache) are only
+    touched from the main thread as they arrive, so totals stay correct
+    regardless of completion order.
+    """
+    if not jobs:
+        return []
+
+    record_build = make_build_recorder(jobs, build_cache, mesh_index, journal)
+    worker_count = min(MAX_WORKERS, len(jobs))
+    print(f"\nLaunching {len(jobs)} Blender job(s) on {worker_count} worker(s) (execution mode: {EXECUTION_MODE})...")
+
+    os.makedirs(RESULTS_FOLDER, exist_ok=True)
+
+    # _high.obj writes run in separate processes (the parsing and formatting is CPU-bound),
+    # overlapping with the Blender process working on the same asset.
+    high_poly_pool = None
+    if USE_EXTERNAL_HIGH_POLY_WRITER:
+        print(f"Writing _high.obj files outside Blender on {worker_count} process(es).")
+        high_poly_pool = concurrent.futures.ProcessPoolExecutor(max_workers=worker_count)
+
+    worker_pool = None
+    try:
+        if EXECUTION_MODE == "manifest":
+            os.makedirs(MANIFESTS_FOLDER, exist_ok=True)
+            batches = split_into_manifest_batches(jobs, worker_count)
+            print(f"Grouped assets into {len(batches)} manifest(s) of up to {max(len(batch) for batch in batches)} asset(s).")
+            work_units = [(batch, batch_id) for batch_id, batch in enumerate(batches, start=1)]
+            return collect_job_results(work_units, lambda unit: run_with_memory_admission(unit[0], lambda: run_manifest_batch(*unit, high_poly_pool)),
+                                       worker_count, len(jobs), record_build)
+
+        run_job = run_blender_job
+        if EXECUTION_MODE == "worker":
+            worker_pool = BlenderWorkerPool(worker_count)
+            run_job = worker_pool.run_job
+        return collect_job_results(jobs, lambda job: run_with_memory_admission([job], lambda: [run_job(job, high_poly_pool)]),
+                                   worker_count, len(jobs), record_build)
+    finally:
+        if worker_pool:
+            worker_pool.shutdown()
+        if high_poly_pool:
+            high_poly_pool.shutdown(cancel_futures=True)
+
+
+def collect_job_results(work_units, run_work_unit, worker_count, total_jobs, on_job_finished=None):
+    """Runs run_work_unit(unit) for every unit on worker_count threads and reports results as they finish.
+
+    A work unit is a single job or a manifest batch; run_work_unit returns the list of job results for it.
+    on_job_finished(result) is called from the main thread for every result.
+    """
+    results = []
+    finished_index = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=worker_count) as executor:
+        futures = [executor.submit(run_work_unit, unit) for unit in work_units]
+        for future in concurrent.futures.as_completed(futures):
+            for result in future.result():
+                finished_index += 1
+                report_job_result(result, finished_index, total_jobs)
+                if on_job_finished:
+                    on_job_finished(result)
+
+                if result["status"] == "blender_missing":
+                    print(f"  ERROR: Blender executable not found at '{BLENDER_EXECUTABLE}'. Please check path in config.json.")
+                    print("  Halting script.")
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    exit(1)
+                # Keep the result but drop the log tail; the full output is in the asset's log file.
+                result["stdout"] = result["stderr"] = ""
+                results.append(result)
+
+    return results
+
+
+def queue_build_params():
+    """The settings every queue worker must share with the coordinator, since they decide what Blender produces.
+
+    They match the build cache key, so a result is never cached under settings it was not built with.
+    """
+    return dict(blender_script_params, high_poly_writer="external" if USE_EXTERNAL_HIGH_POLY_WRITER else "blender",
+                high_poly_format=HIGH_POLY_FORMAT)
+
+
+def run_queue_coordinator(jobs, build_cache=None, mesh_index=None, journal=None):
+    """Puts every job into the shared queue and collects the results published by --queue-worker processes.
+
+    Jobs are submitted in schedule order, so workers claim the largest ones first.
+    Running jobs whose lease stops being renewed are put back for another worker.
+    Returns the list of job results, like run_jobs.
+    """
+    if not jobs:
+        return []
+
+    job_queue = lib_job_queue.JobQueue(QUEUE_FOLDER)
+    run_id = f"{socket.gethostname()}-{os.getpid()}-{time.strftime('%Y%m%d_%H%M%S')}"
+    job_queue.reset(run_id)
+    for order, job in enumerate(jobs, start=1):
+        job_queue.submit(order, job["asset_name"], {"run_id": run_id, "build_params": queue_build_params(), "job": job})
+    print(f"\nQueued {len(jobs)} job(s) in {QUEUE_FOLDER} (run {run_id}).")
+    print(f"Start workers with: python process_assets.py --queue-worker   (lease: {QUEUE_LEASE_SECONDS}s)")
+
+    record_build = make_build_recorder(jobs, build_cache, mesh_index, journal)
+    results = []
+    collected_job_ids = set()
+    lease_watch = {}
+    try:
+        while len(collected_job_ids) < len(jobs):
+            for job_id, result_payload in job_queue.collect_results(collected_job_ids).items():
+                if result_payload.get("run_id") != run_id:
+                    continue # Published late by a worker of an earlier run
+                collected_job_ids.add(job_id)
+                result = result_payload["result"]
+                report_job_result(result, len(collected_job_ids), len(jobs))
+                print(f"  Processed by queue worker: {result.get('queue_worker')}")
+                record_build(result)
+                result["stdout"] = result["stderr"] = ""
+                results.append(result)
+            for job_id in job_queue.requeue_expired(QUEUE_LEASE_SECONDS, lease_watch):
+                print(f"\n  Lease on '{job_id}' expired (no heartbeat for {QUEUE_LEASE_SECONDS}s); re-queued for another worker.")
+            if len(collected_job_ids) < len(jobs):
+                time.sleep(QUEUE_POLL_SECONDS)
+    finally:
+        # Also on Ctrl+C: idle workers exit instead of waiting for jobs that will never be collected.
+        job_queue.close(run_id)
+    return results
+
+
+def run_queue_worker(worker_id):
+    """Claims jobs from the shared queue and runs them, MAX_WORKERS at a time, until the coordinator closes the queue.
+
+    Each claimed job's lease is renewed in the background while Blender runs. If the
+    lease is lost (the coordinator gave the job to another worker), Blender is stopped
+    and nothing is published. The result is published atomically; if this machine has
+    no Blender, the job is put back for another worker and this worker stops.
+    """
+    job_queue = lib_job_queue.JobQueue(QUEUE_FOLDER)
+    execution_mode = EXECUTION_MODE if EXECUTION_MODE != "manifest" else "per_asset" # Jobs are claimed one at a time
+    print(f"Queue worker '{worker_id}' watching {QUEUE_FOLDER} with {MAX_WORKERS} slot(s) (execution mode: {execution_mode}).")
+    if execution_mode != EXECUTION_MODE:
+        print("  (\"manifest\" mode does not apply to queue workers; running one Blender per asset.)")
+
+    stop_event = threading.Event()
+    finished_count = [0]
+    seen_run_ids = set() # Runs this worker has seen open; it exits when one of them is closed
+    high_poly_pool = concurrent.futures.ProcessPoolExecutor(max_workers=MAX_WORKERS) if USE_EXTERNAL_HIGH_POLY_WRITER else None
+    worker_pool = BlenderWorkerPool(MAX_WORKERS) if execution_mode == "worker" else None
+    run_job = worker_pool.run_job if worker_pool else run_blender_job
+
+    def run_claimed_job(claimed_job, slot_id):
+        payload = claimed_job.payload
+        job = payload["job"]
+        with CONSOLE_LOCK:
+            print(f"\n[{slot_id}] Claimed asset: {job['asset_name']}")
+
+        if payload.get("build_params") != queue_build_params():
+            result = new_job_result(job)
+            result["message"] = (f"script_params, high_poly_format or the high-poly writer (high_poly_writer, NumPy) on this machine "
+                                 f"({CONFIG_FILE_PATH}) differ from the coordinator's; refusing to build with different settings.")
+        else:
+            job_thread_ident = threading.get_ident()
+            heartbeat = lib_job_queue.LeaseHeartbeat(job_queue, claimed_job, max(1.0, QUEUE_LEASE_SECONDS / 4),
+                                                     on_lost=lambda: stop_job_process(job_thread_ident))
+            heartbeat.start()
+            try:
+                result = run_with_memory_admission([job], lambda: [run_job(job, high_poly_pool)])[0]
+            finally:
+                heartbeat.stop()
+            if heartbeat.lost:
+                with CONSOLE_LOCK:
+                    print(f"  [{slot_id}] Warning: the lease on '{job['asset_name']}' expired while it ran; "
+                          f"stopped Blender and left the job to the worker that has it now.")
+                return
+
+        if result["status"] == "blender_missing":
+            job_queue.release(claimed_job)
+            with CONSOLE_LOCK:
+                print(f"  ERROR: Blender executable not found at '{BLENDER_EXECUTABLE}'. Returned '{job['asset_name']}' to the queue; stopping this worker.")
+            stop_event.set()
+            return
+
+        result["queue_worker"] = slot_id
+        if not job_queue.publish(claimed_job, {"run_id": payload["run_id"], "result": result}):
+            with CONSOLE_LOCK:
+                print(f"  [{slot_id}] Warning: the lease on '{job['asset_name']}' expired before its result was published; "
+                      f"discarded the result.")
+            return
+        with CONSOLE_LOCK:
+            finished_count[0] += 1
+            status_text = "processed" if result["status"] == "processed" else f"{result['status']}: {result['message']}"
+            print(f"[{slot_id}] Finished asset: {job['asset_name']} ({result['elapsed_seconds']:.1f}s, {status_text})")
+
+    def run_slot(slot_number):
+        slot_id = f"{worker_id}/{slot_number}"
+        while not stop_event.is_set():
+            claimed_job = job_queue.claim(slot_id)
+            if claimed_job is None:
+                if job_queue.is_closed(seen_run_ids):
+                    return
+                stop_event.wait(QUEUE_POLL_SECONDS)
+                continue
+            seen_run_ids.add(claimed_job.payload.get("run_id"))
+            try:
+                run_claimed_job(claimed_job, slot_id)
+            except Exception as e:
+                # Leave the job to lease expiry rather than losing it.
+                with CONSOLE_LOCK:
+                    print(f"  [{slot_id}] ERROR: Unexpected error on '{claimed_job.job_id}': {e}")
+
+    slot_threads = [threading.Thread(target=run_slot, args=(slot_number,)) for slot_number in range(1, MAX_WORKERS + 1)]
+    try:
+        for thread in slot_threads:
+            thread.start()
+        for thread in slot_threads:
+            while thread.is_alive():
+                thread.join(timeout=QUEUE_POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("\nStopping after the running jobs (their leases stop being renewed if this process is killed)...")
+        stop_event.set()
+        for thread in slot_threads:
+            thread.join()
+    finally:
+        if worker_pool:
+            worker_pool.shutdown()
+        if high_poly_pool:
+            high_poly_pool.shutdown(cancel_futures=True)
+    print(f"\nQueue worker '{worker_id}' finished {finished_count[0]} job(s).")
+
+
+def read_stats_file(asset_name):
+    try:
+        with open(stats_file_path(asset_name), 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def build_run_report(results, run_seconds, predicted_run_seconds=None):
+    """Combines the per-asset stats sidecars written by Blender into one run report."""
+    assets = []
+    stage_rows = []
+    stage_totals = {}
+    for result in results:
+        asset_entry = {
+            "asset_name": result["asset_name"],
+            "status": result["status"],
+            "orchestrator_seconds": result["elapsed_seconds"],
+            "input_handoff": result["input_handoff"],
+            "high_poly_writer": result["high_poly_writer"],
+            "high_poly_seconds": result["high_poly_seconds"],
+            "queue_worker": result.get("queue_worker"),
+            "predicted_peak_bytes": result.get("predicted_peak_bytes"),
+            "memory_wait_seconds": result.get("memory_wait_seconds", 0.0),
+            "parts": result.get("parts"),
+            "blender_seconds": None,
+            "decimation": None,
+            "stages": [],
+        }
+        stats = read_stats_file(result["asset_name"])
+        if stats:
+            asset_entry["blender_seconds"] = stats.get("total_seconds")
+            asset_entry["decimation"] = stats.get("decimation")
+            asset_entry["stages"] = stats.get("stages", [])
+            for stage in asset_entry["stages"]:
+                stage_rows.append({
+                    "asset_name": result["asset_name"],
+                    "stage": stage["name"],
+                    "wall_seconds": stage["wall_seconds"],
+                    "peak_rss_bytes": stage.get("peak_rss_bytes"),
+                    "faces_before": (stage.get("before") or {}).get("faces"),
+                    "faces_after": (stage.get("after") or {}).get("faces"),
+                })
+                totals = stage_totals.setdefault(stage["name"], {"stage": stage["name"], "count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                totals["count"] += 1
+                totals["total_seconds"] += stage["wall_seconds"]
+                totals["max_seconds"] = max(totals["max_seconds"], stage["wall_seconds"])
+        assets.append(asset_entry)
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "execution_mode": EXECUTION_MODE,
+        "max_workers": MAX_WORKERS,
+        "run_seconds": run_seconds,
+        "predicted_run_seconds": predicted_run_seconds,
+        "memory_budget_bytes": MEMORY_BUDGET_BYTES,
+        "stage_totals": sorted(stage_totals.values(), key=lambda row: row["total_seconds"], reverse=True),
+        "slowest_stages": sorted(stage_rows, key=lambda row: row["wall_seconds"], reverse=True)[:REPORT_TOP_N],
+        "slowest_assets": sorted(
+            ({"asset_name": a["asset_name"], "orchestrator_seconds": a["orchestrator_seconds"], "blender_seconds": a["blender_seconds"]} for a in assets),
+            key=lambda row: row["orchestrator_seconds"], reverse=True)[:REPORT_TOP_N],
+        "triangle_budget": build_triangle_budget_summary(assets),
+        "assets": assets,
+    }
+
+
+def build_triangle_budget_summary(assets):
+    """Achieved vs. target triangle counts of the assets decimated to a budget, or None if there were none."""
+    rows = []
+    for asset in assets:
+        decimation = asset.get("decimation") or {}
+        if not decimation.get("target_triangles") or decimation.get("achieved_triangles") is None:
+            continue
+        rows.append({
+            "asset_name": asset["asset_name"],
+            "mode": decimation["mode"],
+            "source_triangles": decimation["source_triangles"],
+            "target_triangles": decimation["target_triangles"],
+            "achieved_triangles": decimation["achieved_triangles"],
+            "deviation": decimation["achieved_triangles"] / decimation["target_triangles"] - 1.0,
+            "ratio": decimation["ratio"],
+            "clamped": decimation["clamped"],
+        })
+    if not rows:
+        return None
+    outside_rows = [row for row in rows if abs(row["deviation"]) > TRIANGLE_BUDGET_TOLERANCE]
+    return {
+        "asset_count": len(rows),
+        "within_tolerance_count": len(rows) - len(outside_rows),
+        "tolerance": TRIANGLE_BUDGET_TOLERANCE,
+        "target_triangles_total": sum(row["target_triangles"] for row in rows),
+        "achieved_triangles_total": sum(row["achieved_triangles"] for row in rows),
+        "outside_tolerance": sorted(outside_rows, key=lambda row: abs(row["deviation"]), reverse=True)[:REPORT_TOP_N],
+    }
+
+
+def format_bytes(byte_count):
+    if byte_count is None:
+        return "n/a"
+    return f"{byte_count / (1024 ** 3):.2f} GB" if byte_count >= 1024 ** 3 else f"{byte_count / (1024 ** 2):.0f} MB"
+
+
+def print_run_report(report):
+    print(f"\n--- Run Report ({report['run_seconds']:.1f}s wall, {report['execution_mode']} mode, {report['max_workers']} worker(s)) ---")
+    if report.get("predicted_run_seconds") is not None:
+        print(f"Predicted Blender time before the run: {report['predicted_run_seconds']:.1f}s")
+    waited_assets = [asset for asset in report["assets"] if asset.get("memory_wait_seconds")]
+    if waited_assets:
+        print(f"Waited for memory ({format_bytes(report['memory_budget_bytes'])} budget): {len(waited_assets)} asset(s), "
+              f"{sum(asset['memory_wait_seconds'] for asset in waited_assets):.1f}s in total")
+    if report["stage_totals"]:
+        print("Time per stage, all assets:")
+        for row in report["stage_totals"]:
+            print(f"  {row['stage']:<22} total {row['total_seconds']:8.1f}s   max {row['max_seconds']:7.1f}s   ({row['count']} asset(s))")
+    if report["slowest_stages"]:
+        print(f"Slowest individual stages:")
+        for row in report["slowest_stages"]:
+            print(f"  {row['wall_seconds']:7.1f}s  {row['asset_name']} / {row['stage']}  (faces {row['faces_before']} -> {row['faces_after']}, peak {format_bytes(row['peak_rss_bytes'])})")
+    budget = report.get("triangle_budget")
+    if budget:
+        print(f"Triangle budget: {budget['within_tolerance_count']}/{budget['asset_count']} asset(s) within {budget['tolerance']:.0%} of their target "
+              f"({budget['achieved_triangles_total']:,} triangles achieved, {budget['target_triangles_total']:,} targeted)")
+        for row in budget["outside_tolerance"]:
+            clamp_note = ", ratio clamped" if row["clamped"] else ""
+            print(f"  {row['deviation']:+7.1%}  {row['asset_name']}  ({row['achieved_triangles']:,} of {row['target_triangles']:,} target, "
+                  f"from {row['source_triangles']:,}, ratio {row['ratio']:.4f}{clamp_note})")
+    if report["slowest_assets"]:
+        print(f"Slowest assets:")
+        for row in report["slowest_assets"]:
+            blender_seconds = f"{row['blender_seconds']:.1f}s in Blender" if row["blender_seconds"] is not None else "no stats"
+            print(f"  {row['orchestrator_seconds']:7.1f}s  {row['asset_name']}  ({blender_seconds})")
+
+
+def write_run_report(report):
+    """Writes the run report as JSON into REPORTS_FOLDER and returns its path."""
+    os.makedirs(REPORTS_FOLDER, exist_ok=True)
+    report_path = os.path.join(REPORTS_FOLDER, f"run_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report_path
+
+
+def prune_build_cache(delete_outputs):
+    """--prune-cache: drops build cache entries for assets that are no longer in INPUT_BASE_FOLDER."""
+    build_cache = lib_build_cache.BuildCache(BUILD_CACHE_PATH)
+    assets, _ = find_input_assets()
+    live_asset_names = {asset_name for asset_name, _ in assets}
+    pruned_names = build_cache.prune(live_asset_names, delete_outputs=delete_outputs)
+    build_cache.save()
+    for asset_name in pruned_names:
+        print(f"  Pruned build cache entry: {asset_name}")
+    print(f"Pruned {len(pruned_names)} entr{'y' if len(pruned_names) == 1 else 'ies'}. {len(build_cache.entries)} remain in {BUILD_CACHE_PATH}.")
+
+
+# --- Main Logic ---
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Stage 1: run every asset in input_base_folder through Blender (blender_decimate_unwrap.py).")
+    arg_parser.add_argument("--force", action="store_true", help="Rebuild every asset, even if the build cache says it is up to date.")
+    arg_parser.add_argument("--prune-cache", action="store_true", help="Remove build cache entries for assets no longer in input_base_folder, then exit.")
+    arg_parser.add_argument("--delete-outputs", action="store_true", help="With --prune-cache: also delete the output files of pruned assets.")
+    arg_parser.add_argument("--coordinator", action="store_true", help="Queue the jobs in the shared queue folder for --queue-worker processes instead of running Blender here.")
+    arg_parser.add_argument("--queue-worker", action="store_true", help="Run jobs from the shared queue folder until the coordinator closes it.")
+    arg_parser.add_argument("--assets", nargs="+", metavar="ASSET", help="Only process these asset folders of input_base_folder (used by watch_assets.py).")
+    arg_parser.add_argument("--overwrite", action="store_true", help="Without the build cache: overwrite existing outputs instead of asking.")
+    arg_parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}", help="Name of this queue worker in logs and results (default: <host>-<pid>).")
+    cli_args = arg_parser.parse_args()
+
+    if not os.path.exists(OUTPUT_PROCESSED_OBJS_FOLDER):
+        os.makedirs(OUTPUT_PROCESSED_OBJS_FOLDER)
+        print(f"Created output directory: {OUTPUT_PROCESSED_OBJS_FOLDER}")
+
+    print(" STAGE 1: RUNNING BLENDER PROCESSING (process_assets.py)")
+    print("=" * 60 + "\n")
+
+    print(f"Starting asset processing for Blender...")
+    print(f"Input base: {INPUT_BASE_FOLDER}")
+    print(f"Outputting .blend, _high.{HIGH_POLY_FORMAT} & _low.obj to: {OUTPUT_PROCESSED_OBJS_FOLDER}")
+    if DECIMATE_MODE == "triangles":
+        print(f"Decimation: {TARGET_TRIANGLES:,} triangles per asset (ratio clamped to {MIN_DECIMATE_RATIO:g}-{MAX_DECIMATE_RATIO:g})")
+    elif DECIMATE_MODE == "density":
+        print(f"Decimation: {TRIANGLES_PER_AREA:g} triangles per square unit of surface (ratio clamped to {MIN_DECIMATE_RATIO:g}-{MAX_DECIMATE_RATIO:g})")
+    else:
+        print(f"Decimation: ratio {DECIMATE_RATIO:g} for every asset")
+    if LOD_TARGETS:
+        print(f"LOD chain: {', '.join(f'_lod{lod_level}.obj ({lod_target:g})' for lod_level, lod_target in enumerate(LOD_TARGETS, start=1))}, UVs: {LOD_UV_MODE}")
+    if SPLIT_OBJECTS != "off":
+        print(f"Multi-object OBJs: split into parallel part jobs, {'reassembled into one mesh' if SPLIT_OBJECTS == 'join' else 'written as separate meshes'}")
+    print(f"Using Blender: {BLENDER_EXECUTABLE}")
+    print(f"Using Blender script: {BLENDER_SCRIPT_PATH}")
+    print(f"Parallel Blender workers: {MAX_WORKERS}")
+    print(f"Memory budget: {format_bytes(MEMORY_BUDGET_BYTES) + ' (jobs start only while their predicted memory fits)' if MEMORY_BUDGET_BYTES is not None else 'none (admission control off)'}")
+    print(f"_high.{HIGH_POLY_FORMAT} written by: {'process_assets.py (lib_obj)' if USE_EXTERNAL_HIGH_POLY_WRITER else 'Blender'}")
+
+    if cli_args.coordinator and cli_args.queue_worker:
+        print("ERROR: --coordinator and --queue-worker are separate processes; start them separately.")
+        exit(1)
+    if not cli_args.queue_worker and not os.path.isdir(INPUT_BASE_FOLDER):
+        print(f"ERROR: Input base folder '{INPUT_BASE_FOLDER}' does not exist or is not a directory. Please check config.json.")
+        exit(1)
+    if not os.path.exists(BLENDER_SCRIPT_PATH):
+        print(f"ERROR: Blender script '{BLENDER_SCRIPT_PATH}' not found. Ensure it's in the same directory as process_assets.py.")
+        exit(1)
+    if EXECUTION_MODE not in EXECUTION_MODES:
+        print(f"ERROR: Unknown execution_mode '{EXECUTION_MODE}' in config.json. Expected one of: {', '.join(EXECUTION_MODES)}.")
+        exit(1)
+    if INPUT_HANDOFF not in INPUT_HANDOFF_MODES:
+        print(f"ERROR: Unknown input_handoff '{INPUT_HANDOFF}' in config.json. Expected one of: {', '.join(INPUT_HANDOFF_MODES)}.")
+        exit(1)
+    if HIGH_POLY_WRITER not in HIGH_POLY_WRITERS:
+        print(f"ERROR: Unknown high_poly_writer '{HIGH_POLY_WRITER}' in config.json. Expected one of: {', '.join(HIGH_POLY_WRITERS)}.")
+        exit(1)
+    if HIGH_POLY_FORMAT not in HIGH_POLY_FORMATS:
+        print(f"ERROR: Unknown high_poly_format '{HIGH_POLY_FORMAT}' in config.json. Expected one of: {', '.join(HIGH_POLY_FORMATS)}.")
+        exit(1)
+    if not isinstance(LOD_TARGETS, list) or any(not isinstance(lod_target, (int, float)) or lod_target <= 0 for lod_target in LOD_TARGETS):
+        print(f"ERROR: lod_targets in config.json must be a list of positive numbers (ratios <= 1 or face counts), got {LOD_TARGETS!r}.")
+        exit(1)
+    if DECIMATE_MODE not in DECIMATE_MODES:
+        print(f"ERROR: Unknown decimate_mode '{DECIMATE_MODE}' in config.json. Expected one of: {', '.join(DECIMATE_MODES)}.")
+        exit(1)
+    if DECIMATE_MODE == "triangles" and not (isinstance(TARGET_TRIANGLES, int) and TARGET_TRIANGLES > 0):
+        print(f"ERROR: \"decimate_mode\": \"triangles\" needs a positive whole number target_triangles in config.json, got {TARGET_TRIANGLES!r}.")
+        exit(1)
+    if DECIMATE_MODE == "density" and not (isinstance(TRIANGLES_PER_AREA, (int, float)) and TRIANGLES_PER_AREA > 0):
+        print(f"ERROR: \"decimate_mode\": \"density\" needs a positive triangles_per_area in config.json, got {TRIANGLES_PER_AREA!r}.")
+        exit(1)
+    if not 0.0 <= MIN_DECIMATE_RATIO <= MAX_DECIMATE_RATIO <= 1.0:
+        print(f"ERROR: min_decimate_ratio ({MIN_DECIMATE_RATIO}) and max_decimate_ratio ({MAX_DECIMATE_RATIO}) in config.json must satisfy 0 <= min <= max <= 1.")
+        exit(1)
+    if LOD_UV_MODE not in LOD_UV_MODES:
+        print(f"ERROR: Unknown lod_uv_mode '{LOD_UV_MODE}' in config.json. Expected one of: {', '.join(LOD_UV_MODES)}.")
+        exit(1)
+    if SPLIT_OBJECTS not in SPLIT_MODES:
+        print(f"ERROR: Unknown split_objects '{SPLIT_OBJECTS}' in config.json. Expected one of: {', '.join(SPLIT_MODES)}.")
+        exit(1)
+    if SPLIT_OBJECTS != "off" and lib_obj is None:
+        print("ERROR: split_objects needs NumPy (pip install numpy) to split the OBJs. Use \"off\" instead.")
+        exit(1)
+    if SPLIT_OBJECTS == "join" and (HIGH_POLY_FORMAT != "obj" or SCALE_FACTOR <= 0):
+        print("ERROR: \"split_objects\": \"join\" writes the asset's _high.obj from the source OBJ, so it needs high_poly_format \"obj\" "
+              "and a positive scale_factor. Use \"separate\" instead.")
+        exit(1)
+    if not isinstance(SPLIT_MIN_FACES, int) or SPLIT_MIN_FACES < 0:
+        print(f"ERROR: split_min_faces in config.json must be a whole number >= 0, got {SPLIT_MIN_FACES!r}.")
+        exit(1)
+    if HIGH_POLY_WRITER == "external" and HIGH_POLY_FORMAT != "obj":
+        print(f"ERROR: \"high_poly_writer\": \"external\" only writes OBJ, but high_poly_format is '{HIGH_POLY_FORMAT}'. Use \"auto\" or \"blender\" instead.")
+        exit(1)
+    if HIGH_POLY_WRITER == "external" and lib_obj is None:
+        print("ERROR: \"high_poly_writer\": \"external\" needs NumPy (pip install numpy). Use \"auto\" or \"blender\" instead.")
+        exit(1)
+    if HIGH_POLY_WRITER == "external" and SCALE_FACTOR <= 0:
+        print("ERROR: \"high_poly_writer\": \"external\" only supports a positive scale_factor. Use \"blender\" instead.")
+        exit(1)
+
+    if cli_args.prune_cache:
+        prune_build_cache(cli_args.delete_outputs)
+        exit(0)
+
+    if cli_args.queue_worker:
+        run_queue_worker(cli_args.worker_id)
+        exit(0)
+
+    build_cache = lib_build_cache.BuildCache(BUILD_CACHE_PATH) if USE_BUILD_CACHE else None
+    journal = lib_journal.Journal(JOURNAL_PATH)
+    jobs, skipped_count, up_to_date_count = collect_asset_jobs(build_cache, cli_args.force, journal,
+                                                                   set(cli_args.assets) if cli_args.assets else None, cli_args.overwrite)
+    split_parents = []
+    if jobs and SPLIT_OBJECTS != "off":
+        jobs, split_parents = split_multi_object_jobs(jobs)
+    mesh_index = lib_mesh_index.MeshIndex(MESH_INDEX_PATH)
+    predicted_run_seconds = None
+    if jobs:
+        jobs, predicted_run_seconds = schedule_jobs(jobs, mesh_index)
+    run_start_time = time.monotonic()
+    if cli_args.coordinator:
+        results = run_queue_coordinator(jobs, build_cache, mesh_index, journal)
+    else:
+        results = run_jobs(jobs, build_cache, mesh_index, journal)
+    mesh_index.close()
+    part_results = []
+    if split_parents:
+        results, part_results = assemble_split_assets(split_parents, results, build_cache, journal)
+    processed_count = sum(1 for result in results if result["status"] == "processed")
+    skipped_count += len(results) - processed_count
+
+    if results:
+        # Split assets are listed with their parts, which carry the Blender stats.
+        run_report = build_run_report(results + part_results, time.monotonic() - run_start_time, predicted_run_seconds)
+        print_run_report(run_report)
+        print(f"Run report written to: {write_run_report(run_report)}")
 
-print(f"\n--- Blender Processing Complete ---")
-print(f"Successfully processed: {processed_count} assets.")
-print(f"Skipped: {skipped_count} assets.")
\ No newline at end of file
+    print(f"\n--- Blender Processing Complete ---")
+    print(f"Successfully processed: {processed_count} assets.")
+    if build_cache is not None:
+        print(f"Up to date (build cache): {up_to_date_count} assets.")
+    elif up_to_date_count:
+        print(f"Already built (journal): {up_to_date_count} assets.")
+    print(f"Skipped: {skipped_count} assets.")
\ No newline at end of file
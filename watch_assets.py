@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# Long-running mode for continuous ingestion: watches input_base_folder and sends every asset
+# folder that is new or changed through Stage 1 (process_assets.py) and then Stage 2
+# (painter_automate.py), without waiting for the next manual batch.
+#
+#   python watch_assets.py
+#
+# A folder is picked up once it contains an .obj and none of its files has changed size or
+# modification time for stable_seconds, so assets that are still being copied are left alone.
+# config.json is re-read whenever it changes: watch_settings apply from the next poll, and the
+# stage scripts read the rest of it themselves each time they start.
+
+REPO_FOLDER = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE_PATH = os.environ.get("PIPELINE_CONFIG") or os.path.join(REPO_FOLDER, "config.json")
+PROCESS_ASSETS_SCRIPT = os.path.join(REPO_FOLDER, "process_assets.py")
+PAINTER_SCRIPT = os.path.join(REPO_FOLDER, "painter_automate.py")
+
+# Files copy tools create while a transfer is in progress. A folder holding one is never stable.
+PARTIAL_FILE_SUFFIXES = (".tmp", ".part", ".partial", ".crdownload", ".!sync", ".filepart")
+
+
+class WatchSettings:
+    """The paths and watch_settings from config.json, re-read when the file changes."""
+
+    def __init__(self):
+        self.config_mtime_ns = None
+        self.input_base_folder = None
+        self.processed_objs_folder = None
+        self.poll_seconds = 5
+        self.stable_seconds = 30
+        self.run_painter = True
+        self.painter_retry_seconds = 120
+
+    def reload_if_changed(self):
+        """Re-reads config.json if it changed. Returns True if new settings were applied.
+
+        A config that cannot be read (for example half-saved by an editor) is reported
+        and the previous settings stay in effect; only the first load is fatal.
+        """
+        try:
+            config_mtime_ns = os.stat(CONFIG_FILE_PATH).st_mtime_ns
+        except OSError as e:
+            return self._reject(f"Could not read {CONFIG_FILE_PATH}: {e}")
+        if config_mtime_ns == self.config_mtime_ns:
+            return False
+        try:
+            with open(CONFIG_FILE_PATH, 'r') as f:
+                config = json.load(f)
+            global_paths = config["global_paths"]
+            input_base_folder = global_paths["input_base_folder"]
+            processed_objs_folder = global_paths["processed_objs_folder"]
+        except (OSError, json.JSONDecodeError, KeyError) as e:
+            return self._reject(f"Could not load {CONFIG_FILE_PATH}: {e}")
+
+        watch_settings = config.get("watch_settings", {})
+        self.config_mtime_ns = config_mtime_ns
+        self.input_base_folder = input_base_folder
+        self.processed_objs_folder = processed_objs_folder
+        # How often input_base_folder is scanned.
+        self.poll_seconds = max(0.5, watch_settings.get("poll_seconds", 5))
+        # How long an asset folder must stay unchanged before it is processed.
+        self.stable_seconds = watch_settings.get("stable_seconds", 30)
+        # Run painter_automate.py after Stage 1. When false, only Stage 1 runs.
+        self.run_painter = watch_settings.get("run_painter", True)
+        # Wait this long before retrying Stage 2 after painter_automate.py failed (e.g. Painter not running).
+        self.painter_retry_seconds = watch_settings.get("painter_retry_seconds", 120)
+        return True
+
+    def _reject(self, message):
+        if self.config_mtime_ns is None:
+            print(f"ERROR: {message}")
+            exit(1)
+        print(f"  WARNING: {message}. Keeping the previous settings.")
+        return False
+
+
+def folder_signature(folder_path):
+    """Returns (signature, has_obj, has_partial_files) for an asset folder, walking it with os.scandir.
+
+    The signature is a tuple of (relative path, size, mtime_ns) for every file, so it changes
+    whenever a file is added, removed, grows or is rewritten.
+    """
+    entries = []
+    has_obj = False
+    has_partial_files = False
+    pending_folders = [folder_path]
+    while pending_folders:
+        current_folder = pending_folders.pop()
+        try:
+            with os.scandir(current_folder) as scanner:
+                for entry in scanner:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_folders.append(entry.path)
+                        continue
+                    name_lower = entry.name.lower()
+                    if name_lower.endswith(PARTIAL_FILE_SUFFIXES) or entry.name.startswith("~$"):
+                        has_partial_files = True
+                    if current_folder == folder_path and name_lower.endswith(".obj"):
+                        has_obj = True
+                    stat = entry.stat(follow_symlinks=False)
+                    entries.append((os.path.relpath(entry.path, folder_path), stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            has_partial_files = True # Vanished or locked mid-scan; look again on the next poll
+    return tuple(sorted(entries)), has_obj, has_partial_files
+
+
+class FolderWatcher:
+    """Tracks every asset folder's signature between polls and reports the ones that became stable."""
+
+    def __init__(self):
+        self.watched = {} # asset name -> {"signature", "changed_at", "dispatched_signature"}
+
+    def poll(self, input_base_folder, stable_seconds):
+        """Scans input_base_folder once. Returns the asset names that are stable and not yet dispatched in their current state."""
+        now = time.monotonic()
+        seen_names = set()
+        ready_names = []
+        try:
+            with os.scandir(input_base_folder) as scanner:
+                asset_folders = [(entry.name, entry.path) for entry in scanner if entry.is_dir()]
+        except OSError as e:
+            print(f"  WARNING: Could not scan '{input_base_folder}': {e}")
+            return []
+
+        for asset_name, folder_path in asset_folders:
+            if asset_name.startswith("."):
+                continue
+            seen_names.add(asset_name)
+            signature, has_obj, has_partial_files = folder_signature(folder_path)
+            state = self.watched.get(asset_name)
+            if state is None:
+                state = self.watched[asset_name] = {"signature": signature, "changed_at": now, "dispatched_signature": None}
+            elif state["signature"] != signature:
+                state["signature"] = signature
+                state["changed_at"] = now
+            if not has_obj or has_partial_files or signature == state["dispatched_signature"]:
+                continue
+            if now - state["changed_at"] >= stable_seconds:
+                ready_names.append(asset_name)
+
+        for asset_name in set(self.watched) - seen_names:
+            del self.watched[asset_name]
+        return sorted(ready_names)
+
+    def mark_dispatched(self, asset_names):
+        for asset_name in asset_names:
+            state = self.watched[asset_name]
+            state["dispatched_signature"] = state["signature"]
+
+    def mark_existing_dispatched(self):
+        """Treats every folder seen so far as already processed (for --skip-existing)."""
+        self.mark_dispatched(list(self.watched))
+
+
+class StageRun:
+    """One running process_assets.py or painter_automate.py, with its output going to a log file."""
+
+    def __init__(self, label, script_path, extra_args, asset_names, logs_folder):
+        self.label = label
+        self.asset_names = asset_names
+        self.start_time = time.monotonic()
+        os.makedirs(logs_folder, exist_ok=True)
+        self.log_path = os.path.join(logs_folder, f"watch_{label.lower().replace(' ', '_')}_{time.strftime('%Y%m%d_%H%M%S')}.log")
+        self.log_file = open(self.log_path, 'w', encoding='utf-8', errors='replace')
+        command = [sys.executable, script_path] + extra_args + ["--assets"] + asset_names
+        # No console input: a watch run must never stop at a prompt.
+        self.process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=self.log_file,
+                                        stderr=subprocess.STDOUT, cwd=REPO_FOLDER)
+        print(f"[{time.strftime('%H:%M:%S')}] {label}: started for {len(asset_names)} asset(s): {', '.join(asset_names)}")
+        print(f"  Log: {self.log_path}")
+
+    def poll(self):
+        """Returns the exit code once the process has finished, otherwise None."""
+        return_code = self.process.poll()
+        if return_code is not None and not self.log_file.closed:
+            self.log_file.close()
+            status = "finished" if return_code == 0 else f"FAILED (exit code {return_code})"
+            print(f"[{time.strftime('%H:%M:%S')}] {self.label}: {status} after {time.monotonic() - self.start_time:.0f}s.")
+        return return_code
+
+
+def watch(settings, skip_existing):
+    watcher = FolderWatcher()
+    stage1_pending = [] # Assets waiting for the next Stage 1 run, in arrival order
+    painter_pending = [] # Assets through Stage 1, waiting for Painter
+    stage1_failed = [] # Assets of a Stage 1 run that exited with an error; retried once config.json changes
+    stage1_run = None
+    painter_run = None
+    painter_retry_at = 0.0
+
+    if skip_existing:
+        watcher.poll(settings.input_base_folder, settings.stable_seconds)
+        watcher.mark_existing_dispatched()
+        print(f"Ignoring the {len(watcher.watched)} asset folder(s) already in the input folder (--skip-existing).")
+
+    print(f"Watching {settings.input_base_folder} every {settings.poll_seconds:g}s "
+          f"(stable after {settings.stable_seconds:g}s). Press Ctrl+C to stop.")
+    while True:
+        if settings.reload_if_changed():
+            print(f"[{time.strftime('%H:%M:%S')}] config.json changed: watching {settings.input_base_folder} every "
+                  f"{settings.poll_seconds:g}s, stable after {settings.stable_seconds:g}s, Painter {'on' if settings.run_painter else 'off'}.")
+            stage1_pending.extend(name for name in stage1_failed if name not in stage1_pending)
+            stage1_failed = []
+
+        ready_names = watcher.poll(settings.input_base_folder, settings.stable_seconds)
+        if ready_names:
+            watcher.mark_dispatched(ready_names)
+            for asset_name in ready_names:
+                print(f"[{time.strftime('%H:%M:%S')}] New or changed asset ready: {asset_name}")
+                if asset_name not in stage1_pending:
+                    stage1_pending.append(asset_name)
+
+        logs_folder = os.path.join(settings.processed_objs_folder, "_pipeline", "logs")
+        if stage1_run is not None and stage1_run.poll() is not None and stage1_run.process.returncode != 0:
+            # process_assets.py only exits with an error before building anything (bad config, missing Blender script).
+            stage1_failed.extend(name for name in stage1_run.asset_names if name not in stage1_failed)
+            print(f"  Stage 1 will be retried for {len(stage1_failed)} asset(s) after config.json is fixed.")
+            stage1_run = None
+        if stage1_run is not None and stage1_run.poll() is not None:
+            # Stage 2 skips assets whose Stage 1 failed (journal) or left no _low.obj, so the whole batch is handed on.
+            if settings.run_painter:
+                painter_pending.extend(name for name in stage1_run.asset_names if name not in painter_pending)
+            stage1_run = None
+        if stage1_run is None and stage1_pending:
+            # --overwrite: a changed asset must be rebuilt even when use_build_cache is off.
+            stage1_run = StageRun("Stage 1", PROCESS_ASSETS_SCRIPT, ["--overwrite"], stage1_pending, logs_folder)
+            stage1_pending = []
+
+        if painter_run is not None and painter_run.poll() is not None:
+            if painter_run.process.returncode != 0:
+                # Usually Painter is not running; the journal lets the retry skip whatever did finish.
+                painter_pending = painter_run.asset_names + [name for name in painter_pending if name not in painter_run.asset_names]
+                painter_retry_at = time.monotonic() + settings.painter_retry_seconds
+                print(f"  Retrying Stage 2 for {len(painter_pending)} asset(s) in {settings.painter_retry_seconds:g}s.")
+            painter_run = None
+        if painter_run is None and painter_pending and settings.run_painter and time.monotonic() >= painter_retry_at:
+            painter_run = StageRun("Stage 2", PAINTER_SCRIPT, [], painter_pending, logs_folder)
+            painter_pending = []
+
+        time.sleep(settings.poll_seconds)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Watch input_base_folder and run new or changed assets through both stages as they arrive.")
+    arg_parser.add_argument("--skip-existing", action="store_true", help="Only process folders that appear or change after the watcher starts.")
+    cli_args = arg_parser.parse_args()
+
+    settings = WatchSettings()
+    settings.reload_if_changed()
+    if not os.path.isdir(settings.input_base_folder):
+        print(f"ERROR: Input base folder '{settings.input_base_folder}' does not exist or is not a directory. Please check config.json.")
+        exit(1)
+
+    print(" WATCH MODE: CONTINUOUS INGESTION (watch_assets.py)")
+    print("=" * 60 + "\n")
+    print(f"Config: {CONFIG_FILE_PATH} (reloaded when it changes)")
+    try:
+        watch(settings, cli_args.skip_existing)
+    except KeyboardInterrupt:
+        print("\nWatcher stopped.")